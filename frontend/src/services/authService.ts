@@ -1,4 +1,5 @@
 const API_BASE_URL = 'http://localhost:8001';
+const BACKEND_API_URL = 'http://localhost:8000/api/v1';
 
 interface User {
   id: string;
@@ -92,7 +93,11 @@ export class AuthService {
   async logout() {
     try {
       if (this.token) {
-        await this.request('/auth/logout', { method: 'POST' });
+        // Backend revokes its cached verification and forwards logout to auth service
+        await fetch(`${BACKEND_API_URL}/auth/logout`, {
+          method: 'POST',
+          headers: { Authorization: `Bearer ${this.token}` }
+        });
       }
     } catch (error) {
       console.error('Logout error:', error);
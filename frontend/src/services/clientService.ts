@@ -39,6 +39,7 @@ export interface ClientList {
   total: number;
   skip: number;
   limit: number;
+  next_cursor?: string | null;
 }
 
 class ClientService {
@@ -53,6 +53,7 @@ export interface ContractList {
   total: number;
   skip: number;
   limit: number;
+  next_cursor?: string | null;
 }
 
 class ContractService {
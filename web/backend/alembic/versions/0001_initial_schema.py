@@ -0,0 +1,98 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-06-01 00:00:00
+
+Exactly the tables Base.metadata.create_all() created before migrations were introduced,
+mark such databases with `alembic stamp 0001` before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+CONTRACT_STATUSES = ('DRAFT', 'ACTIVE', 'SUSPENDED', 'EXPIRED', 'CANCELLED')
+CLAIM_STATUSES = ('SUBMITTED', 'UNDER_REVIEW', 'APPROVED', 'REJECTED', 'PAID')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'clients',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('first_name', sa.String(50), nullable=False),
+        sa.Column('last_name', sa.String(50), nullable=False),
+        sa.Column('email', sa.String(100)),
+        sa.Column('phone', sa.String(20)),
+        sa.Column('address', sa.Text()),
+        sa.Column('date_of_birth', sa.Date()),
+        sa.Column('identification_number', sa.String(50)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+        sa.Column('created_by', sa.Integer()),
+    )
+    op.create_index('ix_clients_id', 'clients', ['id'])
+    op.create_index('ix_clients_email', 'clients', ['email'], unique=True)
+
+    op.create_table(
+        'insurance_products',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('base_premium', sa.Float(), nullable=False),
+        sa.Column('coverage_amount', sa.Float()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_insurance_products_id', 'insurance_products', ['id'])
+
+    op.create_table(
+        'contracts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('contract_number', sa.String(50), nullable=False),
+        sa.Column('client_id', sa.Integer(), sa.ForeignKey('clients.id'), nullable=False),
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('insurance_products.id'), nullable=False),
+        sa.Column('agent_id', sa.Integer(), nullable=False),
+        sa.Column('premium_amount', sa.Float(), nullable=False),
+        sa.Column('coverage_amount', sa.Float(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum(*CONTRACT_STATUSES, name='contractstatus')),
+        sa.Column('terms_conditions', sa.Text()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_contracts_id', 'contracts', ['id'])
+    op.create_index('ix_contracts_contract_number', 'contracts', ['contract_number'], unique=True)
+
+    op.create_table(
+        'claims',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('claim_number', sa.String(50), nullable=False),
+        sa.Column('contract_id', sa.Integer(), sa.ForeignKey('contracts.id'), nullable=False),
+        sa.Column('incident_date', sa.Date(), nullable=False),
+        sa.Column('reported_date', sa.Date(), server_default=sa.func.current_date()),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('claim_amount', sa.Float()),
+        sa.Column('approved_amount', sa.Float()),
+        sa.Column('status', sa.Enum(*CLAIM_STATUSES, name='claimstatus')),
+        sa.Column('adjuster_id', sa.Integer()),
+        sa.Column('adjuster_notes', sa.Text()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_claims_id', 'claims', ['id'])
+    op.create_index('ix_claims_claim_number', 'claims', ['claim_number'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table('claims')
+    op.drop_table('contracts')
+    op.drop_table('insurance_products')
+    op.drop_table('clients')
+    sa.Enum(name='claimstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='contractstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,52 @@
+"""trigram and full-text search indexes for clients and claims
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-06-01 00:00:01
+
+Expressions here must stay identical to the ones built in app/functions/search_service.py,
+otherwise PostgreSQL will not use the indexes. Other dialects get no indexes
+(SearchService falls back to plain LIKE there).
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = [
+    ('ix_clients_first_name_trgm', 'clients', 'first_name'),
+    ('ix_clients_last_name_trgm', 'clients', 'last_name'),
+    ('ix_clients_email_trgm', 'clients', 'email'),
+    ('ix_clients_phone_trgm', 'clients', 'phone'),
+    ('ix_claims_claim_number_trgm', 'claims', 'claim_number'),
+    ('ix_claims_description_trgm', 'claims', 'description'),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, table, [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+    op.execute(
+        "CREATE INDEX ix_claims_description_fts ON claims "
+        "USING gin (to_tsvector('simple'::regconfig, description))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_claims_description_fts")
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
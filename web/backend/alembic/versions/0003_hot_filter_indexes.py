@@ -0,0 +1,55 @@
+"""composite and partial indexes for hot filter columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-06-01 00:00:02
+
+Mirrors the Index entries in Contract.__table_args__ and Claim.__table_args__.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+ACTIVE_CONTRACT = sa.text("status = 'ACTIVE'")
+PENDING_CLAIM = sa.text("status IN ('SUBMITTED', 'UNDER_REVIEW')")
+
+
+def upgrade() -> None:
+    op.create_index('ix_contracts_agent_id_created_at', 'contracts', ['agent_id', 'created_at'])
+    op.create_index('ix_contracts_client_id', 'contracts', ['client_id'])
+    op.create_index('ix_contracts_product_id', 'contracts', ['product_id'])
+    op.create_index('ix_contracts_status', 'contracts', ['status'])
+    op.create_index('ix_contracts_created_at', 'contracts', ['created_at'])
+    op.create_index(
+        'ix_contracts_active_end_date', 'contracts', ['end_date'],
+        postgresql_where=ACTIVE_CONTRACT, sqlite_where=ACTIVE_CONTRACT
+    )
+
+    op.create_index('ix_claims_contract_id', 'claims', ['contract_id'])
+    op.create_index('ix_claims_adjuster_id_status', 'claims', ['adjuster_id', 'status'])
+    op.create_index('ix_claims_status_updated_at', 'claims', ['status', 'updated_at'])
+    op.create_index('ix_claims_created_at', 'claims', ['created_at'])
+    op.create_index(
+        'ix_claims_pending_adjuster_id', 'claims', ['adjuster_id', 'id'],
+        postgresql_where=PENDING_CLAIM, sqlite_where=PENDING_CLAIM
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_claims_pending_adjuster_id', table_name='claims')
+    op.drop_index('ix_claims_created_at', table_name='claims')
+    op.drop_index('ix_claims_status_updated_at', table_name='claims')
+    op.drop_index('ix_claims_adjuster_id_status', table_name='claims')
+    op.drop_index('ix_claims_contract_id', table_name='claims')
+
+    op.drop_index('ix_contracts_active_end_date', table_name='contracts')
+    op.drop_index('ix_contracts_created_at', table_name='contracts')
+    op.drop_index('ix_contracts_status', table_name='contracts')
+    op.drop_index('ix_contracts_product_id', table_name='contracts')
+    op.drop_index('ix_contracts_client_id', table_name='contracts')
+    op.drop_index('ix_contracts_agent_id_created_at', table_name='contracts')
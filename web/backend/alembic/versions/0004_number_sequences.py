@@ -0,0 +1,30 @@
+"""counter table for contract, claim and client number allocation
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-06-01 00:00:03
+
+PostgreSQL allocates numbers from native sequences (contract_number_<year>_seq,
+claim_number_<year>_seq, client_id_seq) created on first use by app/db/sequences.py;
+number_sequences is the fallback for dialects without sequences.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'number_sequences',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('number_sequences')
@@ -0,0 +1,26 @@
+"""rating table column for insurance products
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-06-01 00:00:04
+
+NULL keeps the default rating table, which reproduces the bands premiums were
+calculated with before (see app/functions/rating.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('insurance_products', sa.Column('rating_table', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('insurance_products') as batch_op:
+        batch_op.drop_column('rating_table')
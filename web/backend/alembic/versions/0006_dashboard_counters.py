@@ -0,0 +1,30 @@
+"""live dashboard counters
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-06-01 00:00:05
+
+Rows are created by the first reconciliation (app/functions/counter_service.py), which
+counts them from contracts and claims.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'dashboard_counters',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dashboard_counters')
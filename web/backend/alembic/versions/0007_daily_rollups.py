@@ -0,0 +1,75 @@
+"""daily analytics rollup tables
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-06-01 00:00:06
+
+Tables are filled by RollupService.rebuild() (POST /analytics/rollups/rebuild) and kept
+current by the write paths and the periodic refresher, see app/functions/rollup_service.py.
+The claim group index coalesces its nullable columns, otherwise rows with a NULL key would
+never conflict and write-path upserts would add duplicate groups.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+CONTRACT_STATUSES = ('DRAFT', 'ACTIVE', 'SUSPENDED', 'EXPIRED', 'CANCELLED')
+CLAIM_STATUSES = ('SUBMITTED', 'UNDER_REVIEW', 'APPROVED', 'REJECTED', 'PAID')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_contract_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer()),
+        sa.Column('agent_id', sa.Integer()),
+        sa.Column('status', postgresql.ENUM(*CONTRACT_STATUSES, name='contractstatus', create_type=False)),
+        sa.Column('contracts_count', sa.Integer(), nullable=False),
+        sa.Column('premium_sum', sa.Float(), nullable=False),
+        sa.Column('first_contract_id', sa.Integer()),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_daily_contract_rollups_id', 'daily_contract_rollups', ['id'])
+    op.create_index(
+        'ix_daily_contract_rollups_day', 'daily_contract_rollups',
+        ['day', 'product_id', 'agent_id', 'status'], unique=True
+    )
+
+    op.create_table(
+        'daily_claim_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('updated_day', sa.Date()),
+        sa.Column('product_id', sa.Integer()),
+        sa.Column('adjuster_id', sa.Integer()),
+        sa.Column('status', postgresql.ENUM(*CLAIM_STATUSES, name='claimstatus', create_type=False)),
+        sa.Column('claims_count', sa.Integer(), nullable=False),
+        sa.Column('claimed_amount_sum', sa.Float(), nullable=False),
+        sa.Column('approved_amount_sum', sa.Float()),
+        sa.Column('approved_count', sa.Integer(), nullable=False),
+        sa.Column('first_claim_id', sa.Integer()),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_daily_claim_rollups_id', 'daily_claim_rollups', ['id'])
+    op.create_index(
+        'ix_daily_claim_rollups_day', 'daily_claim_rollups',
+        [
+            'day', sa.text("coalesce(updated_day, '0001-01-01')"), sa.text('coalesce(product_id, 0)'),
+            sa.text('coalesce(adjuster_id, 0)'), 'status'
+        ],
+        unique=True
+    )
+    op.create_index('ix_daily_claim_rollups_updated_day', 'daily_claim_rollups', ['updated_day'])
+
+
+
+def downgrade() -> None:
+    op.drop_table('daily_claim_rollups')
+    op.drop_table('daily_contract_rollups')
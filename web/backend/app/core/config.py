@@ -10,9 +10,81 @@ class Settings(BaseSettings):
     main_db_host: str = os.getenv("MAIN_DB_HOST", "localhost")
     main_db_port: str = os.getenv("MAIN_DB_PORT", "5432")
     
+    # Engine profile
+    db_echo: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    # Use asyncpg-backed AsyncSession for service calls instead of the sync Session
+    db_async_enabled: bool = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+    # Startup schema check against alembic head: "strict" refuses to start, "warn" only logs, "off" skips
+    db_schema_check: str = os.getenv("DB_SCHEMA_CHECK", "strict")
+    
     # Auth service settings
     auth_service_url: str = os.getenv("AUTH_SERVICE_URL", "http://localhost:8001")
     
+    # Token verification settings (must match auth-service JWT settings)
+    # auth_verify_mode: "local" decodes tokens in-process, "remote" calls auth-service
+    auth_verify_mode: str = os.getenv("AUTH_VERIFY_MODE", "local")
+    auth_remote_fallback: bool = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() == "true"
+    jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "your_super_secret_jwt_key_change_in_production")
+    jwt_algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
+    
+    # Verified token cache (entries never outlive the token's exp claim)
+    auth_cache_enabled: bool = os.getenv("AUTH_CACHE_ENABLED", "true").lower() == "true"
+    auth_cache_ttl_seconds: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+    auth_cache_max_entries: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    # Logged out tokens remembered until their exp, the one expiring first is dropped beyond this
+    auth_revoked_max_entries: int = int(os.getenv("AUTH_REVOKED_MAX_ENTRIES", "100000"))
+    
+    # Pooled HTTP client for auth-service calls
+    auth_http_max_connections: int = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "100"))
+    auth_http_max_keepalive: int = int(os.getenv("AUTH_HTTP_MAX_KEEPALIVE", "20"))
+    auth_http_keepalive_expiry: float = float(os.getenv("AUTH_HTTP_KEEPALIVE_EXPIRY", "30"))
+    auth_http_timeout: float = float(os.getenv("AUTH_HTTP_TIMEOUT", "5"))
+    auth_http_connect_timeout: float = float(os.getenv("AUTH_HTTP_CONNECT_TIMEOUT", "2"))
+    auth_http2: bool = os.getenv("AUTH_HTTP2", "false").lower() == "true"
+    
+    # Daily analytics rollups (date-range analytics read pre-aggregated days instead of raw rows)
+    analytics_rollups_enabled: bool = os.getenv("ANALYTICS_ROLLUPS_ENABLED", "false").lower() == "true"
+    analytics_rollup_interval_seconds: int = int(os.getenv("ANALYTICS_ROLLUP_INTERVAL_SECONDS", "900"))
+    analytics_rollup_lookback_days: int = int(os.getenv("ANALYTICS_ROLLUP_LOOKBACK_DAYS", "2"))
+    
+    # Analytics response cache: "memory" (per-process LRU) or "redis" (shared, needs the redis package)
+    analytics_cache_enabled: bool = os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() == "true"
+    analytics_cache_backend: str = os.getenv("ANALYTICS_CACHE_BACKEND", "memory")
+    analytics_cache_redis_url: str = os.getenv("ANALYTICS_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    analytics_cache_max_entries: int = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1000"))
+    analytics_cache_dashboard_ttl_seconds: int = int(os.getenv("ANALYTICS_CACHE_DASHBOARD_TTL_SECONDS", "60"))
+    analytics_cache_report_ttl_seconds: int = int(os.getenv("ANALYTICS_CACHE_REPORT_TTL_SECONDS", "300"))
+    # Expired entries are still served for this long while one request recomputes them
+    analytics_cache_stale_seconds: int = int(os.getenv("ANALYTICS_CACHE_STALE_SECONDS", "60"))
+    # Longest a recomputation may hold the per-key lock
+    analytics_cache_lock_seconds: int = int(os.getenv("ANALYTICS_CACHE_LOCK_SECONDS", "30"))
+    
+    # Live dashboard counters (dashboard summary reads dashboard_counters instead of recounting)
+    dashboard_counters_enabled: bool = os.getenv("DASHBOARD_COUNTERS_ENABLED", "true").lower() == "true"
+    # Counters are recounted from contracts and claims this often, 0 disables the periodic job
+    dashboard_counters_reconcile_seconds: int = int(os.getenv("DASHBOARD_COUNTERS_RECONCILE_SECONDS", "3600"))
+    
+    # Bulk endpoints: items per request and rows per INSERT statement / commit
+    bulk_max_items: int = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+    bulk_chunk_size: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+    # Client import: at most this many row errors are listed in the report
+    client_import_max_errors: int = int(os.getenv("CLIENT_IMPORT_MAX_ERRORS", "100"))
+    
+    # Adjuster assignment: comma-separated adjuster user ids eligible for new claims (adjusters
+    # that have held a claim are always known; with neither, new claims stay unassigned and a
+    # warning is logged), open-claim limit per adjuster (0 = none), resync period
+    adjuster_ids: str = os.getenv("ADJUSTER_IDS", "")
+    adjuster_max_open_claims: int = int(os.getenv("ADJUSTER_MAX_OPEN_CLAIMS", "0"))
+    assignment_resync_seconds: int = int(os.getenv("ASSIGNMENT_RESYNC_SECONDS", "60"))
+    
+    # Product catalog cache (and compiled rating tables) is reloaded after this many seconds (changes made by other workers)
+    product_cache_ttl_seconds: int = int(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "300"))
+    
     # Application settings
     app_name: str = "Insurance Management System"
     debug: bool = False
@@ -20,10 +92,18 @@ class Settings(BaseSettings):
     # API settings
     api_v1_prefix: str = "/api/v1"
     
+    @property
+    def adjuster_id_list(self) -> list:
+        return [int(value) for value in self.adjuster_ids.split(",") if value.strip()]
+    
     @property
     def database_url(self) -> str:
         return f"postgresql://{self.main_db_user}:{self.main_db_password}@{self.main_db_host}:{self.main_db_port}/{self.main_db_name}"
     
+    @property
+    def async_database_url(self) -> str:
+        return f"postgresql+asyncpg://{self.main_db_user}:{self.main_db_password}@{self.main_db_host}:{self.main_db_port}/{self.main_db_name}"
+    
     class Config:
         env_file = ".env"
 
@@ -1,28 +1,156 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
-from typing import Generator
+import time
+import threading
+from typing import Generator, AsyncGenerator, Optional
+from app.core.config import get_settings
 
-# Database URL from environment variables
-MAIN_DB_NAME = os.getenv("MAIN_DB_NAME", "main_db")
-MAIN_DB_USER = os.getenv("MAIN_DB_USER", "main_user")
-MAIN_DB_PASSWORD = os.getenv("MAIN_DB_PASSWORD", "main_pass")
-MAIN_DB_HOST = os.getenv("MAIN_DB_HOST", "localhost")
-MAIN_DB_PORT = os.getenv("MAIN_DB_PORT", "5432")
+settings = get_settings()
 
-DATABASE_URL = f"postgresql://{MAIN_DB_USER}:{MAIN_DB_PASSWORD}@{MAIN_DB_HOST}:{MAIN_DB_PORT}/{MAIN_DB_NAME}"
+class PoolMetrics:
+    """
+    Connection checkout counters and time spent waiting for a free connection
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def record_checkout(self, wait_seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+    
+    def snapshot(self, pool) -> dict:
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts > 0 else 0
+        }
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+class _CheckoutTimingMixin:
+    """Records how long each pool checkout waited into cls.metrics"""
+    
+    metrics: PoolMetrics
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    metrics = pool_metrics
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+def _pool_options() -> dict:
+    return {
+        "echo": settings.db_echo,
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle
+    }
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Build the sync engine from Settings (pool sizing, recycle, statement timeout, echo)
+    """
+    database_url = database_url or settings.database_url
+    connect_args = {}
+    if settings.db_statement_timeout_ms > 0 and make_url(database_url).get_backend_name() == "postgresql":
+        connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    
+    return create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
+        connect_args=connect_args,
+        **_pool_options()
+    )
+
+def create_async_db_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Build the asyncpg engine with the same pool profile as the sync engine
+    """
+    database_url = database_url or settings.async_database_url
+    connect_args = {}
+    if settings.db_statement_timeout_ms > 0 and make_url(database_url).get_backend_name() == "postgresql":
+        connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    
+    return create_async_engine(
+        database_url,
+        poolclass=InstrumentedAsyncQueuePool,
+        connect_args=connect_args,
+        **_pool_options()
+    )
+
+# SQLAlchemy engine, one per process
+engine = create_db_engine()
 
-# SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True
-)
+# Pooled connections must not be shared with forked worker processes
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
 
 # Session local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine is created on first use so asyncpg is only required when enabled
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Get (and lazily create) the asyncpg-backed engine
+    """
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        async_engine = create_async_db_engine()
+        # Objects are returned to routers after commit, keep their loaded state
+        AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return async_engine
+
+def get_pool_metrics() -> dict:
+    """
+    Pool status and checkout/wait counters for the process engines
+    """
+    metrics = {"sync": pool_metrics.snapshot(engine.pool)}
+    if async_engine is not None:
+        metrics["async"] = async_pool_metrics.snapshot(async_engine.pool)
+    return metrics
+
 # Base for declarative models
 Base = declarative_base()
 
@@ -36,8 +164,10 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-def create_tables():
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Create all tables defined in models
+    Async database session dependency
     """
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
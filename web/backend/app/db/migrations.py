@@ -0,0 +1,89 @@
+"""
+Schema version management.
+
+The schema is changed only by Alembic migrations, applied once per deploy with
+`python -m app.db.migrations`. Application workers never create or reflect tables at
+boot, they only compare the single alembic_version row with the head revision.
+"""
+import logging
+import os
+from functools import lru_cache
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from app.core.config import get_settings
+from app.db.database import engine
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Arbitrary application-wide key for pg_advisory_lock, serializes concurrent upgrades
+MIGRATION_LOCK_KEY = 7_210_447_001
+
+class SchemaVersionError(RuntimeError):
+    """Database schema is not at the revision this code expects"""
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+@lru_cache()
+def head_revision() -> str:
+    """Head revision of the migration scripts shipped with this build (read from disk once)"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(bind: Optional[Engine] = None) -> Optional[str]:
+    """Revision stored in alembic_version, None if the database was never migrated"""
+    bind = bind or engine
+    with bind.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except DBAPIError:
+            # No alembic_version table yet
+            return None
+
+def check_schema_version(bind: Optional[Engine] = None):
+    """
+    Startup check: one single-row SELECT instead of create_all() reflection.
+    Raises SchemaVersionError in "strict" mode, only logs a warning in "warn" mode.
+    """
+    if settings.db_schema_check == "off":
+        return
+
+    current, head = current_revision(bind), head_revision()
+    if current == head:
+        return
+
+    message = f"Database schema revision is {current or 'missing'}, expected {head}. Run: python -m app.db.migrations"
+    if settings.db_schema_check == "strict":
+        raise SchemaVersionError(message)
+    logger.warning(message)
+
+def upgrade_database(bind: Optional[Engine] = None, revision: str = "head"):
+    """Apply migrations up to revision, holding an advisory lock on PostgreSQL so parallel deploys wait for each other"""
+    bind = bind or engine
+    config = alembic_config()
+    with bind.connect() as connection:
+        postgres = connection.dialect.name == "postgresql"
+        if postgres:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+        try:
+            config.attributes["connection"] = connection
+            command.upgrade(config, revision)
+            connection.commit()
+        finally:
+            if postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+if __name__ == "__main__":
+    upgrade_database()
+    print(f"Database schema is at revision {current_revision()}")
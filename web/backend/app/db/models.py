@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, Text, Boolean, ForeignKey, Enum, Index, JSON, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -47,6 +47,8 @@ class InsuranceProduct(Base):
     description = Column(Text)
     base_premium = Column(Float, nullable=False)
     coverage_amount = Column(Float)
+    # Age/coverage bands and risk factor multipliers, NULL means the default table (app/functions/rating.py)
+    rating_table = Column(JSON)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -78,6 +80,21 @@ class Contract(Base):
     product = relationship("InsuranceProduct", back_populates="contracts")
     claims = relationship("Claim", back_populates="contract")
     
+    # Indexes for the service filters (created by migration 0003)
+    __table_args__ = (
+        Index("ix_contracts_agent_id_created_at", "agent_id", "created_at"),
+        Index("ix_contracts_client_id", "client_id"),
+        Index("ix_contracts_product_id", "product_id"),
+        Index("ix_contracts_status", "status"),
+        Index("ix_contracts_created_at", "created_at"),
+        # Expiring contracts: active only, by end date
+        Index(
+            "ix_contracts_active_end_date", "end_date",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Contract(id={self.id}, number='{self.contract_number}', status='{self.status}')>"
 
@@ -101,5 +118,92 @@ class Claim(Base):
     # Relationships
     contract = relationship("Contract", back_populates="claims")
     
+    # Indexes for the service filters (created by migration 0003)
+    __table_args__ = (
+        Index("ix_claims_contract_id", "contract_id"),
+        Index("ix_claims_adjuster_id_status", "adjuster_id", "status"),
+        Index("ix_claims_status_updated_at", "status", "updated_at"),
+        Index("ix_claims_created_at", "created_at"),
+        # Adjuster work queue: pending claims per adjuster in id (cursor) order
+        Index(
+            "ix_claims_pending_adjuster_id", "adjuster_id", "id",
+            postgresql_where=text("status IN ('SUBMITTED', 'UNDER_REVIEW')"),
+            sqlite_where=text("status IN ('SUBMITTED', 'UNDER_REVIEW')")
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<Claim(id={self.id}, number='{self.claim_number}', status='{self.status}')>"
+
+class DailyContractRollup(Base):
+    """Contracts aggregated per creation day, product, agent and status"""
+    __tablename__ = "daily_contract_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    product_id = Column(Integer)
+    agent_id = Column(Integer)
+    status = Column(Enum(ContractStatus))
+    contracts_count = Column(Integer, nullable=False, default=0)
+    premium_sum = Column(Float, nullable=False, default=0)
+    first_contract_id = Column(Integer)  # Smallest contract id in the group, keeps tie ordering stable
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_daily_contract_rollups_day", "day", "product_id", "agent_id", "status", unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<DailyContractRollup(day={self.day}, product_id={self.product_id}, agent_id={self.agent_id})>"
+
+class DailyClaimRollup(Base):
+    """Claims aggregated per creation day, last update day, product, adjuster and status"""
+    __tablename__ = "daily_claim_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    updated_day = Column(Date)
+    product_id = Column(Integer)
+    adjuster_id = Column(Integer)
+    status = Column(Enum(ClaimStatus))
+    claims_count = Column(Integer, nullable=False, default=0)
+    claimed_amount_sum = Column(Float, nullable=False, default=0)
+    approved_amount_sum = Column(Float)  # NULL when no claim in the group has an approved amount
+    approved_count = Column(Integer, nullable=False, default=0)
+    first_claim_id = Column(Integer)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # NULLs never conflict in a unique index, they are coalesced so that upserts of a group match its row
+        Index(
+            "ix_daily_claim_rollups_day",
+            day, func.coalesce(updated_day, text("'0001-01-01'")), func.coalesce(product_id, text("0")),
+            func.coalesce(adjuster_id, text("0")), status,
+            unique=True
+        ),
+        Index("ix_daily_claim_rollups_updated_day", "updated_day"),
+    )
+    
+    def __repr__(self):
+        return f"<DailyClaimRollup(day={self.day}, product_id={self.product_id}, adjuster_id={self.adjuster_id})>"
+
+class NumberSequence(Base):
+    """Counter rows for NumberAllocator on databases without native sequences"""
+    __tablename__ = "number_sequences"
+    
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<NumberSequence(name='{self.name}', value={self.value})>"
+
+class DashboardCounter(Base):
+    """Live dashboard metric kept current by the write paths (see app/functions/counter_service.py)"""
+    __tablename__ = "dashboard_counters"
+    
+    name = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    
     def __repr__(self):
-        return f"<Claim(id={self.id}, number='{self.claim_number}', status='{self.status}')>" 
\ No newline at end of file
+        return f"<DashboardCounter(name='{self.name}', value={self.value})>"
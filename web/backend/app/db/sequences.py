@@ -0,0 +1,127 @@
+"""
+Document number allocation backed by database sequences.
+
+Numbers come from nextval() on PostgreSQL sequences (one per year for contract and
+claim numbers), so they are unique under concurrent inserts without any lookup.
+Dialects without sequences (SQLite in tests) use the number_sequences counter table.
+"""
+import threading
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import func, select, update, insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.db.models import Contract, Claim, NumberSequence
+
+CLIENT_ID_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CLIENT_ID_LENGTH = 8
+CLIENT_ID_SPACE = len(CLIENT_ID_ALPHABET) ** CLIENT_ID_LENGTH
+# Coprime with 36 (golden ratio of 36^8), so n -> n * multiplier mod 36^8 is a bijection: ids stay unique but do not look sequential
+CLIENT_ID_MULTIPLIER = 1_743_541_808_807
+
+# Sequences known to exist, per process (PostgreSQL only)
+_known_sequences = set()
+_known_sequences_lock = threading.Lock()
+
+def _to_client_id(value: int) -> str:
+    value = (value * CLIENT_ID_MULTIPLIER) % CLIENT_ID_SPACE
+    chars = []
+    for _ in range(CLIENT_ID_LENGTH):
+        value, digit = divmod(value, len(CLIENT_ID_ALPHABET))
+        chars.append(CLIENT_ID_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+class NumberAllocator:
+    """Allocates contract numbers, claim numbers and client identification numbers"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.postgres = db.get_bind().dialect.name == "postgresql"
+
+    def contract_number(self, year: Optional[int] = None) -> str:
+        """Next contract number, CON-YYYY-NNNNNN"""
+        return self.contract_numbers(1, year)[0]
+
+    def contract_numbers(self, count: int, year: Optional[int] = None) -> List[str]:
+        """count consecutive contract numbers in a single round-trip"""
+        year = year or datetime.now().year
+        values = self.next_values(f"contract_number_{year}", count, Contract.contract_number, f"CON-{year}-")
+        return [f"CON-{year}-{value:06d}" for value in values]
+
+    def claim_number(self, year: Optional[int] = None) -> str:
+        """Next claim number, CLM-YYYY-NNNNNNN"""
+        return self.claim_numbers(1, year)[0]
+
+    def claim_numbers(self, count: int, year: Optional[int] = None) -> List[str]:
+        """count consecutive claim numbers in a single round-trip"""
+        year = year or datetime.now().year
+        values = self.next_values(f"claim_number_{year}", count, Claim.claim_number, f"CLM-{year}-")
+        return [f"CLM-{year}-{value:07d}" for value in values]
+
+    def client_id(self) -> str:
+        """Next 8-character client identification number"""
+        return self.client_ids(1)[0]
+
+    def client_ids(self, count: int) -> List[str]:
+        return [_to_client_id(value) for value in self.next_values("client_id", count)]
+
+    def next_values(self, name: str, count: int, number_column=None, prefix: Optional[str] = None) -> List[int]:
+        """
+        Reserve count values of sequence name.
+        A new sequence starts after the highest number already stored in number_column with
+        the given prefix, so numbers issued before the sequence existed are never repeated.
+        """
+        if count <= 0:
+            return []
+        if self.postgres:
+            return self._next_sequence_values(name, count, number_column, prefix)
+        return self._next_counter_values(name, count, number_column, prefix)
+
+    def _start_value(self, number_column, prefix: Optional[str]) -> int:
+        if number_column is None:
+            return 1
+        # Longest, then greatest number: stays correct once numbers outgrow their zero padding
+        last_number = self.db.execute(
+            select(number_column).where(number_column.like(f"{prefix}%")).order_by(
+                func.length(number_column).desc(), number_column.desc()
+            ).limit(1)
+        ).scalar()
+        if last_number is None:
+            return 1
+        suffix = last_number[len(prefix):]
+        return int(suffix) + 1 if suffix.isdigit() else 1
+
+    def _next_sequence_values(self, name: str, count: int, number_column, prefix) -> List[int]:
+        sequence = f"{name}_seq"
+        if sequence not in _known_sequences:
+            self._create_sequence(sequence, self._start_value(number_column, prefix))
+        rows = self.db.execute(
+            text(f"SELECT nextval('{sequence}') FROM generate_series(1, :count)"),
+            {"count": count}
+        ).scalars().all()
+        return sorted(rows)
+
+    def _create_sequence(self, sequence: str, start: int):
+        # Own autocommit connection: the sequence must survive a rollback of the caller's transaction
+        with _known_sequences_lock:
+            if sequence in _known_sequences:
+                return
+            engine = self.db.get_bind().engine
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                try:
+                    connection.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {sequence} START WITH {int(start)}"))
+                except DBAPIError:
+                    # Another process created it concurrently
+                    pass
+            _known_sequences.add(sequence)
+
+    def _next_counter_values(self, name: str, count: int, number_column, prefix) -> List[int]:
+        last = self.db.execute(
+            update(NumberSequence).where(NumberSequence.name == name).values(
+                value=NumberSequence.value + count
+            ).returning(NumberSequence.value)
+        ).scalar()
+        if last is None:
+            last = self._start_value(number_column, prefix) - 1 + count
+            self.db.execute(insert(NumberSequence).values(name=name, value=last))
+        return list(range(last - count + 1, last + 1))
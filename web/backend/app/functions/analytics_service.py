@@ -1,67 +1,173 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, extract
-from typing import List, Dict, Any
+from sqlalchemy import func, and_, or_, extract, select, literal, union_all, true
+from typing import List, Dict, Any, Optional
 from datetime import date, datetime, timedelta
-from ..db.models import Client, Contract, Claim, InsuranceProduct, ContractStatus, ClaimStatus
+from ..core.config import get_settings
+from ..db.models import (
+    Client, Contract, Claim, InsuranceProduct, ContractStatus, ClaimStatus,
+    DailyContractRollup, DailyClaimRollup
+)
+from ..schemas.reports import FinanceReportData
 from ..modules.analytics import (
     AnalyticsRequest, SalesMetrics, ClaimsMetrics, FinancialMetrics, 
     PerformanceMetrics, DashboardSummary, ChartData, TimeRange
 )
+from .async_service import AsyncService, service_provider
+from .counter_service import CounterService, month_to_date
+
+settings = get_settings()
+
+class _ContractFacts:
+    """
+    Contract measures read either from raw contracts or from daily_contract_rollups.
+
+    Rollups have day granularity, so a range always covers whole days from start to end.
+    """
+
+    def __init__(self, use_rollups: bool):
+        self.use_rollups = use_rollups
+        if use_rollups:
+            rollup = DailyContractRollup
+            self.day = rollup.day
+            self.product_id = rollup.product_id
+            self.agent_id = rollup.agent_id
+            self.status = rollup.status
+            self.row_premium = rollup.premium_sum
+            self.row_count = rollup.contracts_count
+            self.row_first_id = rollup.first_contract_id
+            self.count = func.coalesce(func.sum(rollup.contracts_count), 0)
+            self.avg_premium = func.sum(rollup.premium_sum) / func.nullif(func.sum(rollup.contracts_count), 0)
+        else:
+            self.day = Contract.created_at
+            self.product_id = Contract.product_id
+            self.agent_id = Contract.agent_id
+            self.status = Contract.status
+            self.row_premium = Contract.premium_amount
+            self.row_count = literal(1)
+            self.row_first_id = Contract.id
+            self.count = func.count(Contract.id)
+            self.avg_premium = func.avg(Contract.premium_amount)
+        self.premium = func.sum(self.row_premium)
+        self.first_id = func.min(self.row_first_id)
+
+    def count_where(self, condition):
+        if self.use_rollups:
+            return func.coalesce(func.sum(DailyContractRollup.contracts_count).filter(condition), 0)
+        return func.count(Contract.id).filter(condition)
+
+    def in_range(self, start_date: date, end_date: date):
+        return and_(self.day >= start_date, self.day <= end_date)
+
+class _ClaimFacts:
+    """Claim measures read either from raw claims or from daily_claim_rollups"""
+
+    def __init__(self, use_rollups: bool):
+        self.use_rollups = use_rollups
+        if use_rollups:
+            rollup = DailyClaimRollup
+            self.day = rollup.day
+            self.updated_day = rollup.updated_day
+            self.product_id = rollup.product_id
+            self.adjuster_id = rollup.adjuster_id
+            self.status = rollup.status
+            self.row_approved = rollup.approved_amount_sum
+            self.count = func.coalesce(func.sum(rollup.claims_count), 0)
+            self.claimed = func.sum(rollup.claimed_amount_sum)
+            self.avg_approved = func.sum(rollup.approved_amount_sum) / func.nullif(func.sum(rollup.approved_count), 0)
+            self.first_id = func.min(rollup.first_claim_id)
+        else:
+            self.day = Claim.created_at
+            self.updated_day = Claim.updated_at
+            self.product_id = Contract.product_id
+            self.adjuster_id = Claim.adjuster_id
+            self.status = Claim.status
+            self.row_approved = Claim.approved_amount
+            self.count = func.count(Claim.id)
+            self.claimed = func.sum(func.coalesce(Claim.claim_amount, 0))
+            self.avg_approved = func.avg(Claim.approved_amount)
+            self.first_id = func.min(Claim.id)
+        self.approved = func.sum(self.row_approved)
+
+    def count_where(self, condition):
+        if self.use_rollups:
+            return func.coalesce(func.sum(DailyClaimRollup.claims_count).filter(condition), 0)
+        return func.count(Claim.id).filter(condition)
+
+    def with_product(self, query):
+        """Make product_id available (raw claims reach it through the contract)"""
+        if self.use_rollups:
+            return query
+        return query.outerjoin(Contract, Contract.id == Claim.contract_id)
+
+    def in_range(self, start_date: date, end_date: date):
+        return and_(self.day >= start_date, self.day <= end_date)
+
+    def updated_in_range(self, start_date: date, end_date: date):
+        return and_(self.updated_day >= start_date, self.updated_day <= end_date)
 
 class AnalyticsService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, use_rollups: Optional[bool] = None):
         self.db = db
+        # Date-range analytics come from daily rollups when enabled (see RollupService)
+        self.use_rollups = settings.analytics_rollups_enabled if use_rollups is None else use_rollups
+        self.contracts = _ContractFacts(self.use_rollups)
+        self.claims = _ClaimFacts(self.use_rollups)
 
     def get_sales_analytics(self, request: AnalyticsRequest) -> SalesMetrics:
         """Generate sales analytics"""
-        contracts_query = self.db.query(Contract).filter(
-            and_(
-                Contract.created_at >= request.start_date,
-                Contract.created_at <= request.end_date
-            )
-        )
+        contracts = self.contracts
+        date_filter = contracts.in_range(request.start_date, request.end_date)
         
-        contracts = contracts_query.all()
+        totals = self.db.query(
+            contracts.count.label('total_contracts'),
+            func.coalesce(contracts.premium, 0).label('total_premium'),
+            contracts.count_where(contracts.status == ContractStatus.ACTIVE).label('active_contracts')
+        ).filter(date_filter).one()
         
-        total_contracts = len(contracts)
-        total_premium = sum(c.premium_amount for c in contracts)
+        total_contracts = totals.total_contracts
+        total_premium = totals.total_premium
         average_premium = total_premium / total_contracts if total_contracts > 0 else 0
+        conversion_rate = totals.active_contracts / total_contracts if total_contracts > 0 else 0
         
-        active_contracts = len([c for c in contracts if c.status == ContractStatus.ACTIVE])
-        conversion_rate = active_contracts / total_contracts if total_contracts > 0 else 0
-        
-        # Top products
-        product_sales = {}
-        for contract in contracts:
-            product_id = contract.product_id
-            if product_id in product_sales:
-                product_sales[product_id]['count'] += 1
-                product_sales[product_id]['premium'] += contract.premium_amount
-            else:
-                product_sales[product_id] = {
-                    'product_id': product_id,
-                    'count': 1,
-                    'premium': contract.premium_amount,
-                    'product_name': contract.product.name if contract.product else 'Unknown'
-                }
-        
-        top_products = sorted(product_sales.values(), key=lambda x: x['premium'], reverse=True)[:5]
+        # Top products (ties keep the order in which products first appear)
+        product_stats = self.db.query(
+            contracts.product_id.label('product_id'),
+            InsuranceProduct.name.label('product_name'),
+            contracts.count.label('count'),
+            contracts.premium.label('premium')
+        ).outerjoin(
+            InsuranceProduct, InsuranceProduct.id == contracts.product_id
+        ).filter(date_filter).group_by(
+            contracts.product_id, InsuranceProduct.name
+        ).order_by(contracts.premium.desc(), contracts.first_id).limit(5).all()
+        
+        top_products = [
+            {
+                'product_id': stat.product_id,
+                'count': stat.count,
+                'premium': stat.premium,
+                'product_name': stat.product_name if stat.product_name is not None else 'Unknown'
+            }
+            for stat in product_stats
+        ]
         
         # Sales by agent
-        agent_sales = {}
-        for contract in contracts:
-            agent_id = contract.agent_id
-            if agent_id in agent_sales:
-                agent_sales[agent_id]['count'] += 1
-                agent_sales[agent_id]['premium'] += contract.premium_amount
-            else:
-                agent_sales[agent_id] = {
-                    'agent_id': agent_id,
-                    'count': 1,
-                    'premium': contract.premium_amount
-                }
-        
-        sales_by_agent = sorted(agent_sales.values(), key=lambda x: x['premium'], reverse=True)
+        agent_stats = self.db.query(
+            contracts.agent_id.label('agent_id'),
+            contracts.count.label('count'),
+            contracts.premium.label('premium')
+        ).filter(date_filter).group_by(
+            contracts.agent_id
+        ).order_by(contracts.premium.desc(), contracts.first_id).all()
+        
+        sales_by_agent = [
+            {
+                'agent_id': stat.agent_id,
+                'count': stat.count,
+                'premium': stat.premium
+            }
+            for stat in agent_stats
+        ]
         
         return SalesMetrics(
             total_contracts=total_contracts,
@@ -74,46 +180,51 @@ class AnalyticsService:
 
     def get_claims_analytics(self, request: AnalyticsRequest) -> ClaimsMetrics:
         """Generate claims analytics"""
-        # Base query for claims in date range
-        claims_query = self.db.query(Claim).filter(
-            and_(
-                Claim.created_at >= request.start_date,
-                Claim.created_at <= request.end_date
-            )
-        )
-        
-        claims = claims_query.all()
+        # Base filter for claims in date range
+        claims = self.claims
+        date_filter = claims.in_range(request.start_date, request.end_date)
+        
+        # Totals and per-status counts in a single pass
+        status_counts = [
+            claims.count_where(claims.status == status).label(status.value)
+            for status in ClaimStatus
+        ]
+        totals = self.db.query(
+            claims.count.label('total_claims'),
+            func.coalesce(claims.claimed, 0).label('total_claimed_amount'),
+            func.coalesce(claims.approved, 0).label('total_approved_amount'),
+            *status_counts
+        ).filter(date_filter).one()
         
         # Calculate metrics
-        total_claims = len(claims)
-        total_claimed_amount = sum(c.claim_amount or 0 for c in claims)
-        total_approved_amount = sum(c.approved_amount or 0 for c in claims if c.approved_amount)
+        total_claims = totals.total_claims
+        total_claimed_amount = totals.total_claimed_amount
+        total_approved_amount = totals.total_approved_amount
         average_claim_amount = total_claimed_amount / total_claims if total_claims > 0 else 0
         
-        approved_claims = len([c for c in claims if c.status == ClaimStatus.APPROVED])
-        approval_rate = approved_claims / total_claims if total_claims > 0 else 0
-        
         # Claims by status
-        claims_by_status = {}
-        for status in ClaimStatus:
-            claims_by_status[status.value] = len([c for c in claims if c.status == status])
+        claims_by_status = {status.value: getattr(totals, status.value) for status in ClaimStatus}
+        approved_claims = claims_by_status[ClaimStatus.APPROVED.value]
+        approval_rate = approved_claims / total_claims if total_claims > 0 else 0
         
         # Claims by adjuster
-        adjuster_claims = {}
-        for claim in claims:
-            if claim.adjuster_id:
-                adjuster_id = claim.adjuster_id
-                if adjuster_id in adjuster_claims:
-                    adjuster_claims[adjuster_id]['count'] += 1
-                    adjuster_claims[adjuster_id]['total_amount'] += claim.claim_amount or 0
-                else:
-                    adjuster_claims[adjuster_id] = {
-                        'adjuster_id': adjuster_id,
-                        'count': 1,
-                        'total_amount': claim.claim_amount or 0
-                    }
-        
-        claims_by_adjuster = list(adjuster_claims.values())
+        adjuster_stats = self.db.query(
+            claims.adjuster_id.label('adjuster_id'),
+            claims.count.label('count'),
+            claims.claimed.label('total_amount')
+        ).filter(
+            date_filter,
+            claims.adjuster_id.isnot(None)
+        ).group_by(claims.adjuster_id).order_by(claims.first_id).all()
+        
+        claims_by_adjuster = [
+            {
+                'adjuster_id': stat.adjuster_id,
+                'count': stat.count,
+                'total_amount': stat.total_amount
+            }
+            for stat in adjuster_stats
+        ]
         
         return ClaimsMetrics(
             total_claims=total_claims,
@@ -127,48 +238,51 @@ class AnalyticsService:
 
     def get_financial_analytics(self, request: AnalyticsRequest) -> FinancialMetrics:
         """Generate financial analytics"""
-        # Revenue from contracts
-        contracts = self.db.query(Contract).filter(
-            and_(
-                Contract.created_at >= request.start_date,
-                Contract.created_at <= request.end_date
-            )
-        ).all()
+        contracts = self.contracts
+        claims = self.claims
+        contracts_filter = contracts.in_range(request.start_date, request.end_date)
         
-        total_revenue = sum(c.premium_amount for c in contracts)
+        # Revenue from contracts
+        total_revenue = self.db.query(
+            func.coalesce(contracts.premium, 0)
+        ).filter(contracts_filter).scalar()
         
         # Claims paid in the period
-        paid_claims = self.db.query(Claim).filter(
+        total_claims_paid = self.db.query(
+            func.coalesce(claims.approved, 0)
+        ).filter(
             and_(
-                Claim.updated_at >= request.start_date,
-                Claim.updated_at <= request.end_date,
-                Claim.status == ClaimStatus.PAID
+                claims.updated_in_range(request.start_date, request.end_date),
+                claims.status == ClaimStatus.PAID
             )
-        ).all()
-        
-        total_claims_paid = sum(c.approved_amount or 0 for c in paid_claims)
+        ).scalar()
         
         # Calculate metrics
         profit_margin = (total_revenue - total_claims_paid) / total_revenue if total_revenue > 0 else 0
         expense_ratio = total_claims_paid / total_revenue if total_revenue > 0 else 0
         
         # Revenue by product
-        product_revenue = {}
-        for contract in contracts:
-            product_id = contract.product_id
-            if product_id in product_revenue:
-                product_revenue[product_id]['revenue'] += contract.premium_amount
-            else:
-                product_revenue[product_id] = {
-                    'product_id': product_id,
-                    'product_name': contract.product.name if contract.product else 'Unknown',
-                    'revenue': contract.premium_amount
-                }
-        
-        revenue_by_product = sorted(product_revenue.values(), key=lambda x: x['revenue'], reverse=True)
+        product_stats = self.db.query(
+            contracts.product_id.label('product_id'),
+            InsuranceProduct.name.label('product_name'),
+            contracts.premium.label('revenue')
+        ).outerjoin(
+            InsuranceProduct, InsuranceProduct.id == contracts.product_id
+        ).filter(contracts_filter).group_by(
+            contracts.product_id, InsuranceProduct.name
+        ).order_by(contracts.premium.desc(), contracts.first_id).all()
+        
+        revenue_by_product = [
+            {
+                'product_id': stat.product_id,
+                'product_name': stat.product_name if stat.product_name is not None else 'Unknown',
+                'revenue': stat.revenue
+            }
+            for stat in product_stats
+        ]
         
         # Monthly revenue breakdown
-        monthly_revenue = self._get_monthly_breakdown(contracts, request.start_date, request.end_date)
+        monthly_revenue = self._get_monthly_breakdown(request.start_date, request.end_date)
         
         return FinancialMetrics(
             total_revenue=total_revenue,
@@ -196,71 +310,259 @@ class AnalyticsService:
             product_performance=product_performance
         )
 
-    def get_dashboard_summary(self) -> DashboardSummary:
-        """Get dashboard summary for current state"""
-        active_contracts = self.db.query(Contract).filter(
-            Contract.status == ContractStatus.ACTIVE
-        ).count()
-        
-        pending_claims = self.db.query(Claim).filter(
-            Claim.status.in_([ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW])
-        ).count()
-        
+    def get_dashboard_snapshot(self):
+        """Get current client, contract, claim and revenue counters in a single query"""
         today = date.today()
         month_start = today.replace(day=1)
-        total_revenue_mtd = self.db.query(func.sum(Contract.premium_amount)).filter(
-            and_(
-                Contract.created_at >= month_start,
-                Contract.created_at <= today
-            )
-        ).scalar() or 0
         
-        total_claims_amount = self.db.query(func.sum(Claim.approved_amount)).filter(
-            Claim.status == ClaimStatus.APPROVED
-        ).scalar() or 0
+        clients_stats = select(
+            func.count(Client.id).label('clients_total'),
+            func.count(Client.id).filter(Client.created_at >= month_start).label('clients_new_this_month')
+        ).subquery()
+        
+        contracts_stats = select(
+            func.count(Contract.id).label('contracts_total'),
+            func.count(Contract.id).filter(Contract.status == ContractStatus.ACTIVE).label('contracts_active'),
+            func.count(Contract.id).filter(Contract.status == ContractStatus.EXPIRED).label('contracts_expired'),
+            func.coalesce(func.sum(Contract.premium_amount), 0).label('revenue_total'),
+            func.coalesce(
+                func.sum(Contract.premium_amount).filter(Contract.created_at >= month_start), 0
+            ).label('revenue_monthly'),
+            func.coalesce(
+                func.sum(Contract.premium_amount).filter(month_to_date(Contract.created_at, today)), 0
+            ).label('revenue_mtd')
+        ).subquery()
+        
+        claims_stats = select(
+            func.count(Claim.id).label('claims_total'),
+            func.count(Claim.id).filter(
+                Claim.status.in_([ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW])
+            ).label('claims_pending'),
+            func.count(Claim.id).filter(Claim.status == ClaimStatus.APPROVED).label('claims_approved'),
+            func.count(Claim.id).filter(Claim.status == ClaimStatus.REJECTED).label('claims_rejected'),
+            func.coalesce(
+                func.sum(Claim.approved_amount).filter(Claim.status == ClaimStatus.APPROVED), 0
+            ).label('claims_approved_amount')
+        ).subquery()
+        
+        # Каждый подзапрос возвращает ровно одну строку, поэтому соединение по true не размножает строки
+        query = select(clients_stats, contracts_stats, claims_stats).select_from(
+            clients_stats.join(contracts_stats, true()).join(claims_stats, true())
+        )
+        return self.db.execute(query).one()
+
+    def get_dashboard_summary(self) -> DashboardSummary:
+        """Get dashboard summary for current state"""
+        # Живые счётчики читаются одним запросом по первичному ключу, без пересчёта договоров и заявок
+        if settings.dashboard_counters_enabled:
+            snapshot = CounterService(self.db).read()
+        else:
+            snapshot = self.get_dashboard_snapshot()
         
-        total_premiums = self.db.query(func.sum(Contract.premium_amount)).scalar() or 0
-        claims_ratio = total_claims_amount / total_premiums if total_premiums > 0 else 0
+        total_premiums = snapshot.revenue_total
+        claims_ratio = snapshot.claims_approved_amount / total_premiums if total_premiums > 0 else 0
         
         return DashboardSummary(
-            active_contracts=active_contracts,
-            pending_claims=pending_claims,
-            total_revenue_mtd=total_revenue_mtd,
+            active_contracts=snapshot.contracts_active,
+            pending_claims=snapshot.claims_pending,
+            total_revenue_mtd=snapshot.revenue_mtd,
             claims_ratio=claims_ratio,
             top_performing_agent=None,
             recent_activities=[],
             alerts=[]
         )
 
-    def _get_monthly_breakdown(self, contracts: List[Contract], start_date: date, end_date: date) -> List[Dict[str, Any]]:
-        """Get monthly revenue breakdown"""
+    def get_dashboard_data(self) -> Dict[str, Any]:
+        """Get dashboard analytics data"""
+        snapshot = self.get_dashboard_snapshot()
+        
+        return {
+            "clients": {
+                "total": snapshot.clients_total,
+                "active": snapshot.clients_total,  # Все клиенты считаются активными
+                "new_this_month": snapshot.clients_new_this_month
+            },
+            "contracts": {
+                "total": snapshot.contracts_total,
+                "active": snapshot.contracts_active,
+                "expired": snapshot.contracts_expired
+            },
+            "claims": {
+                "total": snapshot.claims_total,
+                "pending": snapshot.claims_pending,
+                "approved": snapshot.claims_approved,
+                "rejected": snapshot.claims_rejected
+            },
+            "revenue": {
+                "total": float(snapshot.revenue_total),
+                "monthly": float(snapshot.revenue_monthly)
+            }
+        }
+
+    def get_finance_report(self, start_date: date, end_date: date) -> FinanceReportData:
+        """Generate financial report"""
+        # Договоры и выплаченные заявки за период одним запросом, сгруппированные по месяцу и продукту
+        contracts = self.contracts
+        claims = self.claims
+        contract_rows = select(
+            self._month_key(contracts.day).label('month'),
+            contracts.product_id.label('product_id'),
+            contracts.row_premium.label('premiums'),
+            literal(0.0).label('claims'),
+            contracts.row_count.label('contracts'),
+            contracts.row_first_id.label('first_contract_id')
+        ).where(contracts.in_range(start_date, end_date))
+        claim_rows = claims.with_product(select(
+            self._month_key(claims.updated_day).label('month'),
+            claims.product_id.label('product_id'),
+            literal(0.0).label('premiums'),
+            func.coalesce(claims.row_approved, 0).label('claims'),
+            literal(0).label('contracts'),
+            literal(None).label('first_contract_id')
+        )).where(
+            and_(
+                claims.updated_in_range(start_date, end_date),
+                claims.status == ClaimStatus.APPROVED
+            )
+        )
+        rows = union_all(contract_rows, claim_rows).subquery()
+        
+        stats = self.db.query(
+            rows.c.month,
+            rows.c.product_id,
+            InsuranceProduct.name.label('product_name'),
+            func.sum(rows.c.premiums).label('premiums'),
+            func.sum(rows.c.claims).label('claims'),
+            func.sum(rows.c.contracts).label('contracts'),
+            func.min(rows.c.first_contract_id).label('first_contract_id')
+        ).outerjoin(
+            InsuranceProduct, InsuranceProduct.id == rows.c.product_id
+        ).group_by(
+            rows.c.month, rows.c.product_id, InsuranceProduct.name
+        ).all()
+        
+        total_premiums = sum(stat.premiums for stat in stats)
+        total_claims = sum(stat.claims for stat in stats)
+        profit = total_premiums - total_claims
+        
+        # Месяцы и продукты попадают в отчет только при наличии договоров за период
+        contract_months = {stat.month for stat in stats if stat.contracts}
+        contract_products = {stat.product_id for stat in stats if stat.contracts}
+        
+        # Помесячная разбивка
         monthly_data = {}
+        product_data = {}
+        for stat in stats:
+            if stat.month in contract_months:
+                month = monthly_data.setdefault(stat.month, {'premiums': 0, 'claims': 0})
+                month['premiums'] += stat.premiums
+                month['claims'] += stat.claims
+            
+            # По продуктам
+            if stat.product_id in contract_products:
+                product = product_data.setdefault(stat.product_id, {
+                    'product_name': stat.product_name if stat.product_name is not None else f'Product {stat.product_id}',
+                    'premiums': 0,
+                    'claims': 0,
+                    'count': 0,
+                    'first_contract_id': stat.first_contract_id
+                })
+                product['premiums'] += stat.premiums
+                product['claims'] += stat.claims
+                product['count'] += stat.contracts
+                if stat.first_contract_id is not None and (
+                    product['first_contract_id'] is None or stat.first_contract_id < product['first_contract_id']
+                ):
+                    product['first_contract_id'] = stat.first_contract_id
+        
+        by_month = [
+            {
+                'month': month,
+                'premiums': data['premiums'],
+                'claims': data['claims'],
+                'profit': data['premiums'] - data['claims']
+            }
+            for month, data in sorted(monthly_data.items())
+        ]
         
-        for contract in contracts:
-            month_key = contract.created_at.strftime('%Y-%m')
-            if month_key in monthly_data:
-                monthly_data[month_key] += contract.premium_amount
-            else:
-                monthly_data[month_key] = contract.premium_amount
+        # Порядок продуктов - по первому договору за период
+        by_product = [
+            {
+                'product_name': data['product_name'],
+                'premiums': data['premiums'],
+                'claims': data['claims'],
+                'count': data['count']
+            }
+            for data in sorted(product_data.values(), key=lambda x: x['first_contract_id'])
+        ]
+        
+        return FinanceReportData(
+            total_premiums=total_premiums,
+            total_claims=total_claims,
+            profit=profit,
+            period={"start": start_date.isoformat(), "end": end_date.isoformat()},
+            by_month=by_month,
+            by_product=by_product
+        )
+
+    def get_top_agents(self, start_date: date, end_date: date, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get top agents by premium volume"""
+        contracts = self.contracts
+        agent_stats = self.db.query(
+            contracts.agent_id.label('agent_id'),
+            contracts.count.label('contracts_count'),
+            contracts.premium.label('total_premium')
+        ).filter(
+            and_(
+                contracts.in_range(start_date, end_date),
+                contracts.agent_id.isnot(None)
+            )
+        ).group_by(contracts.agent_id).order_by(
+            contracts.premium.desc()
+        ).limit(limit).all()
+        
+        return [
+            {
+                'agent_name': f'Агент {stat.agent_id}',  # В реальности нужно получать из auth-service
+                'contracts_count': stat.contracts_count,
+                'total_premium': float(stat.total_premium)
+            }
+            for stat in agent_stats
+        ]
+
+    def _month_key(self, column):
+        """SQL expression formatting a timestamp column as 'YYYY-MM'"""
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return func.to_char(func.date_trunc('month', column), 'YYYY-MM')
+        # SQLite (tests) has no date_trunc
+        return func.strftime('%Y-%m', column)
+
+    def _get_monthly_breakdown(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """Get monthly revenue breakdown"""
+        month = self._month_key(self.contracts.day).label('month')
+        monthly_stats = self.db.query(
+            month,
+            self.contracts.premium.label('revenue')
+        ).filter(
+            self.contracts.in_range(start_date, end_date)
+        ).group_by(month).order_by(month).all()
         
         return [
-            {'month': month, 'revenue': revenue}
-            for month, revenue in sorted(monthly_data.items())
+            {'month': stat.month, 'revenue': stat.revenue}
+            for stat in monthly_stats
         ]
 
     def _get_agent_performance(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """Get agent performance metrics"""
+        contracts = self.contracts
         agent_stats = self.db.query(
-            Contract.agent_id,
-            func.count(Contract.id).label('contract_count'),
-            func.sum(Contract.premium_amount).label('total_premium'),
-            func.avg(Contract.premium_amount).label('avg_premium')
+            contracts.agent_id.label('agent_id'),
+            contracts.count.label('contract_count'),
+            contracts.premium.label('total_premium'),
+            contracts.avg_premium.label('avg_premium')
         ).filter(
-            and_(
-                Contract.created_at >= start_date,
-                Contract.created_at <= end_date
-            )
-        ).group_by(Contract.agent_id).all()
+            contracts.in_range(start_date, end_date)
+        ).group_by(contracts.agent_id).all()
         
         return [
             {
@@ -274,18 +576,18 @@ class AnalyticsService:
 
     def _get_adjuster_performance(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """Get adjuster performance metrics"""
+        claims = self.claims
         adjuster_stats = self.db.query(
-            Claim.adjuster_id,
-            func.count(Claim.id).label('claim_count'),
-            func.sum(Claim.approved_amount).label('total_approved'),
-            func.avg(Claim.approved_amount).label('avg_approved')
+            claims.adjuster_id.label('adjuster_id'),
+            claims.count.label('claim_count'),
+            claims.approved.label('total_approved'),
+            claims.avg_approved.label('avg_approved')
         ).filter(
             and_(
-                Claim.updated_at >= start_date,
-                Claim.updated_at <= end_date,
-                Claim.adjuster_id.isnot(None)
+                claims.updated_in_range(start_date, end_date),
+                claims.adjuster_id.isnot(None)
             )
-        ).group_by(Claim.adjuster_id).all()
+        ).group_by(claims.adjuster_id).all()
         
         return [
             {
@@ -299,28 +601,32 @@ class AnalyticsService:
 
     def _get_product_performance(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """Get product performance metrics"""
+        contracts = self.contracts
         product_stats = self.db.query(
-            Contract.product_id,
-            func.count(Contract.id).label('contract_count'),
-            func.sum(Contract.premium_amount).label('total_premium')
+            contracts.product_id.label('product_id'),
+            InsuranceProduct.name.label('product_name'),
+            contracts.count.label('contract_count'),
+            contracts.premium.label('total_premium')
+        ).outerjoin(
+            InsuranceProduct, InsuranceProduct.id == contracts.product_id
         ).filter(
-            and_(
-                Contract.created_at >= start_date,
-                Contract.created_at <= end_date
-            )
-        ).group_by(Contract.product_id).all()
+            contracts.in_range(start_date, end_date)
+        ).group_by(
+            contracts.product_id, InsuranceProduct.name
+        ).order_by(contracts.premium.desc(), contracts.first_id).all()
         
-        performance = []
-        for stat in product_stats:
-            product = self.db.query(InsuranceProduct).filter(
-                InsuranceProduct.id == stat.product_id
-            ).first()
-            
-            performance.append({
+        return [
+            {
                 'product_id': stat.product_id,
-                'product_name': product.name if product else 'Unknown',
+                'product_name': stat.product_name if stat.product_name is not None else 'Unknown',
                 'contract_count': stat.contract_count,
                 'total_premium': float(stat.total_premium)
-            })
-        
-        return sorted(performance, key=lambda x: x['total_premium'], reverse=True) 
\ No newline at end of file
+            }
+            for stat in product_stats
+        ]
+
+class AsyncAnalyticsService(AsyncService):
+    """Async variant of AnalyticsService"""
+    service_class = AnalyticsService
+
+get_analytics_service = service_provider(AsyncAnalyticsService)
@@ -0,0 +1,209 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, and_
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import logging
+import threading
+import time
+from app.core.config import get_settings
+from app.db.models import Claim, ClaimStatus
+from app.functions.async_service import AsyncService, service_provider
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+OPEN_CLAIM_STATUSES = (ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW)
+
+class AdjusterWorkload:
+    """
+    In-process open-claim count and open amount per adjuster.
+    
+    The least loaded adjuster (fewest open claims, then smallest open amount) is kept
+    on top of a heap, so picking one costs O(log n). Updated entries are pushed again
+    and outdated ones are skipped when popped. Counts are rebuilt from the claims table
+    every resync_seconds, which also absorbs assignments made by other processes.
+    
+    Known adjusters are the configured roster, every adjuster that has held a claim
+    (read on the first sync of the process) and those seen since. An adjuster whose
+    queue drains stays known at zero, so it is the next one picked.
+    """
+
+    def __init__(self, resync_seconds: int, max_open_claims: int = 0, roster: Iterable[int] = ()):
+        self.resync_seconds = resync_seconds
+        self.max_open_claims = max_open_claims  # 0 means no limit
+        self.roster = set(roster)
+        self.synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._loads: Dict[int, Tuple[int, float]] = {}
+        self._heap: List[Tuple[int, float, int]] = []
+
+    def _set(self, adjuster_id: int, open_claims: int, open_amount: float):
+        self._loads[adjuster_id] = (open_claims, open_amount)
+        heapq.heappush(self._heap, (open_claims, open_amount, adjuster_id))
+        if len(self._heap) > 4 * len(self._loads) + 64:
+            # Drop outdated entries
+            self._heap = [(c, a, adjuster_id) for adjuster_id, (c, a) in self._loads.items()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry: Tuple[int, float, int]) -> bool:
+        open_claims, open_amount, adjuster_id = entry
+        return self._loads.get(adjuster_id) == (open_claims, open_amount)
+
+    def load(self, open_loads: Dict[int, Tuple[int, float]]):
+        """Replace all counts, known adjusters without open claims are set to zero"""
+        with self._lock:
+            known = self.roster | set(self._loads) | set(open_loads)
+            self._loads = {}
+            self._heap = []
+            for adjuster_id in known:
+                open_claims, open_amount = open_loads.get(adjuster_id, (0, 0.0))
+                self._set(adjuster_id, open_claims, open_amount)
+            self.synced_at = time.monotonic()
+
+    def reset(self):
+        """Forget all counts, the next use resyncs from the database"""
+        with self._lock:
+            self._loads = {}
+            self._heap = []
+            self.synced_at = None
+
+    def needs_resync(self) -> bool:
+        return self.synced_at is None or time.monotonic() - self.synced_at >= self.resync_seconds
+
+    def add(self, adjuster_ids: Iterable[int]):
+        """Make adjusters known, with no open claims unless already tracked"""
+        with self._lock:
+            for adjuster_id in adjuster_ids:
+                if adjuster_id not in self._loads:
+                    self._set(adjuster_id, 0, 0.0)
+
+    def pick(self, amount: float = 0.0, eligible: Optional[set] = None) -> Optional[int]:
+        """Least loaded eligible adjuster under max_open_claims, counted as holding one more claim"""
+        with self._lock:
+            skipped = []
+            chosen = None
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                if not self._is_current(entry):
+                    continue
+                open_claims, open_amount, adjuster_id = entry
+                if self.max_open_claims and open_claims >= self.max_open_claims:
+                    # Everybody further down the heap is at least as loaded
+                    skipped.append(entry)
+                    break
+                if eligible is not None and adjuster_id not in eligible:
+                    skipped.append(entry)
+                    continue
+                chosen = adjuster_id
+                self._set(adjuster_id, open_claims + 1, open_amount + (amount or 0.0))
+                break
+            for entry in skipped:
+                heapq.heappush(self._heap, entry)
+            return chosen
+
+    def release(self, adjuster_id: Optional[int], amount: float = 0.0):
+        """A claim of adjuster_id left the open statuses"""
+        if adjuster_id is None:
+            return
+        with self._lock:
+            if adjuster_id in self._loads:
+                open_claims, open_amount = self._loads[adjuster_id]
+                self._set(adjuster_id, max(open_claims - 1, 0), max(open_amount - (amount or 0.0), 0.0))
+
+    def hold(self, adjuster_id: Optional[int], amount: float = 0.0):
+        """adjuster_id took over an open claim outside of pick()"""
+        if adjuster_id is None:
+            return
+        with self._lock:
+            open_claims, open_amount = self._loads.get(adjuster_id, (0, 0.0))
+            self._set(adjuster_id, open_claims + 1, open_amount + (amount or 0.0))
+
+    def queue_depths(self) -> List[dict]:
+        """Open claims per adjuster, least loaded first"""
+        with self._lock:
+            loads = sorted(self._loads.items(), key=lambda item: (item[1], item[0]))
+        return [
+            {"adjuster_id": adjuster_id, "open_claims": open_claims, "open_amount": round(open_amount, 2)}
+            for adjuster_id, (open_claims, open_amount) in loads
+        ]
+
+    def stats(self) -> dict:
+        depths = [load[0] for load in self._loads.values()]
+        return {
+            "adjusters": len(depths),
+            "open_claims": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "seconds_since_resync": round(time.monotonic() - self.synced_at, 1) if self.synced_at is not None else None
+        }
+
+adjuster_workload = AdjusterWorkload(
+    resync_seconds=settings.assignment_resync_seconds,
+    max_open_claims=settings.adjuster_max_open_claims,
+    roster=settings.adjuster_id_list
+)
+
+class AssignmentService:
+    """Picks adjusters for new claims from adjuster_workload, resyncing it from the claims table when due"""
+
+    def __init__(self, db: Session, workload: AdjusterWorkload = adjuster_workload):
+        self.db = db
+        self.workload = workload
+
+    def resync(self):
+        """
+        Rebuild open-claim counts and amounts with one grouped query (served by
+        ix_claims_pending_adjuster_id). The first sync of the process groups all claims
+        instead, so adjusters without open claims are known after a restart as well.
+        """
+        first_sync = self.workload.synced_at is None
+        is_open = Claim.status.in_(OPEN_CLAIM_STATUSES)
+        if first_sync:
+            query = select(
+                Claim.adjuster_id,
+                func.count(Claim.id).filter(is_open),
+                func.coalesce(func.sum(Claim.claim_amount).filter(is_open), 0)
+            ).where(Claim.adjuster_id.isnot(None))
+        else:
+            query = select(
+                Claim.adjuster_id,
+                func.count(Claim.id),
+                func.coalesce(func.sum(Claim.claim_amount), 0)
+            ).where(and_(Claim.adjuster_id.isnot(None), is_open))
+        rows = self.db.execute(query.group_by(Claim.adjuster_id)).all()
+        self.workload.load({adjuster_id: (count, float(amount)) for adjuster_id, count, amount in rows})
+        if first_sync and not self.workload.stats()["adjusters"]:
+            logger.warning(
+                "No adjusters known: set ADJUSTER_IDS, new claims stay unassigned until an adjuster is "
+                "given a claim or passed as a pool"
+            )
+
+    def _ensure_synced(self):
+        if self.workload.needs_resync():
+            self.resync()
+
+    def pick_adjuster(self, amount: Optional[float] = None, adjuster_ids: Optional[List[int]] = None) -> Optional[int]:
+        """Least loaded adjuster for one new claim, None when nobody is eligible"""
+        return self.pick_adjusters([amount], adjuster_ids)[0]
+
+    def pick_adjusters(self, amounts: List[Optional[float]], adjuster_ids: Optional[List[int]] = None) -> List[Optional[int]]:
+        """
+        Adjuster for each new claim amount, in order.
+        adjuster_ids restricts the choice to a pool, otherwise every known adjuster is eligible.
+        """
+        self._ensure_synced()
+        eligible = None
+        if adjuster_ids:
+            eligible = set(adjuster_ids)
+            self.workload.add(eligible)
+        return [self.workload.pick(amount or 0.0, eligible) for amount in amounts]
+
+    def queue_depths(self) -> List[dict]:
+        self._ensure_synced()
+        return self.workload.queue_depths()
+
+class AsyncAssignmentService(AsyncService):
+    """Async variant of AssignmentService"""
+    service_class = AssignmentService
+
+get_assignment_service = service_provider(AsyncAssignmentService)
@@ -0,0 +1,48 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
+from typing import Union
+from app.core.config import get_settings
+from app.db.database import get_db, get_async_db
+
+settings = get_settings()
+
+class AsyncService:
+    """
+    Awaitable variant of a synchronous service class.
+
+    Every public method of service_class becomes a coroutine. With an AsyncSession the
+    call runs through AsyncSession.run_sync, so queries go over asyncpg without blocking
+    the event loop; with a sync Session it runs in the threadpool.
+    """
+    service_class = None
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        self.db = db
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or not callable(getattr(self.service_class, name, None)):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            if isinstance(self.db, AsyncSession):
+                return await self.db.run_sync(
+                    lambda session: getattr(self.service_class(session), name)(*args, **kwargs)
+                )
+            return await run_in_threadpool(getattr(self.service_class(self.db), name), *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+def service_provider(async_service_class):
+    """
+    Build dependency returning async_service_class bound to the configured session type
+    """
+    if settings.db_async_enabled:
+        async def get_service(db: AsyncSession = Depends(get_async_db)):
+            return async_service_class(db)
+    else:
+        async def get_service(db: Session = Depends(get_db)):
+            return async_service_class(db)
+    return get_service
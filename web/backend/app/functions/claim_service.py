@@ -1,19 +1,59 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import or_, and_, func, select, insert
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
-from app.db.models import Claim, Contract, ClaimStatus
-from app.schemas.claim import ClaimCreate, ClaimUpdate, ClaimDecisionRequest, ClaimWithDetails
-import secrets
-import string
+from app.core.config import get_settings
+from app.db.models import Claim, Contract, ClaimStatus, ContractStatus
+from app.schemas.claim import (
+    ClaimCreate, ClaimUpdate, ClaimDecisionRequest, ClaimWithDetails,
+    ClaimSubmitRequest, ClaimBulkSubmitItemResult, ClaimBulkSubmitResponse
+)
+from app.utils.pagination import paginate
+from app.functions.search_service import SearchService
+from app.db.sequences import NumberAllocator
+from app.functions.async_service import AsyncService, service_provider
+from app.functions.assignment_service import AssignmentService, adjuster_workload, OPEN_CLAIM_STATUSES
+from app.functions.rollup_service import claim_rollup_change, add_claim_rollups
+from app.functions.event_bus import record_events
+from app.schemas.events import ClaimSubmitted, ClaimDecided, ClaimPaid, ClaimUpdated
+
+settings = get_settings()
+
+def parse_incident_date(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def submission_checklist(contract: Contract, submission: ClaimSubmitRequest) -> dict:
+    """Validation checklist of a claim submitted to an adjuster, every item must be True"""
+    incident_date = parse_incident_date(submission.incident_date)
+    return {
+        "contract_valid": True,
+        "contract_active": contract.status == ContractStatus.ACTIVE,
+        "incident_date_valid": incident_date is not None and incident_date <= date.today(),
+        "description_complete": len(submission.description) >= 20,
+        "amount_reasonable": submission.claim_amount <= contract.coverage_amount,
+        "documents_attached": len(submission.documents) > 0,
+        "contact_provided": submission.customer_contact is not None
+    }
+
+def estimated_processing_time(priority: str) -> str:
+    """Оценка времени обработки по приоритету"""
+    if priority == "urgent":
+        return "1-2 дня"
+    if priority == "high":
+        return "3-5 дней"
+    return "5-10 дней"
 
 class ClaimService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_claim(self, claim_data: ClaimCreate, created_by: Optional[int] = None) -> Claim:
-        """Create new claim"""
+    def create_claim(self, claim_data: ClaimCreate, created_by: Optional[int] = None, auto_assign: bool = False) -> Claim:
+        """Create new claim, with auto_assign it goes straight to the least loaded adjuster"""
         claim_number = self.generate_claim_number()
+        adjuster_id = AssignmentService(self.db).pick_adjuster(claim_data.claim_amount) if auto_assign else None
         
         claim = Claim(
             claim_number=claim_number,
@@ -21,16 +61,127 @@ class ClaimService:
             incident_date=claim_data.incident_date,
             description=claim_data.description,
             claim_amount=claim_data.claim_amount,
-            status=ClaimStatus.SUBMITTED,
+            status=ClaimStatus.UNDER_REVIEW if adjuster_id else ClaimStatus.SUBMITTED,
+            adjuster_id=adjuster_id,
             reported_date=date.today(),
             created_at=datetime.now()
         )
         
         self.db.add(claim)
+        self.db.flush()
+        record_events(self.db, ClaimSubmitted(
+            claim_id=claim.id,
+            contract_id=claim.contract_id,
+            status=claim.status.value,
+            claim_amount=claim.claim_amount,
+            adjuster_id=claim.adjuster_id
+        ))
+        add_claim_rollups(self.db, [claim.id])
         self.db.commit()
         self.db.refresh(claim)
         return claim
 
+    def submit_claims_bulk(
+        self,
+        submissions: List[ClaimSubmitRequest],
+        adjuster_ids: Optional[List[int]] = None,
+        created_by: Optional[int] = None
+    ) -> ClaimBulkSubmitResponse:
+        """
+        Submit many claims at once.
+        All referenced contracts are fetched with one query and every claim goes through
+        submission_checklist; the valid ones are inserted with multi-row INSERTs, already
+        assigned to the least loaded of adjuster_ids, and committed in one transaction.
+        """
+        results = [ClaimBulkSubmitItemResult(index=index, success=False) for index in range(len(submissions))]
+        
+        contract_ids = {submission.contract_id for submission in submissions}
+        contracts = {
+            contract.id: contract
+            for contract in self.db.execute(select(Contract).where(Contract.id.in_(contract_ids))).scalars()
+        } if contract_ids else {}
+        
+        valid = []
+        for index, submission in enumerate(submissions):
+            contract = contracts.get(submission.contract_id)
+            if contract is None:
+                results[index].error = "Contract not found"
+                continue
+            if contract.status != ContractStatus.ACTIVE:
+                results[index].error = "Contract is not active"
+                continue
+            checklist = submission_checklist(contract, submission)
+            results[index].validation_checklist = checklist
+            if not all(checklist.values()):
+                results[index].error = "Validation failed"
+                continue
+            valid.append(index)
+        
+        adjusters = AssignmentService(self.db).pick_adjusters(
+            [submissions[index].claim_amount for index in valid], adjuster_ids
+        )
+        numbers = NumberAllocator(self.db).claim_numbers(len(valid))
+        now = datetime.now()
+        rows = []
+        for index, number, adjuster_id in zip(valid, numbers, adjusters):
+            submission = submissions[index]
+            rows.append({
+                "claim_number": number,
+                "contract_id": submission.contract_id,
+                "incident_date": parse_incident_date(submission.incident_date),
+                "description": submission.description,
+                "claim_amount": submission.claim_amount,
+                "status": ClaimStatus.UNDER_REVIEW if adjuster_id else ClaimStatus.SUBMITTED,
+                "adjuster_id": adjuster_id,
+                "reported_date": now.date(),
+                "created_at": now
+            })
+        
+        ids_by_number = {}
+        for start in range(0, len(rows), settings.bulk_chunk_size):
+            inserted = self.db.execute(
+                insert(Claim.__table__).returning(Claim.id, Claim.claim_number),
+                rows[start:start + settings.bulk_chunk_size]
+            ).all()
+            ids_by_number.update({row.claim_number: row.id for row in inserted})
+        record_events(self.db, *[
+            ClaimSubmitted(
+                claim_id=ids_by_number[row["claim_number"]],
+                contract_id=row["contract_id"],
+                status=row["status"].value,
+                claim_amount=row["claim_amount"],
+                adjuster_id=row["adjuster_id"]
+            )
+            for row in rows
+        ])
+        add_claim_rollups(self.db, list(ids_by_number.values()))
+        self.db.commit()
+        
+        for index, row in zip(valid, rows):
+            results[index].success = True
+            results[index].claim_id = ids_by_number.get(row["claim_number"])
+            results[index].claim_number = row["claim_number"]
+            results[index].status = row["status"].value
+            results[index].adjuster_id = row["adjuster_id"]
+            results[index].estimated_processing_time = estimated_processing_time(submissions[index].priority)
+        
+        return ClaimBulkSubmitResponse(
+            created=len(rows),
+            failed=len(submissions) - len(rows),
+            assigned=sum(1 for row in rows if row["adjuster_id"]),
+            results=results
+        )
+
+    def _open_holder(self, claim: Claim) -> Optional[int]:
+        """Adjuster whose queue the claim counts against, None once it is decided"""
+        return claim.adjuster_id if claim.status in OPEN_CLAIM_STATUSES else None
+
+    def _update_workload(self, claim: Claim, previous_holder: Optional[int]):
+        holder = self._open_holder(claim)
+        if holder != previous_holder:
+            adjuster_workload.release(previous_holder, claim.claim_amount)
+            adjuster_workload.hold(holder, claim.claim_amount)
+
     def get_claim(self, claim_id: int) -> Optional[Claim]:
         """Get claim by ID"""
         return self.db.query(Claim).filter(Claim.id == claim_id).first()
@@ -39,6 +190,10 @@ class ClaimService:
         """Get claim by claim number"""
         return self.db.query(Claim).filter(Claim.claim_number == claim_number).first()
 
+    def get_contract(self, contract_id: int) -> Optional[Contract]:
+        """Get contract the claim is filed against"""
+        return self.db.query(Contract).filter(Contract.id == contract_id).first()
+
     def get_claims(
         self, 
         skip: int = 0, 
@@ -47,9 +202,11 @@ class ClaimService:
         adjuster_id: Optional[int] = None,
         status: Optional[ClaimStatus] = None,
         search: Optional[str] = None,
-        status_filter: Optional[str] = None
-    ) -> tuple[List[ClaimWithDetails], int]:
-        """Get list of claims with pagination and filters"""
+        status_filter: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[ClaimWithDetails], Optional[int], Optional[str]]:
+        """Get list of claims with pagination (skip/limit or cursor) and filters"""
         from app.db.models import Client, Contract
         
         query = self.db.query(
@@ -68,19 +225,21 @@ class ClaimService:
         
         if status:
             query = query.filter(Claim.status == status)
-            
+        
         if status_filter:
             query = query.filter(Claim.status == status_filter)
         
         if search:
-            search_filter = or_(
-                Claim.claim_number.ilike(f"%{search}%"),
-                Claim.description.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-        
-        total = query.count()
-        results = query.offset(skip).limit(limit).all()
+            # Best matches first, a keyset cursor over ids cannot follow that order
+            if cursor:
+                raise ValueError("cursor cannot be combined with search, use skip")
+            search_service = SearchService(self.db)
+            query = query.filter(search_service.claim_condition(search)).order_by(search_service.claim_rank(search).desc())
+        
+        total = query.count() if include_total else None
+        results, next_cursor = paginate(query, Claim.id, skip, limit, cursor, get_id=lambda row: row[0].id)
+        if search:
+            next_cursor = None
         
         # Convert to ClaimWithDetails
         claims_with_details = []
@@ -105,7 +264,7 @@ class ClaimService:
             }
             claims_with_details.append(ClaimWithDetails(**claim_dict))
         
-        return claims_with_details, total
+        return claims_with_details, total, next_cursor
 
     def get_claim_with_details(self, claim_id: int) -> Optional[ClaimWithDetails]:
         """Get claim with full details"""
@@ -121,7 +280,7 @@ class ClaimService:
         
         if not result:
             return None
-            
+        
         claim, contract_number, client_name = result
         
         return ClaimWithDetails(
@@ -143,8 +302,15 @@ class ClaimService:
             adjuster_name=f"Урегулировщик {claim.adjuster_id}" if claim.adjuster_id else None
         )
 
-    def get_pending_claims(self, skip: int = 0, limit: int = 100, adjuster_id: Optional[int] = None) -> tuple[List[ClaimWithDetails], int]:
-        """Get pending claims for adjustment"""
+    def get_pending_claims(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        adjuster_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[ClaimWithDetails], Optional[int], Optional[str]]:
+        """Get pending claims for adjustment with pagination (skip/limit or cursor)"""
         from app.db.models import Client, Contract
         
         query = self.db.query(
@@ -158,8 +324,8 @@ class ClaimService:
         if adjuster_id:
             query = query.filter(Claim.adjuster_id == adjuster_id)
         
-        total = query.count()
-        results = query.offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        results, next_cursor = paginate(query, Claim.id, skip, limit, cursor, get_id=lambda row: row[0].id)
         
         # Convert to ClaimWithDetails
         pending_claims = []
@@ -184,37 +350,53 @@ class ClaimService:
             }
             pending_claims.append(ClaimWithDetails(**claim_dict))
         
-        return pending_claims, total
+        return pending_claims, total, next_cursor
 
     def make_decision(self, claim_id: int, decision_data: ClaimDecisionRequest, adjuster_id: int) -> Optional[Claim]:
         """Make decision on claim (adjuster only)"""
         claim = self.get_claim(claim_id)
         if not claim:
             return None
-        
-        # Update claim based on decision
-        if decision_data.decision == "approved":
-            claim.status = ClaimStatus.APPROVED
-            claim.approved_amount = decision_data.approved_amount or claim.claim_amount
-        elif decision_data.decision == "rejected":
-            claim.status = ClaimStatus.REJECTED
-            claim.approved_amount = 0
-        else:  # requires_investigation
-            claim.status = ClaimStatus.UNDER_REVIEW
-        
-        # Update notes
-        decision_note = f"Решение: {decision_data.decision}"
-        if decision_data.notes:
-            decision_note += f" - {decision_data.notes}"
-        if decision_data.rejection_reason:
-            decision_note += f" (Причина отказа: {decision_data.rejection_reason})"
+        previous_holder = self._open_holder(claim)
+        previous_status = claim.status
+        previous_approved_amount = claim.approved_amount
+        
+        with claim_rollup_change(self.db, [claim.id]):
+            # Update claim based on decision
+            if decision_data.decision == "approved":
+                claim.status = ClaimStatus.APPROVED
+                claim.approved_amount = decision_data.approved_amount or claim.claim_amount
+            elif decision_data.decision == "rejected":
+                claim.status = ClaimStatus.REJECTED
+                claim.approved_amount = 0
+            else:  # requires_investigation
+                claim.status = ClaimStatus.UNDER_REVIEW
             
-        claim.adjuster_notes = (claim.adjuster_notes or "") + f"\n{decision_note}"
-        claim.adjuster_id = adjuster_id
-        claim.updated_at = datetime.now()
+            # Update notes
+            decision_note = f"Решение: {decision_data.decision}"
+            if decision_data.notes:
+                decision_note += f" - {decision_data.notes}"
+            if decision_data.rejection_reason:
+                decision_note += f" (Причина отказа: {decision_data.rejection_reason})"
+            
+            claim.adjuster_notes = (claim.adjuster_notes or "") + f"\n{decision_note}"
+            claim.adjuster_id = adjuster_id
+            claim.updated_at = datetime.now()
         
+        record_events(self.db, ClaimDecided(
+            claim_id=claim.id,
+            contract_id=claim.contract_id,
+            status=claim.status.value,
+            claim_amount=claim.claim_amount,
+            adjuster_id=adjuster_id,
+            previous_status=previous_status.value,
+            decision=decision_data.decision.value,
+            approved_amount=claim.approved_amount,
+            previous_approved_amount=previous_approved_amount
+        ))
         self.db.commit()
         self.db.refresh(claim)
+        self._update_workload(claim, previous_holder)
         return claim
 
     def update_claim(self, claim_id: int, claim_data: ClaimUpdate) -> Optional[Claim]:
@@ -222,30 +404,53 @@ class ClaimService:
         claim = self.get_claim(claim_id)
         if not claim:
             return None
+        previous_holder = self._open_holder(claim)
+        previous_status = claim.status
         
         update_data = claim_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(claim, field, value)
-        
-        claim.updated_at = datetime.now()
+        with claim_rollup_change(self.db, [claim.id]):
+            for field, value in update_data.items():
+                setattr(claim, field, value)
+            
+            claim.updated_at = datetime.now()
+        record_events(self.db, self._updated_event(claim, previous_status, update_data))
         self.db.commit()
         self.db.refresh(claim)
+        self._update_workload(claim, previous_holder)
         return claim
 
+    @staticmethod
+    def _updated_event(claim: Claim, previous_status, fields) -> ClaimUpdated:
+        return ClaimUpdated(
+            claim_id=claim.id,
+            contract_id=claim.contract_id,
+            status=claim.status.value,
+            claim_amount=claim.claim_amount,
+            adjuster_id=claim.adjuster_id,
+            previous_status=previous_status.value,
+            approved_amount=claim.approved_amount,
+            fields=sorted(fields)
+        )
+
     def assign_adjuster(self, claim_id: int, adjuster_id: int) -> Optional[Claim]:
         """Assign adjuster to claim"""
         claim = self.get_claim(claim_id)
         if not claim:
             return None
+        previous_holder = self._open_holder(claim)
         
         if claim.status not in [ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW]:
             raise ValueError("Cannot assign adjuster to processed claim")
         
-        claim.adjuster_id = adjuster_id
-        claim.status = ClaimStatus.UNDER_REVIEW
+        previous_status = claim.status
+        with claim_rollup_change(self.db, [claim.id]):
+            claim.adjuster_id = adjuster_id
+            claim.status = ClaimStatus.UNDER_REVIEW
         
+        record_events(self.db, self._updated_event(claim, previous_status, ["adjuster_id", "status"]))
         self.db.commit()
         self.db.refresh(claim)
+        self._update_workload(claim, previous_holder)
         return claim
 
     def mark_as_paid(self, claim_id: int) -> Optional[Claim]:
@@ -257,27 +462,25 @@ class ClaimService:
         if claim.status != ClaimStatus.APPROVED:
             raise ValueError("Only approved claims can be marked as paid")
         
-        claim.status = ClaimStatus.PAID
+        with claim_rollup_change(self.db, [claim.id]):
+            claim.status = ClaimStatus.PAID
         
+        record_events(self.db, ClaimPaid(
+            claim_id=claim.id,
+            contract_id=claim.contract_id,
+            status=claim.status.value,
+            claim_amount=claim.claim_amount,
+            adjuster_id=claim.adjuster_id,
+            previous_status=ClaimStatus.APPROVED.value,
+            approved_amount=claim.approved_amount
+        ))
         self.db.commit()
         self.db.refresh(claim)
         return claim
 
     def generate_claim_number(self) -> str:
-        """Generate unique claim number"""
-        while True:
-            # Format: CLM-YYYY-XXXXXXX
-            year = datetime.now().year
-            random_part = ''.join(secrets.choice(string.digits) for _ in range(7))
-            claim_number = f"CLM-{year}-{random_part}"
-            
-            # Check if it's unique
-            existing = self.db.query(Claim).filter(
-                Claim.claim_number == claim_number
-            ).first()
-            
-            if not existing:
-                return claim_number
+        """Generate unique claim number (CLM-YYYY-NNNNNNN) from the per-year sequence"""
+        return NumberAllocator(self.db).claim_number()
 
     def get_claim_statistics(self, adjuster_id: Optional[int] = None, contract_id: Optional[int] = None) -> dict:
         """Get claim statistics"""
@@ -329,7 +532,7 @@ class ClaimService:
         if not contract:
             return {"eligible": False, "reason": "Contract not found"}
         
-        if contract.status != "active":
+        if contract.status != ContractStatus.ACTIVE:
             return {"eligible": False, "reason": "Contract is not active"}
         
         if incident_date < contract.start_date:
@@ -345,4 +548,10 @@ class ClaimService:
         # Additional eligibility checks can be added here
         # e.g., waiting periods, exclusions, etc.
         
-        return {"eligible": True, "reason": "Claim is eligible for processing"} 
\ No newline at end of file
+        return {"eligible": True, "reason": "Claim is eligible for processing"}
+
+class AsyncClaimService(AsyncService):
+    """Async variant of ClaimService"""
+    service_class = ClaimService
+
+get_claim_service = service_provider(AsyncClaimService)
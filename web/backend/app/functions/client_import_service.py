@@ -0,0 +1,182 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert
+from pydantic import ValidationError
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+import csv
+import io
+import json
+from app.core.config import get_settings
+from app.db.models import Client
+from app.db.sequences import NumberAllocator
+from app.schemas.client import ClientCreate, ClientImportReport, ClientImportError
+from app.functions.async_service import AsyncService, service_provider
+
+settings = get_settings()
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Column order of the COPY statement and of executemany rows
+IMPORT_COLUMNS = (
+    "first_name", "last_name", "email", "phone", "address",
+    "date_of_birth", "identification_number", "created_by"
+)
+
+def iter_csv_records(stream: TextIO) -> Iterator[dict]:
+    """Rows of a CSV file with a header line, read one line at a time"""
+    for row in csv.DictReader(stream):
+        # Empty cells are missing values, not empty strings
+        yield {key: value for key, value in row.items() if key and value not in (None, "")}
+
+def iter_ndjson_records(stream: TextIO) -> Iterator[dict]:
+    """One JSON object per line, blank lines are skipped"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # Reported as an invalid row instead of aborting the import
+            yield None
+
+def iter_records(stream: TextIO, file_format: str) -> Iterator[dict]:
+    if file_format == "csv":
+        return iter_csv_records(stream)
+    if file_format == "ndjson":
+        return iter_ndjson_records(stream)
+    raise ValueError(f"Unsupported import format: {file_format}")
+
+def detect_format(filename: Optional[str]) -> str:
+    """Import format from the file extension (.csv, .ndjson/.jsonl)"""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ValueError("Cannot detect import format, pass format=csv or format=ndjson")
+
+class ClientImportService:
+    """
+    Streaming client import.
+    
+    Records are consumed lazily and handled in chunks: every chunk is validated with
+    ClientCreate, checked against existing emails with one query, gets identification
+    numbers from the client id sequence and is written with COPY (PostgreSQL with
+    psycopg2) or a single executemany INSERT, then committed. Memory use depends on
+    the chunk size only, not on the file size.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_stream(
+        self,
+        stream: TextIO,
+        file_format: str,
+        created_by: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[ClientImportReport], None]] = None
+    ) -> ClientImportReport:
+        """Import a CSV or NDJSON text stream"""
+        return self.import_records(iter_records(stream, file_format), created_by, chunk_size, progress)
+
+    def import_records(
+        self,
+        records: Iterable[dict],
+        created_by: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[ClientImportReport], None]] = None
+    ) -> ClientImportReport:
+        """Import client records, calling progress with the running report after every chunk"""
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        report = ClientImportReport()
+        
+        chunk = []
+        for row_number, record in enumerate(records, start=1):
+            chunk.append((row_number, record))
+            if len(chunk) >= chunk_size:
+                self._import_chunk(chunk, created_by, report)
+                chunk = []
+                if progress:
+                    progress(report)
+        if chunk:
+            self._import_chunk(chunk, created_by, report)
+            if progress:
+                progress(report)
+        
+        return report
+
+    def _import_chunk(self, chunk: List[tuple], created_by: Optional[int], report: ClientImportReport):
+        report.processed += len(chunk)
+        
+        valid: Dict[str, dict] = {}
+        for row_number, record in chunk:
+            if not isinstance(record, dict):
+                report.invalid += 1
+                self._add_error(report, row_number, "Record is not a JSON object")
+                continue
+            try:
+                client = ClientCreate(**record)
+            except ValidationError as e:
+                report.invalid += 1
+                self._add_error(report, row_number, "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ))
+                continue
+            if client.email in valid:
+                report.duplicates += 1
+                continue
+            valid[client.email] = {**client.dict(), "created_by": created_by}
+        
+        if valid:
+            existing = set(self.db.execute(
+                select(Client.email).where(Client.email.in_(list(valid)))
+            ).scalars())
+            for email in existing:
+                del valid[email]
+            report.duplicates += len(existing)
+        
+        rows = list(valid.values())
+        missing_ids = [row for row in rows if not row["identification_number"]]
+        for row, client_id in zip(missing_ids, NumberAllocator(self.db).client_ids(len(missing_ids))):
+            row["identification_number"] = client_id
+        
+        if rows:
+            self._write_rows(rows)
+        self.db.commit()
+        report.created += len(rows)
+        report.chunks += 1
+
+    def _write_rows(self, rows: List[dict]):
+        connection = self.db.connection()
+        if connection.dialect.name == "postgresql":
+            cursor = connection.connection.cursor()
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2: COPY is the fastest way to load rows, server defaults still apply
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow(["\\N" if row[column] is None else row[column] for column in IMPORT_COLUMNS])
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY clients ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer
+                )
+                cursor.close()
+                return
+            cursor.close()
+        connection.execute(
+            insert(Client.__table__),
+            [{column: row[column] for column in IMPORT_COLUMNS} for row in rows]
+        )
+
+    def _add_error(self, report: ClientImportReport, row_number: int, error: str):
+        # Keep the report small for files with millions of bad rows
+        if len(report.errors) < settings.client_import_max_errors:
+            report.errors.append(ClientImportError(row=row_number, error=error))
+
+class AsyncClientImportService(AsyncService):
+    """Async variant of ClientImportService"""
+    service_class = ClientImportService
+
+get_client_import_service = service_provider(AsyncClientImportService)
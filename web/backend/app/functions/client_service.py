@@ -3,8 +3,12 @@ from sqlalchemy import and_, or_
 from typing import List, Optional, Tuple
 from ..db.models import Client, Contract, ContractStatus
 from ..schemas.client import ClientCreate, ClientUpdate
-import secrets
-import string
+from ..db.sequences import NumberAllocator
+from ..utils.pagination import paginate
+from .search_service import SearchService
+from .async_service import AsyncService, service_provider
+from .event_bus import record_events
+from ..schemas.events import ClientUpdated
 
 class ClientService:
     def __init__(self, db: Session):
@@ -40,28 +44,24 @@ class ClientService:
         skip: int = 0, 
         limit: int = 100, 
         search: Optional[str] = None,
-        created_by: Optional[int] = None
-    ) -> Tuple[List[Client], int]:
-        """Get list of clients with pagination and search"""
+        created_by: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Client], Optional[int], Optional[str]]:
+        """Get list of clients with pagination (skip/limit or cursor) and search"""
         query = self.db.query(Client)
         
         # Apply filters
         if search:
-            search_filter = or_(
-                Client.first_name.ilike(f"%{search}%"),
-                Client.last_name.ilike(f"%{search}%"),
-                Client.email.ilike(f"%{search}%"),
-                Client.phone.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
+            query = query.filter(SearchService(self.db).client_condition(search))
         
         if created_by:
             query = query.filter(Client.created_by == created_by)
         
-        total = query.count()
-        clients = query.offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        clients, next_cursor = paginate(query, Client.id, skip, limit, cursor)
         
-        return clients, total
+        return clients, total, next_cursor
 
     def update_client(self, client_id: int, client_data: ClientUpdate) -> Optional[Client]:
         """Update client"""
@@ -73,6 +73,7 @@ class ClientService:
         for field, value in update_data.items():
             setattr(client, field, value)
         
+        record_events(self.db, ClientUpdated(client_id=client.id, fields=sorted(update_data)))
         self.db.commit()
         self.db.refresh(client)
         return client
@@ -102,29 +103,12 @@ class ClientService:
         return active_contracts > 0
 
     def search_clients(self, query: str, limit: int = 10) -> List[Client]:
-        """Search clients by name, email or phone"""
-        search_filter = or_(
-            Client.first_name.ilike(f"%{query}%"),
-            Client.last_name.ilike(f"%{query}%"),
-            Client.email.ilike(f"%{query}%"),
-            Client.phone.ilike(f"%{query}%")
-        )
-        
-        return self.db.query(Client).filter(search_filter).limit(limit).all()
+        """Search clients by name, email or phone, best matches first"""
+        return SearchService(self.db).search_clients(query, limit)
 
     def generate_client_id(self) -> str:
-        """Generate unique client identification number"""
-        while True:
-            # Generate 8-character alphanumeric ID
-            client_id = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
-            
-            # Check if it's unique
-            existing = self.db.query(Client).filter(
-                Client.identification_number == client_id
-            ).first()
-            
-            if not existing:
-                return client_id
+        """Generate unique client identification number from the client id sequence"""
+        return NumberAllocator(self.db).client_id()
 
     def get_client_statistics(self, client_id: int) -> dict:
         """Get client statistics"""
@@ -143,4 +127,10 @@ class ClientService:
             )
         }
         
-        return stats 
\ No newline at end of file
+        return stats
+
+class AsyncClientService(AsyncService):
+    """Async variant of ClientService"""
+    service_class = ClientService
+
+get_client_service = service_provider(AsyncClientService)
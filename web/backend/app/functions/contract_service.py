@@ -1,14 +1,23 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select, insert
 from typing import List, Optional, Tuple
 from datetime import date, datetime, timedelta
 from ..db.models import Contract, Client, InsuranceProduct, ContractStatus
 from ..schemas.contract import (
     ContractCreate, ContractUpdate, PremiumCalculationParams, 
-    PremiumCalculationResult, ContractWithDetails
+    PremiumCalculationResult, ContractWithDetails, ContractBulkItemResult, ContractBulkResult
 )
-import secrets
-import string
+from ..core.config import get_settings
+from ..utils.pagination import paginate
+from ..db.sequences import NumberAllocator
+from .async_service import AsyncService, service_provider
+from .rollup_service import contract_rollup_change, add_contract_rollups
+from .product_catalog import CatalogProduct, product_catalog
+from .rating import RatingTable, rating_tables, quote_batch
+from .event_bus import record_events
+from ..schemas.events import ContractCreated, ContractActivated, ContractSuspended, ContractCancelled, ContractUpdated
+
+settings = get_settings()
 
 class ContractService:
     def __init__(self, db: Session):
@@ -26,14 +35,100 @@ class ContractService:
         )
         
         self.db.add(contract)
+        self.db.flush()
+        record_events(self.db, self._created_event(contract.id, contract.contract_number, contract_data, agent_id))
+        add_contract_rollups(self.db, [contract.id])
         self.db.commit()
         self.db.refresh(contract)
         return contract
 
+    @staticmethod
+    def _created_event(contract_id: int, contract_number: str, contract_data: ContractCreate, agent_id: int) -> ContractCreated:
+        # New contracts are always drafts
+        return ContractCreated(
+            contract_id=contract_id,
+            contract_number=contract_number,
+            status=ContractStatus.DRAFT.value,
+            premium_amount=contract_data.premium_amount,
+            client_id=contract_data.client_id,
+            product_id=contract_data.product_id,
+            agent_id=agent_id
+        )
+
+    def create_contracts_bulk(
+        self,
+        contracts_data: List[ContractCreate],
+        agent_id: int,
+        chunk_size: Optional[int] = None
+    ) -> ContractBulkResult:
+        """
+        Create many contracts at once.
+        Clients are validated with one query, products with the catalog, numbers are allocated per
+        chunk and every chunk is a single multi-row INSERT committed on its own. Items with
+        unknown client or product are reported and skipped, the rest are created.
+        """
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        results = [ContractBulkItemResult(index=index, success=False) for index in range(len(contracts_data))]
+        
+        client_ids = {item.client_id for item in contracts_data}
+        product_ids = {item.product_id for item in contracts_data}
+        existing_clients = set(self.db.execute(
+            select(Client.id).where(Client.id.in_(client_ids))
+        ).scalars()) if client_ids else set()
+        existing_products = set(product_catalog.get_many(self.db, product_ids))
+        
+        valid = []
+        for index, item in enumerate(contracts_data):
+            if item.client_id not in existing_clients:
+                results[index].error = "Client not found"
+            elif item.product_id not in existing_products:
+                results[index].error = "Insurance product not found"
+            else:
+                valid.append(index)
+        
+        allocator = NumberAllocator(self.db)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            numbers = allocator.contract_numbers(len(chunk))
+            rows = [
+                {**contracts_data[index].dict(), "contract_number": number, "agent_id": agent_id, "status": ContractStatus.DRAFT}
+                for index, number in zip(chunk, numbers)
+            ]
+            inserted = self.db.execute(
+                insert(Contract.__table__).returning(Contract.id, Contract.contract_number),
+                rows
+            ).all()
+            ids_by_number = {row.contract_number: row.id for row in inserted}
+            record_events(self.db, *[
+                self._created_event(ids_by_number[number], number, contracts_data[index], agent_id)
+                for index, number in zip(chunk, numbers)
+            ])
+            add_contract_rollups(self.db, list(ids_by_number.values()))
+            self.db.commit()
+            
+            for index, number in zip(chunk, numbers):
+                results[index].success = True
+                results[index].contract_id = ids_by_number.get(number)
+                results[index].contract_number = number
+        
+        return ContractBulkResult(
+            created=len(valid),
+            failed=len(contracts_data) - len(valid),
+            results=results
+        )
+
     def get_contract(self, contract_id: int) -> Optional[Contract]:
         """Get contract by ID"""
         return self.db.query(Contract).filter(Contract.id == contract_id).first()
 
+    def get_client(self, client_id: int) -> Optional[Client]:
+        """Get client referenced by a contract"""
+        return self.db.query(Client).filter(Client.id == client_id).first()
+
+    def get_product(self, product_id: int) -> Optional[CatalogProduct]:
+        """Get insurance product referenced by a contract (from the product catalog)"""
+        return product_catalog.get(self.db, product_id)
+
     def get_contract_with_details(self, contract_id: int) -> Optional[ContractWithDetails]:
         """Get contract with related details"""
         contract_query = self.db.query(Contract).options(
@@ -65,9 +160,11 @@ class ContractService:
         client_id: Optional[int] = None,
         agent_id: Optional[int] = None,
         status: Optional[ContractStatus] = None,
-        product_id: Optional[int] = None
-    ) -> Tuple[List[ContractWithDetails], int]:
-        """Get list of contracts with pagination and filters"""
+        product_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[ContractWithDetails], Optional[int], Optional[str]]:
+        """Get list of contracts with pagination (skip/limit or cursor) and filters"""
         query = self.db.query(Contract).options(
             joinedload(Contract.client),
             joinedload(Contract.product)
@@ -86,8 +183,8 @@ class ContractService:
         if product_id:
             query = query.filter(Contract.product_id == product_id)
         
-        total = query.count()
-        contracts = query.offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        contracts, next_cursor = paginate(query, Contract.id, skip, limit, cursor)
         
         # Convert to ContractWithDetails
         contracts_with_details = []
@@ -100,18 +197,30 @@ class ContractService:
             }
             contracts_with_details.append(ContractWithDetails(**contract_dict))
         
-        return contracts_with_details, total
+        return contracts_with_details, total, next_cursor
 
     def update_contract(self, contract_id: int, contract_data: ContractUpdate) -> Optional[Contract]:
         """Update contract"""
         contract = self.get_contract(contract_id)
         if not contract:
             return None
+        previous_status = contract.status
+        previous_premium_amount = contract.premium_amount
         
         update_data = contract_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(contract, field, value)
+        with contract_rollup_change(self.db, [contract.id]):
+            for field, value in update_data.items():
+                setattr(contract, field, value)
         
+        record_events(self.db, ContractUpdated(
+            contract_id=contract.id,
+            status=contract.status.value,
+            premium_amount=contract.premium_amount,
+            previous_status=previous_status.value,
+            previous_premium_amount=previous_premium_amount,
+            created_at=contract.created_at,
+            fields=sorted(update_data)
+        ))
         self.db.commit()
         self.db.refresh(contract)
         return contract
@@ -125,7 +234,14 @@ class ContractService:
         if contract.status != ContractStatus.DRAFT:
             return False
         
-        contract.status = ContractStatus.ACTIVE
+        with contract_rollup_change(self.db, [contract.id]):
+            contract.status = ContractStatus.ACTIVE
+        record_events(self.db, ContractActivated(
+            contract_id=contract.id,
+            status=contract.status.value,
+            previous_status=ContractStatus.DRAFT.value,
+            premium_amount=contract.premium_amount
+        ))
         self.db.commit()
         return True
 
@@ -138,7 +254,14 @@ class ContractService:
         if contract.status != ContractStatus.ACTIVE:
             raise ValueError("Only active contracts can be suspended")
         
-        contract.status = ContractStatus.SUSPENDED
+        with contract_rollup_change(self.db, [contract.id]):
+            contract.status = ContractStatus.SUSPENDED
+        record_events(self.db, ContractSuspended(
+            contract_id=contract.id,
+            status=contract.status.value,
+            previous_status=ContractStatus.ACTIVE.value,
+            premium_amount=contract.premium_amount
+        ))
         self.db.commit()
         self.db.refresh(contract)
         return contract
@@ -152,75 +275,50 @@ class ContractService:
         if contract.status in [ContractStatus.EXPIRED, ContractStatus.CANCELLED]:
             raise ValueError("Contract is already cancelled or expired")
         
-        contract.status = ContractStatus.CANCELLED
+        previous_status = contract.status
+        with contract_rollup_change(self.db, [contract.id]):
+            contract.status = ContractStatus.CANCELLED
+        record_events(self.db, ContractCancelled(
+            contract_id=contract.id,
+            status=contract.status.value,
+            previous_status=previous_status.value,
+            premium_amount=contract.premium_amount
+        ))
         self.db.commit()
         self.db.refresh(contract)
         return contract
 
     def calculate_premium(self, params: PremiumCalculationParams, product: InsuranceProduct) -> PremiumCalculationResult:
-        """Calculate premium based on parameters and product"""
-        base_premium = product.base_premium * (params.coverage_amount / 100000)  # Base rate per 100k coverage
-        risk_factors = params.risk_factors
-        
-        # Risk factor calculations
-        risk_multiplier = 1.0
-        calculation_details = {
-            "product_name": product.name,
-            "base_coverage": product.coverage_amount,
-            "requested_coverage": params.coverage_amount,
-            "risk_factors_applied": {}
-        }
-        
-        # Age factor
-        if params.client_age:
-            age = params.client_age
-            if age < 25:
-                risk_multiplier *= 1.2
-                calculation_details["risk_factors_applied"]["young_age"] = 0.2
-            elif age > 65:
-                risk_multiplier *= 1.1
-                calculation_details["risk_factors_applied"]["senior_age"] = 0.1
-        
-        # Coverage amount factor
-        if params.coverage_amount > 500000:
-            risk_multiplier *= 1.1
-            calculation_details["risk_factors_applied"]["high_coverage"] = 0.1
-        
-        # Custom risk factors
-        for factor, value in risk_factors.items():
-            if factor == "high_risk_area" and value:
-                risk_multiplier *= 1.15
-                calculation_details["risk_factors_applied"]["high_risk_area"] = 0.15
-            elif factor == "previous_claims" and isinstance(value, (int, float)):
-                risk_multiplier *= (1 + value * 0.1)
-                calculation_details["risk_factors_applied"]["previous_claims"] = value * 0.1
-            elif factor == "security_systems" and value:
-                risk_multiplier *= 0.9
-                calculation_details["risk_factors_applied"]["security_systems"] = -0.1
-        
-        final_premium = base_premium * risk_multiplier
-        monthly_premium = final_premium / params.duration_months
+        """Calculate premium based on parameters and the product's rating table"""
+        return PremiumCalculationResult(**RatingTable(product).quote(params))
+
+    def quote_premium(self, params: PremiumCalculationParams) -> Optional[PremiumCalculationResult]:
+        """Calculate premium with the cached compiled rating table, None when the product does not exist"""
+        table = rating_tables.get(self.db, params.product_id)
+        if table is None:
+            return None
+        return PremiumCalculationResult(**table.quote(params))
+
+    def calculate_premiums(self, params_list: List[PremiumCalculationParams]) -> dict:
+        """
+        Price many quotes at once (vectorized), each result equals calculate_premium for the same params.
+        Returns PremiumBatchResult data as plain dicts, validated once when the response is serialized.
+        """
+        tables = rating_tables.get_many(self.db, {params.product_id for params in params_list})
         
-        return PremiumCalculationResult(
-            base_premium=round(base_premium, 2),
-            risk_multiplier=round(risk_multiplier, 2),
-            final_premium=round(final_premium, 2),
-            monthly_premium=round(monthly_premium, 2),
-            calculation_details=calculation_details
-        )
+        items = []
+        for index, (params, result) in enumerate(zip(params_list, quote_batch(params_list, tables))):
+            if result is not None:
+                items.append({"index": index, "result": result})
+            elif params.product_id not in tables:
+                items.append({"index": index, "error": "Insurance product not found"})
+            else:
+                items.append({"index": index, "error": "duration_months must not be 0"})
+        return {"results": items}
 
     def generate_contract_number(self) -> str:
-        """Generate unique contract number"""
-        while True:
-            # Generate format: CON-YYYY-XXXXXX
-            year = datetime.now().year
-            random_part = ''.join(secrets.choice(string.digits) for _ in range(6))
-            contract_number = f"CON-{year}-{random_part}"
-            
-            # Check if it's unique
-            existing = self.get_contract_by_number(contract_number)
-            if not existing:
-                return contract_number
+        """Generate unique contract number (CON-YYYY-NNNNNN) from the per-year sequence"""
+        return NumberAllocator(self.db).contract_number()
 
     def get_contracts_expiring_soon(self, days: int = 30) -> List[Contract]:
         """Get contracts expiring within specified days"""
@@ -253,4 +351,10 @@ class ContractService:
             "total_coverage_volume": sum(c.coverage_amount for c in all_contracts)
         }
         
-        return stats 
\ No newline at end of file
+        return stats
+
+class AsyncContractService(AsyncService):
+    """Async variant of ContractService"""
+    service_class = ContractService
+
+get_contract_service = service_provider(AsyncContractService)
@@ -0,0 +1,247 @@
+"""
+Live dashboard counters.
+
+The dashboard summary (active contracts, pending claims, revenue this month, claims ratio)
+is read from the few rows of dashboard_counters instead of being recounted over contracts
+and claims. The write paths already record domain events on their session; right before
+the transaction commits, the counter deltas of those events are applied with one UPDATE,
+so a counter changes in the same transaction as the rows it counts.
+
+Changes that publish no event (manual SQL, scripts working on the tables directly) and
+float rounding are corrected by reconcile(), which recounts every counter from the source
+tables. It runs periodically and whenever a counter row is missing (fresh database, first
+read of a month).
+"""
+from sqlalchemy import event, func, select, update, insert, delete, case, true, bindparam, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from collections import defaultdict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from datetime import date, timedelta
+import asyncio
+import logging
+from app.core.config import get_settings
+from app.db.database import SessionLocal
+from app.db.models import Contract, Claim, ContractStatus, ClaimStatus, DashboardCounter
+from app.functions.async_service import AsyncService, service_provider
+from app.functions.assignment_service import OPEN_CLAIM_STATUSES
+from app.functions.event_bus import PENDING_EVENTS_KEY
+from app.schemas.events import (
+    DomainEvent, ContractCreated, ContractStatusChanged, ContractUpdated,
+    ClaimSubmitted, ClaimDecided, ClaimPaid, ClaimUpdated
+)
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+CONTRACTS_ACTIVE = "contracts_active"
+CLAIMS_PENDING = "claims_pending"
+CLAIMS_APPROVED_AMOUNT = "claims_approved_amount"
+REVENUE_TOTAL = "revenue_total"
+
+PENDING_CLAIM_STATUSES = {status.value for status in OPEN_CLAIM_STATUSES}
+
+counters_table = DashboardCounter.__table__
+
+_reconciler_task: Optional[asyncio.Task] = None
+
+def revenue_counter(day: date) -> str:
+    """Premiums of contracts created in the month of day"""
+    return f"revenue:{day:%Y-%m}"
+
+def month_to_date(column, today: date):
+    """column in the month of today, up to the end of today (rows dated later are left out)"""
+    return and_(column >= today.replace(day=1), column < today + timedelta(days=1))
+
+class CounterSnapshot(NamedTuple):
+    """Dashboard counters under the names of AnalyticsService.get_dashboard_snapshot()"""
+    contracts_active: int
+    claims_pending: int
+    claims_approved_amount: float
+    revenue_total: float
+    revenue_mtd: float
+
+def _claim_measures(status: Optional[str], approved_amount: Optional[float]) -> Tuple[int, float]:
+    """What one claim contributes to (claims_pending, claims_approved_amount)"""
+    if status in PENDING_CLAIM_STATUSES:
+        return 1, 0.0
+    if status == ClaimStatus.APPROVED.value:
+        return 0, approved_amount or 0.0
+    return 0, 0.0
+
+def _is_active(status: Optional[str]) -> int:
+    return int(status == ContractStatus.ACTIVE.value)
+
+def counter_deltas(events: Iterable[DomainEvent]) -> Dict[str, float]:
+    """Change of every counter caused by events, counters that do not change are left out"""
+    deltas: Dict[str, float] = defaultdict(float)
+    for domain_event in events:
+        if isinstance(domain_event, ContractCreated):
+            premium = domain_event.premium_amount or 0.0
+            deltas[REVENUE_TOTAL] += premium
+            deltas[revenue_counter(domain_event.occurred_at)] += premium
+            deltas[CONTRACTS_ACTIVE] += _is_active(domain_event.status)
+        elif isinstance(domain_event, ContractStatusChanged):
+            deltas[CONTRACTS_ACTIVE] += _is_active(domain_event.status) - _is_active(domain_event.previous_status)
+        elif isinstance(domain_event, ContractUpdated):
+            deltas[CONTRACTS_ACTIVE] += _is_active(domain_event.status) - _is_active(domain_event.previous_status)
+            premium_change = (domain_event.premium_amount or 0.0) - (domain_event.previous_premium_amount or 0.0)
+            deltas[REVENUE_TOTAL] += premium_change
+            if domain_event.created_at is not None:
+                deltas[revenue_counter(domain_event.created_at)] += premium_change
+        elif isinstance(domain_event, (ClaimSubmitted, ClaimDecided, ClaimPaid, ClaimUpdated)):
+            if isinstance(domain_event, ClaimDecided):
+                previous = _claim_measures(domain_event.previous_status, domain_event.previous_approved_amount)
+                current = _claim_measures(domain_event.status, domain_event.approved_amount)
+            elif isinstance(domain_event, (ClaimPaid, ClaimUpdated)):
+                previous = _claim_measures(domain_event.previous_status, domain_event.approved_amount)
+                current = _claim_measures(domain_event.status, domain_event.approved_amount)
+            else:
+                previous = (0, 0.0)
+                current = _claim_measures(domain_event.status, None)
+            deltas[CLAIMS_PENDING] += current[0] - previous[0]
+            deltas[CLAIMS_APPROVED_AMOUNT] += current[1] - previous[1]
+    return {name: delta for name, delta in deltas.items() if delta}
+
+class CounterService:
+    """Applies, recounts and reads the rows of dashboard_counters"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, deltas: Dict[str, float]):
+        """Add deltas to the counters in the current transaction (one UPDATE, missing rows are skipped)"""
+        if not deltas:
+            return
+        self.db.execute(
+            update(counters_table)
+            .where(counters_table.c.name.in_(list(deltas)))
+            .values(
+                value=counters_table.c.value + case(deltas, value=counters_table.c.name, else_=0),
+                updated_at=func.now()
+            )
+        )
+
+    def count(self) -> Dict[str, float]:
+        """Counter values counted from contracts and claims in a single query"""
+        today = date.today()
+        
+        contracts_stats = select(
+            func.count(Contract.id).filter(Contract.status == ContractStatus.ACTIVE).label('contracts_active'),
+            func.coalesce(func.sum(Contract.premium_amount), 0).label('revenue_total'),
+            func.coalesce(
+                func.sum(Contract.premium_amount).filter(month_to_date(Contract.created_at, today)), 0
+            ).label('revenue_mtd')
+        ).subquery()
+        
+        claims_stats = select(
+            func.count(Claim.id).filter(Claim.status.in_(OPEN_CLAIM_STATUSES)).label('claims_pending'),
+            func.coalesce(
+                func.sum(Claim.approved_amount).filter(Claim.status == ClaimStatus.APPROVED), 0
+            ).label('claims_approved_amount')
+        ).subquery()
+        
+        row = self.db.execute(
+            select(contracts_stats, claims_stats).select_from(contracts_stats.join(claims_stats, true()))
+        ).one()
+        return {
+            CONTRACTS_ACTIVE: row.contracts_active,
+            CLAIMS_PENDING: row.claims_pending,
+            CLAIMS_APPROVED_AMOUNT: float(row.claims_approved_amount),
+            REVENUE_TOTAL: float(row.revenue_total),
+            revenue_counter(today): float(row.revenue_mtd)
+        }
+
+    def reconcile(self) -> Dict[str, float]:
+        """Overwrite the counters with values counted from the source tables, returns them"""
+        values = self.count()
+        stored = dict(self.db.execute(select(counters_table.c.name, counters_table.c.value)).all())
+        
+        for name, value in values.items():
+            if name in stored and abs(stored[name] - value) > 1e-6:
+                logger.warning("Dashboard counter %s drifted by %s", name, stored[name] - value)
+        
+        # Past months are no longer read
+        outdated = set(stored) - set(values)
+        if outdated:
+            self.db.execute(delete(counters_table).where(counters_table.c.name.in_(outdated)))
+        existing = [{"counter": name, "new_value": values[name]} for name in values if name in stored]
+        if existing:
+            self.db.execute(
+                update(counters_table)
+                .where(counters_table.c.name == bindparam("counter"))
+                .values(value=bindparam("new_value"), updated_at=func.now()),
+                existing
+            )
+        missing = [{"name": name, "value": value} for name, value in values.items() if name not in stored]
+        if missing:
+            self.db.execute(insert(counters_table), missing)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another worker created the rows meanwhile, with the same values
+            self.db.rollback()
+        return values
+
+    def read(self) -> CounterSnapshot:
+        """Current counters with one primary key lookup, reconciled first if a row is missing"""
+        month = revenue_counter(date.today())
+        names = [CONTRACTS_ACTIVE, CLAIMS_PENDING, CLAIMS_APPROVED_AMOUNT, REVENUE_TOTAL, month]
+        values = dict(self.db.execute(
+            select(counters_table.c.name, counters_table.c.value).where(counters_table.c.name.in_(names))
+        ).all())
+        if len(values) < len(names):
+            values = self.reconcile()
+        return CounterSnapshot(
+            contracts_active=int(round(values[CONTRACTS_ACTIVE])),
+            claims_pending=int(round(values[CLAIMS_PENDING])),
+            claims_approved_amount=values[CLAIMS_APPROVED_AMOUNT],
+            revenue_total=values[REVENUE_TOTAL],
+            revenue_mtd=values[month]
+        )
+
+@event.listens_for(Session, "before_commit")
+def _apply_event_deltas(session: Session):
+    events = session.info.get(PENDING_EVENTS_KEY)
+    if settings.dashboard_counters_enabled and events:
+        CounterService(session).apply(counter_deltas(events))
+
+def _reconcile_counters():
+    db = SessionLocal()
+    try:
+        CounterService(db).reconcile()
+    finally:
+        db.close()
+
+async def _run_reconciler(interval_seconds: int):
+    while True:
+        try:
+            await run_in_threadpool(_reconcile_counters)
+        except Exception:
+            logger.exception("Dashboard counter reconciliation failed")
+        await asyncio.sleep(interval_seconds)
+
+async def start_counter_reconciler():
+    """Reconcile dashboard counters now and then periodically (FastAPI startup hook)"""
+    global _reconciler_task
+    if settings.dashboard_counters_enabled and settings.dashboard_counters_reconcile_seconds > 0 and _reconciler_task is None:
+        _reconciler_task = asyncio.create_task(_run_reconciler(settings.dashboard_counters_reconcile_seconds))
+
+async def stop_counter_reconciler():
+    """Cancel periodic reconciliation (FastAPI shutdown hook)"""
+    global _reconciler_task
+    if _reconciler_task is not None:
+        _reconciler_task.cancel()
+        try:
+            await _reconciler_task
+        except asyncio.CancelledError:
+            pass
+        _reconciler_task = None
+
+class AsyncCounterService(AsyncService):
+    """Async variant of CounterService"""
+    service_class = CounterService
+
+get_counter_service = service_provider(AsyncCounterService)
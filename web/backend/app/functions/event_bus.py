@@ -0,0 +1,158 @@
+"""
+Domain event bus.
+
+Services record events on their session with record_events() before committing. The
+events are published only when the transaction commits (SQLAlchemy after_commit) and
+dropped on rollback, so subscribers never see changes that did not happen.
+
+Publishing only puts the events on a queue: a background thread calls the subscribers,
+so a write does not wait for cache invalidation or counter updates. Subscribers are
+plain functions or coroutine functions; coroutines run on the application event loop
+once start_event_bus() has been called (on their own loop otherwise, e.g. in scripts).
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Dict, Iterable, List, Optional, Type
+import asyncio
+import inspect
+import logging
+import os
+import queue
+import threading
+from app.schemas.events import DomainEvent
+
+PENDING_EVENTS_KEY = "pending_domain_events"
+
+logger = logging.getLogger(__name__)
+
+class EventBus:
+    """Typed publish/subscribe with asynchronous dispatch on a worker thread"""
+
+    def __init__(self, handler_timeout: float = 30.0):
+        self.handler_timeout = handler_timeout
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.dispatched = 0
+        self.failed = 0
+        self._subscribers: Dict[Type[DomainEvent], List[Callable]] = {}
+        self._queue: "queue.Queue[DomainEvent]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: Callable):
+        """Call handler with every event of event_type (subclasses included)"""
+        with self._lock:
+            self._subscribers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: Type[DomainEvent], handler: Callable):
+        with self._lock:
+            handlers = self._subscribers.get(event_type, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def subscriber(self, *event_types: Type[DomainEvent]):
+        """Decorator form of subscribe()"""
+        def decorator(handler):
+            for event_type in event_types:
+                self.subscribe(event_type, handler)
+            return handler
+        return decorator
+
+    def handlers_for(self, domain_event: DomainEvent) -> List[Callable]:
+        with self._lock:
+            return [
+                handler
+                for event_type, handlers in self._subscribers.items()
+                if isinstance(domain_event, event_type)
+                for handler in handlers
+            ]
+
+    def publish(self, events: Iterable[DomainEvent]):
+        """Queue events for the subscribers, returns immediately"""
+        self._ensure_worker()
+        for domain_event in events:
+            self.published += 1
+            self._queue.put(domain_event)
+
+    def _ensure_worker(self):
+        # The worker thread does not survive a fork, the child starts its own
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive() or self._worker_pid != os.getpid():
+                self._worker = threading.Thread(target=self._run, name="event-bus", daemon=True)
+                self._worker_pid = os.getpid()
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            domain_event = self._queue.get()
+            try:
+                self.dispatch(domain_event)
+            finally:
+                self._queue.task_done()
+
+    def dispatch(self, domain_event: DomainEvent):
+        """Call every subscriber of domain_event now, one failing subscriber does not stop the others"""
+        for handler in self.handlers_for(domain_event):
+            try:
+                result = handler(domain_event)
+                if inspect.isawaitable(result):
+                    self._await(result)
+                self.dispatched += 1
+            except Exception:
+                self.failed += 1
+                logger.exception(
+                    "Event subscriber %s failed for %s",
+                    getattr(handler, "__name__", handler), type(domain_event).__name__
+                )
+
+    def _await(self, awaitable):
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(awaitable, self.loop).result(timeout=self.handler_timeout)
+        else:
+            asyncio.run(awaitable)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every published event was dispatched, False on timeout"""
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        return done.wait(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "dispatched": self.dispatched,
+            "failed": self.failed,
+            "queued": self._queue.qsize()
+        }
+
+event_bus = EventBus()
+
+def record_events(db: Session, *events: DomainEvent):
+    """Publish events when the current transaction of db commits"""
+    db.info.setdefault(PENDING_EVENTS_KEY, []).extend(events)
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session):
+    events = session.info.pop(PENDING_EVENTS_KEY, None)
+    if events:
+        event_bus.publish(events)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session: Session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+async def start_event_bus():
+    """Run coroutine subscribers on the application loop (FastAPI startup hook)"""
+    event_bus.loop = asyncio.get_running_loop()
+
+async def stop_event_bus():
+    """Let queued events reach their subscribers (FastAPI shutdown hook)"""
+    await run_in_threadpool(event_bus.wait_idle, event_bus.handler_timeout)
+    event_bus.loop = None
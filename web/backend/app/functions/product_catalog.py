@@ -0,0 +1,137 @@
+"""
+Process-level insurance product catalog.
+
+Products change a few times a month but are read on every product listing, quote and
+contract creation. The catalog keeps a snapshot of every product by id plus the list
+of active ones, loaded with one query at startup (or on first use). Product writes in
+routers/products.py store the committed row right away (write-through), a full reload
+every product_cache_ttl_seconds picks up writes made by other processes.
+
+Each change bumps version; etag is a hash of the active list content, so every process
+with the same catalog hands out the same ETag.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+from app.core.config import get_settings
+from app.db.database import SessionLocal
+from app.db.models import InsuranceProduct
+
+settings = get_settings()
+
+class CatalogProduct:
+    """Detached copy of an InsuranceProduct row"""
+    
+    __slots__ = ("id", "name", "description", "base_premium", "coverage_amount", "rating_table", "is_active")
+
+    def __init__(self, product: InsuranceProduct):
+        for field in self.__slots__:
+            setattr(self, field, getattr(product, field))
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class ProductCatalog:
+    """Product snapshots by id and the active product list, versioned"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.etag: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._products: Dict[int, CatalogProduct] = {}
+        self._active: List[CatalogProduct] = []
+
+    def _publish(self, products: Dict[int, CatalogProduct]):
+        # Called with the lock held
+        self._products = products
+        self._active = [product for _, product in sorted(products.items()) if product.is_active]
+        content = json.dumps([product.as_dict() for product in self._active], sort_keys=True, default=str)
+        self.etag = f'"{hashlib.sha1(content.encode()).hexdigest()[:20]}"'
+        self.version += 1
+
+    def load(self, db: Session):
+        """Replace the catalog with all products, unchanged products keep their snapshot"""
+        rows = db.execute(select(InsuranceProduct)).scalars().all()
+        with self._lock:
+            products = {}
+            for row in rows:
+                product = CatalogProduct(row)
+                current = self._products.get(product.id)
+                products[product.id] = current if current is not None and current.as_dict() == product.as_dict() else product
+            self._publish(products)
+            self.loaded_at = time.monotonic()
+
+    def needs_reload(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= self.ttl_seconds
+
+    def _ensure_loaded(self, db: Session):
+        if self.needs_reload():
+            self.load(db)
+
+    def store(self, product: InsuranceProduct) -> CatalogProduct:
+        """Write-through after a committed product change"""
+        snapshot = CatalogProduct(product)
+        with self._lock:
+            # Before the first load there is nothing to update, the load reads the change
+            if self.loaded_at is not None:
+                self._publish({**self._products, product.id: snapshot})
+        return snapshot
+
+    def invalidate(self):
+        """Forget all products, the next use reloads them"""
+        with self._lock:
+            self._products = {}
+            self._active = []
+            self.etag = None
+            self.loaded_at = None
+
+    def active(self, db: Session) -> Tuple[List[CatalogProduct], str]:
+        """Active products ordered by id and the ETag of that list"""
+        self._ensure_loaded(db)
+        with self._lock:
+            return self._active, self.etag
+
+    def get_many(self, db: Session, product_ids: Iterable[int]) -> Dict[int, CatalogProduct]:
+        """Snapshots of the existing products among product_ids, active or not"""
+        self._ensure_loaded(db)
+        product_ids = set(product_ids)
+        with self._lock:
+            found = {product_id: self._products[product_id] for product_id in product_ids if product_id in self._products}
+        
+        missing = product_ids - set(found)
+        if missing:
+            # Created by another process since the last load
+            for row in db.execute(select(InsuranceProduct).where(InsuranceProduct.id.in_(missing))).scalars():
+                found[row.id] = self.store(row)
+        return found
+
+    def get(self, db: Session, product_id: int) -> Optional[CatalogProduct]:
+        return self.get_many(db, [product_id]).get(product_id)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "products": len(self._products),
+            "active": len(self._active),
+            "seconds_since_load": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at is not None else None
+        }
+
+product_catalog = ProductCatalog(ttl_seconds=settings.product_cache_ttl_seconds)
+
+def _load_catalog():
+    db = SessionLocal()
+    try:
+        product_catalog.load(db)
+    finally:
+        db.close()
+
+async def load_product_catalog():
+    """Populate the catalog (FastAPI startup hook)"""
+    await run_in_threadpool(_load_catalog)
@@ -0,0 +1,295 @@
+"""
+Premium rating tables.
+
+A product's rating table holds the age and coverage bands and the custom risk factor
+multipliers used to price quotes. InsuranceProduct.rating_table overrides parts of
+DEFAULT_RATING_TABLE, which holds the rules premiums were always calculated with.
+Tables are compiled once per product (sorted band bounds, looked up with bisect or
+searchsorted, and multiplier vectors) and kept in rating_tables until the product
+changes in product_catalog, so pricing a quote needs no database access.
+
+quote_batch prices many PremiumCalculationParams at once with NumPy column operations
+and returns exactly what RatingTable.quote returns for each of them, as plain dicts
+(PremiumCalculationResult fields) so large batches skip per-item model validation.
+Bit-identical floats need the same multiplication order as the scalar path, so the
+custom risk factor multipliers of every quote are kept in the order they were given
+and applied column by column within groups of quotes with the same number of factors.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+from app.db.models import InsuranceProduct
+from app.functions.product_catalog import product_catalog
+from app.schemas.contract import PremiumCalculationParams
+
+COVERAGE_UNIT = 100000  # Base rate per 100k coverage
+
+# Band i covers values up to and including upper_bounds[i], the last band everything above.
+# factors name the entry reported in risk_factors_applied, None bands are not reported
+# (their multiplier still applies, 1.0 in the default table).
+DEFAULT_RATING_TABLE = {
+    "age": {
+        "upper_bounds": [24, 65],
+        "multipliers": [1.2, 1.0, 1.1],
+        "factors": ["young_age", None, "senior_age"]
+    },
+    "coverage": {
+        "upper_bounds": [500000],
+        "multipliers": [1.0, 1.1],
+        "factors": [None, "high_coverage"]
+    },
+    "risk_factors": {
+        "high_risk_area": 1.15,
+        "security_systems": 0.9,
+        "previous_claims_step": 0.1  # multiplier is 1 + previous_claims * step
+    }
+}
+
+def _factor_detail(multiplier: float) -> float:
+    # Reported as the surcharge, 1.2 - 1 would show as 0.19999999999999996
+    return round(multiplier - 1, 10)
+
+class RatingBands:
+    """Banded multipliers of one quote attribute (age or coverage)"""
+
+    def __init__(self, spec: dict):
+        self.upper_bounds = [float(bound) for bound in spec["upper_bounds"]]
+        self.multipliers = [float(multiplier) for multiplier in spec["multipliers"]]
+        self.factors = list(spec.get("factors") or [None] * len(self.multipliers))
+        if len(self.multipliers) != len(self.upper_bounds) + 1 or len(self.factors) != len(self.multipliers):
+            raise ValueError("bands need one multiplier and factor more than upper bounds")
+        if self.upper_bounds != sorted(self.upper_bounds):
+            raise ValueError("band upper bounds must be sorted")
+        self.details = [_factor_detail(multiplier) for multiplier in self.multipliers]
+        self.bounds_array = np.array(self.upper_bounds, dtype=float)
+        self.multipliers_array = np.array(self.multipliers, dtype=float)
+
+    def band(self, value: float) -> int:
+        return bisect_left(self.upper_bounds, value)
+
+    def bands(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized band(), searchsorted side="left" is bisect_left"""
+        return np.searchsorted(self.bounds_array, values, side="left")
+
+class RatingTable:
+    """Compiled rating table of a product, with the product fields needed for quotes"""
+
+    def __init__(self, product: InsuranceProduct):
+        spec = product.rating_table or {}
+        self.product_id = product.id
+        self.product_name = product.name
+        self.base_premium = product.base_premium
+        self.base_coverage = product.coverage_amount
+        self.age = RatingBands(spec.get("age") or DEFAULT_RATING_TABLE["age"])
+        self.coverage = RatingBands(spec.get("coverage") or DEFAULT_RATING_TABLE["coverage"])
+        risk_factors = {**DEFAULT_RATING_TABLE["risk_factors"], **(spec.get("risk_factors") or {})}
+        self.high_risk_area = float(risk_factors["high_risk_area"])
+        self.security_systems = float(risk_factors["security_systems"])
+        self.previous_claims_step = float(risk_factors["previous_claims_step"])
+        self.high_risk_area_detail = _factor_detail(self.high_risk_area)
+        self.security_systems_detail = _factor_detail(self.security_systems)
+        self.source = None  # catalog snapshot the table was compiled from
+
+    def factor(self, name: str, value) -> Optional[tuple]:
+        """(multiplier, detail) of a custom risk factor, None when it does not apply"""
+        if name == "high_risk_area" and value:
+            return self.high_risk_area, self.high_risk_area_detail
+        if name == "previous_claims" and isinstance(value, (int, float)):
+            return 1 + value * self.previous_claims_step, value * self.previous_claims_step
+        if name == "security_systems" and value:
+            return self.security_systems, self.security_systems_detail
+        return None
+
+    def quote(self, params: PremiumCalculationParams) -> dict:
+        """Premium of one quote as PremiumCalculationResult fields"""
+        base_premium = self.base_premium * (params.coverage_amount / COVERAGE_UNIT)
+        risk_multiplier = 1.0
+        applied = {}
+        
+        if params.client_age:
+            band = self.age.band(params.client_age)
+            risk_multiplier *= self.age.multipliers[band]
+            if self.age.factors[band]:
+                applied[self.age.factors[band]] = self.age.details[band]
+        
+        band = self.coverage.band(params.coverage_amount)
+        risk_multiplier *= self.coverage.multipliers[band]
+        if self.coverage.factors[band]:
+            applied[self.coverage.factors[band]] = self.coverage.details[band]
+        
+        for name, value in params.risk_factors.items():
+            factor = self.factor(name, value)
+            if factor is not None:
+                risk_multiplier *= factor[0]
+                applied[name] = factor[1]
+        
+        final_premium = base_premium * risk_multiplier
+        monthly_premium = final_premium / params.duration_months
+        return self.result(params, base_premium, risk_multiplier, final_premium, monthly_premium, applied)
+
+    def result(self, params, base_premium, risk_multiplier, final_premium, monthly_premium, applied) -> dict:
+        return {
+            "base_premium": round(base_premium, 2),
+            "risk_multiplier": round(risk_multiplier, 2),
+            "final_premium": round(final_premium, 2),
+            "monthly_premium": round(monthly_premium, 2),
+            "calculation_details": {
+                "product_name": self.product_name,
+                "base_coverage": self.base_coverage,
+                "requested_coverage": params.coverage_amount,
+                "risk_factors_applied": applied
+            }
+        }
+
+def validate_rating_table(spec: Optional[dict]):
+    """Raise ValueError when spec cannot be compiled"""
+    if spec is None:
+        return
+    if not isinstance(spec, dict):
+        raise ValueError("Invalid rating table: expected an object")
+    try:
+        RatingTable(InsuranceProduct(name="", base_premium=0.0, rating_table=spec))
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid rating table: {e}")
+
+class RatingTableCache:
+    """
+    Compiled rating tables by product id.
+    Products come from product_catalog; a table is recompiled when the catalog holds a
+    different snapshot of its product (write-through update or reload).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: Dict[int, RatingTable] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, db: Session, product_ids: Iterable[int]) -> Dict[int, RatingTable]:
+        """Tables of the existing products among product_ids"""
+        products = product_catalog.get_many(db, product_ids)
+        tables = {}
+        with self._lock:
+            for product_id, product in products.items():
+                table = self._tables.get(product_id)
+                if table is None or table.source is not product:
+                    table = RatingTable(product)
+                    table.source = product
+                    self._tables[product_id] = table
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                tables[product_id] = table
+        return tables
+
+    def get(self, db: Session, product_id: int) -> Optional[RatingTable]:
+        return self.get_many(db, [product_id]).get(product_id)
+
+    def invalidate(self, product_id: Optional[int] = None):
+        """Drop the table of product_id, or every table"""
+        with self._lock:
+            if product_id is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(product_id, None)
+
+    def stats(self) -> dict:
+        return {"tables": len(self._tables), "hits": self.hits, "misses": self.misses}
+
+rating_tables = RatingTableCache()
+
+def quote_batch(
+    params_list: List[PremiumCalculationParams],
+    tables: Dict[int, RatingTable]
+) -> List[Optional[dict]]:
+    """Premium for every quote, None where the product has no table or duration_months is 0"""
+    count = len(params_list)
+    if count == 0:
+        return []
+    
+    priced = [params.product_id in tables and params.duration_months != 0 for params in params_list]
+    product_ids = np.array([params.product_id for params in params_list], dtype=np.int64)
+    coverage = np.array([params.coverage_amount for params in params_list], dtype=float)
+    # client_age None or 0 means no age factor, like the truthiness check of the scalar path
+    ages = np.array([params.client_age or 0 for params in params_list], dtype=np.int64)
+    durations = np.array([params.duration_months or 1 for params in params_list], dtype=float)
+    
+    base_rate = np.zeros(count)
+    age_band = np.zeros(count, dtype=np.int64)
+    coverage_band = np.zeros(count, dtype=np.int64)
+    age_multiplier = np.ones(count)
+    coverage_multiplier = np.ones(count)
+    for product_id, table in tables.items():
+        rows = np.nonzero(product_ids == product_id)[0]
+        if len(rows) == 0:
+            continue
+        base_rate[rows] = table.base_premium
+        age_band[rows] = table.age.bands(ages[rows])
+        coverage_band[rows] = table.coverage.bands(coverage[rows])
+        age_multiplier[rows] = table.age.multipliers_array[age_band[rows]]
+        coverage_multiplier[rows] = table.coverage.multipliers_array[coverage_band[rows]]
+    age_multiplier[ages == 0] = 1.0
+    
+    base_premium = base_rate * (coverage / COVERAGE_UNIT)
+    # Multiplying by 1.0 is exact, so bands without a factor can stay in the product
+    risk_multiplier = np.ones(count) * age_multiplier * coverage_multiplier
+    
+    # Custom factors: quotes grouped by how many apply, column i holds each quote's i-th multiplier
+    groups: Dict[int, List[int]] = {}
+    applied_factors: List[List[tuple]] = []
+    for index, params in enumerate(params_list):
+        applied = []
+        table = tables.get(params.product_id)
+        if table is not None:
+            for name, value in params.risk_factors.items():
+                factor = table.factor(name, value)
+                if factor is not None:
+                    applied.append((name, factor[0], factor[1]))
+        applied_factors.append(applied)
+        if applied:
+            groups.setdefault(len(applied), []).append(index)
+    for size, indexes in groups.items():
+        columns = np.array([[multiplier for _, multiplier, _ in applied_factors[index]] for index in indexes], dtype=float)
+        group_multiplier = risk_multiplier[indexes]
+        for position in range(size):
+            group_multiplier = group_multiplier * columns[:, position]
+        risk_multiplier[indexes] = group_multiplier
+    
+    final_premium = base_premium * risk_multiplier
+    monthly_premium = final_premium / durations
+    
+    results: List[Optional[dict]] = []
+    for row in zip(
+        params_list, priced, ages.tolist(), age_band.tolist(), coverage_band.tolist(), applied_factors,
+        base_premium.tolist(), risk_multiplier.tolist(), final_premium.tolist(), monthly_premium.tolist()
+    ):
+        params, is_priced, age, age_index, coverage_index, factors, base, multiplier, final, monthly = row
+        if not is_priced:
+            results.append(None)
+            continue
+        table = tables[params.product_id]
+        applied = {}
+        age_factor = table.age.factors[age_index]
+        if age and age_factor:
+            applied[age_factor] = table.age.details[age_index]
+        coverage_factor = table.coverage.factors[coverage_index]
+        if coverage_factor:
+            applied[coverage_factor] = table.coverage.details[coverage_index]
+        for name, _, detail in factors:
+            applied[name] = detail
+        # Python round() on each value, numpy rounding differs on ties
+        results.append({
+            "base_premium": round(base, 2),
+            "risk_multiplier": round(multiplier, 2),
+            "final_premium": round(final, 2),
+            "monthly_premium": round(monthly, 2),
+            "calculation_details": {
+                "product_name": table.product_name,
+                "base_coverage": table.base_coverage,
+                "requested_coverage": params.coverage_amount,
+                "risk_factors_applied": applied
+            }
+        })
+    return results
@@ -0,0 +1,294 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, select, delete, case, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from starlette.concurrency import run_in_threadpool
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Union
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+from app.core.config import get_settings
+from app.db.database import SessionLocal
+from app.db.models import Contract, Claim, DailyContractRollup, DailyClaimRollup
+from app.functions.async_service import AsyncService, service_provider
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# First key of the per-day rebuild advisory locks (int4), the second one is the day ordinal
+CONTRACT_ROLLUP_LOCK = 721_044_710
+CLAIM_ROLLUP_LOCK = 721_044_711
+
+_refresher_task: Optional[asyncio.Task] = None
+
+def _as_day(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+def _contract_groups(condition, sign: int = 1):
+    """Contracts matching condition per rollup group, counts and sums multiplied by sign"""
+    day = func.date(Contract.created_at)
+    return select(
+        day,
+        Contract.product_id,
+        Contract.agent_id,
+        Contract.status,
+        func.count(Contract.id) * sign,
+        func.coalesce(func.sum(Contract.premium_amount), 0) * sign,
+        func.min(Contract.id)
+    ).where(condition).group_by(day, Contract.product_id, Contract.agent_id, Contract.status)
+
+def _claim_groups(condition, sign: int = 1):
+    """Claims matching condition per rollup group, counts and sums multiplied by sign"""
+    day = func.date(Claim.created_at)
+    updated_day = func.date(Claim.updated_at)
+    return select(
+        day,
+        updated_day,
+        Contract.product_id,
+        Claim.adjuster_id,
+        Claim.status,
+        func.count(Claim.id) * sign,
+        func.coalesce(func.sum(func.coalesce(Claim.claim_amount, 0)), 0) * sign,
+        func.sum(Claim.approved_amount) * sign,
+        func.count(Claim.approved_amount) * sign,
+        func.min(Claim.id)
+    ).outerjoin(
+        Contract, Contract.id == Claim.contract_id
+    ).where(condition).group_by(day, updated_day, Contract.product_id, Claim.adjuster_id, Claim.status)
+
+CONTRACT_ROLLUP_COLUMNS = ['day', 'product_id', 'agent_id', 'status', 'contracts_count', 'premium_sum', 'first_contract_id']
+CLAIM_ROLLUP_COLUMNS = [
+    'day', 'updated_day', 'product_id', 'adjuster_id', 'status', 'claims_count',
+    'claimed_amount_sum', 'approved_amount_sum', 'approved_count', 'first_claim_id'
+]
+
+class RollupService:
+    """
+    Maintains daily_contract_rollups and daily_claim_rollups.
+    
+    Write paths keep the rollups current with signed deltas: the groups a changed row
+    belonged to are decremented (withdraw_*) and the groups it belongs to afterwards are
+    incremented (add_*), each with one INSERT ... SELECT ... ON CONFLICT DO UPDATE on the
+    unique group index. A write therefore costs the same on a busy day as on a quiet one
+    and only waits for writes to the same group. Groups that drop to zero rows are deleted.
+    
+    first_*_id only ever decreases through deltas, so after a row leaves its group it may
+    point to that row until the periodic refresh rebuilds the day as a whole (delete +
+    the same upsert from the raw tables). Rebuilds take a transaction-level advisory lock
+    per day on PostgreSQL, so two rebuilds of a day never add their rows twice; write-path
+    deltas committed meanwhile are added on top of the rebuilt rows.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _lock_days(self, namespace: int, start_day: date, end_day: date):
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        # Always in ascending order, so rebuilds of overlapping ranges cannot deadlock
+        days = [start_day.toordinal() + offset for offset in range((end_day - start_day).days + 1)]
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, day) FROM unnest(CAST(:days AS integer[])) AS day"),
+            {"namespace": namespace, "days": days}
+        )
+
+    def _upsert(self, rollup, columns, groups, counters, first_id):
+        """Add groups to the rollup rows with the same key, creating missing rows"""
+        upsert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = upsert(rollup).from_select(columns, groups)
+        table, excluded = rollup.__table__, statement.excluded
+        values = {column: table.c[column] + excluded[column] for column in counters}
+        values[first_id] = case(
+            (table.c[first_id] <= excluded[first_id], table.c[first_id]), else_=excluded[first_id]
+        )
+        values['refreshed_at'] = func.now()
+        if rollup is DailyClaimRollup:
+            values['approved_amount_sum'] = case(
+                (table.c.approved_count + excluded.approved_count > 0,
+                 func.coalesce(table.c.approved_amount_sum, 0) + func.coalesce(excluded.approved_amount_sum, 0)),
+                else_=None
+            )
+        key = next(index for index in table.indexes if index.unique).expressions
+        self.db.execute(statement.on_conflict_do_update(index_elements=key, set_=values))
+
+    def _apply_contracts(self, condition, sign: int):
+        self._upsert(
+            DailyContractRollup, CONTRACT_ROLLUP_COLUMNS, _contract_groups(condition, sign),
+            ['contracts_count', 'premium_sum'], 'first_contract_id'
+        )
+
+    def _apply_claims(self, condition, sign: int):
+        self._upsert(
+            DailyClaimRollup, CLAIM_ROLLUP_COLUMNS, _claim_groups(condition, sign),
+            ['claims_count', 'claimed_amount_sum', 'approved_count'], 'first_claim_id'
+        )
+
+    def withdraw_contracts(self, contract_ids: List[int]):
+        """Take contracts out of their rollup groups, call before changing them"""
+        self._apply_contracts(Contract.id.in_(contract_ids), -1)
+
+    def add_contracts(self, contract_ids: List[int]):
+        """Count new or changed (flushed) contracts into their rollup groups"""
+        self._apply_contracts(Contract.id.in_(contract_ids), 1)
+        self.db.execute(delete(DailyContractRollup).where(
+            DailyContractRollup.contracts_count <= 0,
+            DailyContractRollup.day.in_(select(func.date(Contract.created_at)).where(Contract.id.in_(contract_ids)))
+        ))
+
+    def withdraw_claims(self, claim_ids: List[int]):
+        """Take claims out of their rollup groups, call before changing them"""
+        self._apply_claims(Claim.id.in_(claim_ids), -1)
+
+    def add_claims(self, claim_ids: List[int]):
+        """Count new or changed (flushed) claims into their rollup groups"""
+        self._apply_claims(Claim.id.in_(claim_ids), 1)
+        self.db.execute(delete(DailyClaimRollup).where(
+            DailyClaimRollup.claims_count <= 0,
+            DailyClaimRollup.day.in_(select(func.date(Claim.created_at)).where(Claim.id.in_(claim_ids)))
+        ))
+
+    def refresh_contract_days(self, start_day: Union[date, datetime], end_day: Union[date, datetime, None] = None):
+        """Rebuild contract rollups for contracts created in [start_day, end_day]"""
+        start_day = _as_day(start_day)
+        end_day = _as_day(end_day) if end_day is not None else start_day
+        self._lock_days(CONTRACT_ROLLUP_LOCK, start_day, end_day)
+        
+        self.db.query(DailyContractRollup).filter(
+            and_(DailyContractRollup.day >= start_day, DailyContractRollup.day <= end_day)
+        ).delete(synchronize_session=False)
+        self._apply_contracts(
+            and_(Contract.created_at >= start_day, Contract.created_at < end_day + timedelta(days=1)), 1
+        )
+
+    def refresh_claim_days(self, start_day: Union[date, datetime], end_day: Union[date, datetime, None] = None):
+        """Rebuild claim rollups for claims created in [start_day, end_day]"""
+        start_day = _as_day(start_day)
+        end_day = _as_day(end_day) if end_day is not None else start_day
+        self._lock_days(CLAIM_ROLLUP_LOCK, start_day, end_day)
+        
+        self.db.query(DailyClaimRollup).filter(
+            and_(DailyClaimRollup.day >= start_day, DailyClaimRollup.day <= end_day)
+        ).delete(synchronize_session=False)
+        self._apply_claims(
+            and_(Claim.created_at >= start_day, Claim.created_at < end_day + timedelta(days=1)), 1
+        )
+
+    def refresh_days(self, start_day: Union[date, datetime], end_day: Union[date, datetime, None] = None):
+        """Rebuild both contract and claim rollups for the given days and commit"""
+        self.refresh_contract_days(start_day, end_day)
+        self.refresh_claim_days(start_day, end_day)
+        self.db.commit()
+
+    def refresh_recent(self, lookback_days: Optional[int] = None):
+        """Rebuild today and the previous lookback_days days"""
+        if lookback_days is None:
+            lookback_days = settings.analytics_rollup_lookback_days
+        today = date.today()
+        self.refresh_days(today - timedelta(days=lookback_days), today)
+
+    def rebuild(self):
+        """Rebuild rollups for the whole history (initial backfill)"""
+        first_contract = self.db.query(func.min(Contract.created_at)).scalar()
+        first_claim = self.db.query(func.min(Claim.created_at)).scalar()
+        today = date.today()
+        
+        self.db.query(DailyContractRollup).delete(synchronize_session=False)
+        self.db.query(DailyClaimRollup).delete(synchronize_session=False)
+        
+        if first_contract is not None:
+            self.refresh_contract_days(first_contract, max(today, self._last_day(Contract.created_at)))
+        if first_claim is not None:
+            self.refresh_claim_days(first_claim, max(today, self._last_day(Claim.created_at)))
+        self.db.commit()
+
+    def _last_day(self, column) -> date:
+        return _as_day(self.db.query(func.max(column)).scalar())
+
+class AsyncRollupService(AsyncService):
+    """Async variant of RollupService"""
+    service_class = RollupService
+
+get_rollup_service = service_provider(AsyncRollupService)
+
+def _apply_in_savepoint(db: Session, apply: Callable, ids: List[int]) -> bool:
+    """
+    Run a write-path rollup update in a savepoint of the write's transaction. If it fails
+    only the savepoint is rolled back, the write still commits and the rollups are left to
+    the periodic refresh.
+    """
+    try:
+        db.flush()
+        with db.begin_nested():
+            apply(ids)
+        return True
+    except Exception:
+        logger.exception("Rollup update %s failed, left to the periodic refresh", apply.__name__)
+        return False
+
+@contextmanager
+def contract_rollup_change(db: Session, contract_ids: List[int]):
+    """Write-path hook around a change of existing contracts, the block must end before commit"""
+    if not settings.analytics_rollups_enabled:
+        yield
+        return
+    service = RollupService(db)
+    withdrawn = _apply_in_savepoint(db, service.withdraw_contracts, contract_ids)
+    yield
+    if withdrawn:
+        _apply_in_savepoint(db, service.add_contracts, contract_ids)
+
+@contextmanager
+def claim_rollup_change(db: Session, claim_ids: List[int]):
+    """Write-path hook around a change of existing claims, the block must end before commit"""
+    if not settings.analytics_rollups_enabled:
+        yield
+        return
+    service = RollupService(db)
+    withdrawn = _apply_in_savepoint(db, service.withdraw_claims, claim_ids)
+    yield
+    if withdrawn:
+        _apply_in_savepoint(db, service.add_claims, claim_ids)
+
+def add_contract_rollups(db: Session, contract_ids: List[int]):
+    """Write-path hook for new contracts, call before commit"""
+    if settings.analytics_rollups_enabled and contract_ids:
+        _apply_in_savepoint(db, RollupService(db).add_contracts, contract_ids)
+
+def add_claim_rollups(db: Session, claim_ids: List[int]):
+    """Write-path hook for new claims, call before commit"""
+    if settings.analytics_rollups_enabled and claim_ids:
+        _apply_in_savepoint(db, RollupService(db).add_claims, claim_ids)
+
+def _refresh_recent_rollups():
+    db = SessionLocal()
+    try:
+        RollupService(db).refresh_recent()
+    finally:
+        db.close()
+
+async def _run_refresher(interval_seconds: int):
+    while True:
+        try:
+            await run_in_threadpool(_refresh_recent_rollups)
+        except Exception:
+            logger.exception("Periodic rollup refresh failed")
+        await asyncio.sleep(interval_seconds)
+
+async def start_rollup_refresher():
+    """Start periodic refresh of recent rollup days (FastAPI startup hook)"""
+    global _refresher_task
+    if settings.analytics_rollups_enabled and _refresher_task is None:
+        _refresher_task = asyncio.create_task(_run_refresher(settings.analytics_rollup_interval_seconds))
+
+async def stop_rollup_refresher():
+    """Cancel periodic refresh (FastAPI shutdown hook)"""
+    global _refresher_task
+    if _refresher_task is not None:
+        _refresher_task.cancel()
+        try:
+            await _refresher_task
+        except asyncio.CancelledError:
+            pass
+        _refresher_task = None
@@ -0,0 +1,75 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, case, literal, literal_column
+from typing import List
+from app.db.models import Client, Claim
+
+# Columns covered by the gin_trgm_ops indexes of migration 0002
+CLIENT_SEARCH_COLUMNS = (Client.first_name, Client.last_name, Client.email, Client.phone)
+CLAIM_SEARCH_COLUMNS = (Claim.claim_number, Claim.description)
+
+LIKE_ESCAPE = "/"
+
+def _like_pattern(term: str, prefix_only: bool = False) -> str:
+    escaped = term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
+class SearchService:
+    """
+    Search conditions and ranking for clients and claims.
+    
+    On PostgreSQL substring matches (ILIKE) are served by pg_trgm GIN indexes, client names
+    also match with typos through trigram word similarity and claim descriptions through
+    the 'simple' full-text index. Other dialects (SQLite in tests) fall back to plain
+    ILIKE with prefix matches ranked first.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.postgres = db.get_bind().dialect.name == 'postgresql'
+
+    def client_condition(self, term: str):
+        """Filter for clients matching term"""
+        pattern = _like_pattern(term)
+        conditions = [column.ilike(pattern, escape=LIKE_ESCAPE) for column in CLIENT_SEARCH_COLUMNS]
+        if self.postgres:
+            # term <% column: term is similar to some word of column (index-assisted)
+            conditions += [literal(term).op('<%')(column) for column in (Client.first_name, Client.last_name)]
+        return or_(*conditions)
+
+    def client_rank(self, term: str):
+        """Relevance of a client for term, higher is better"""
+        if self.postgres:
+            return func.greatest(*[func.word_similarity(term, column) for column in CLIENT_SEARCH_COLUMNS])
+        return self._prefix_rank(term, CLIENT_SEARCH_COLUMNS)
+
+    def claim_condition(self, term: str):
+        """Filter for claims matching term"""
+        pattern = _like_pattern(term)
+        conditions = [column.ilike(pattern, escape=LIKE_ESCAPE) for column in CLAIM_SEARCH_COLUMNS]
+        if self.postgres:
+            conditions.append(self._claim_document().op('@@')(self._ts_query(term)))
+        return or_(*conditions)
+
+    def claim_rank(self, term: str):
+        """Relevance of a claim for term, higher is better"""
+        if self.postgres:
+            return func.ts_rank(self._claim_document(), self._ts_query(term)) + \
+                func.word_similarity(term, Claim.claim_number)
+        return self._prefix_rank(term, CLAIM_SEARCH_COLUMNS)
+
+    def search_clients(self, term: str, limit: int = 10) -> List[Client]:
+        """Best matching clients first"""
+        return self.db.query(Client).filter(
+            self.client_condition(term)
+        ).order_by(self.client_rank(term).desc(), Client.id).limit(limit).all()
+
+    def _claim_document(self):
+        # Same expression as ix_claims_description_fts
+        return func.to_tsvector(literal_column("'simple'::regconfig"), Claim.description)
+
+    def _ts_query(self, term: str):
+        return func.plainto_tsquery(literal_column("'simple'::regconfig"), term)
+
+    def _prefix_rank(self, term: str, columns):
+        pattern = _like_pattern(term, prefix_only=True)
+        return case((or_(*[column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns]), 1), else_=0)
@@ -2,11 +2,21 @@ from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 import uvicorn
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import get_settings
-from app.routers import contracts, claims, clients, analytics, users, products
-from app.utils.auth import verify_token
-from app.db.database import create_tables
+from app.routers import contracts, claims, clients, analytics, users, products, auth
+from app.utils.auth import verify_token, token_cache
+from app.db.database import get_pool_metrics
+from app.db.migrations import check_schema_version
+from app.utils.http_client import start_auth_client, close_auth_client
+from app.functions.rollup_service import start_rollup_refresher, stop_rollup_refresher
+from app.functions.assignment_service import adjuster_workload
+from app.functions.product_catalog import product_catalog, load_product_catalog
+from app.functions.rating import rating_tables
+from app.utils.response_cache import analytics_cache
+from app.functions.event_bus import event_bus, start_event_bus, stop_event_bus
+from app.functions.counter_service import start_counter_reconciler, stop_counter_reconciler
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -27,10 +37,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create database tables on startup
+# Schema is managed by migrations (python -m app.db.migrations), startup only checks the version row
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    await run_in_threadpool(check_schema_version)
+    await start_auth_client()
+    await load_product_catalog()
+    await start_event_bus()
+    await start_rollup_refresher()
+    await start_counter_reconciler()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_counter_reconciler()
+    await stop_rollup_refresher()
+    await stop_event_bus()
+    await close_auth_client()
 
 # Include routers
 app.include_router(contracts.router, prefix="/api/v1/contracts", tags=["contracts"])
@@ -39,6 +61,7 @@ app.include_router(clients.router, prefix="/api/v1/clients", tags=["clients"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(products.router, prefix="/api/v1/products", tags=["products"])
+app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 
 @app.get("/")
 async def root():
@@ -48,6 +71,18 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "insurance-backend"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "auth_token_cache": token_cache.stats(),
+        "db_pool": get_pool_metrics(),
+        "adjuster_workload": adjuster_workload.stats(),
+        "product_catalog": product_catalog.stats(),
+        "rating_tables": rating_tables.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "event_bus": event_bus.stats()
+    }
+
 if __name__ == "__main__":
     settings = get_settings()
     uvicorn.run(
@@ -1,196 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, date, timedelta
 from app.utils.auth import get_current_user, require_roles
-from app.db.database import get_db
 from app.schemas.reports import FinanceReportData, ActivityReportData
-from app.functions.analytics_service import AnalyticsService
+from app.functions.analytics_service import AsyncAnalyticsService, get_analytics_service
+from app.functions.rollup_service import AsyncRollupService, get_rollup_service
+from app.functions.counter_service import AsyncCounterService, get_counter_service
+from app.modules.analytics import DashboardSummary
+from app.core.config import get_settings
+from app.utils.response_cache import analytics_cache, cached_response
+
+settings = get_settings()
 
 router = APIRouter()
 
 @router.get("/dashboard")
+@cached_response("dashboard", ttl_seconds=settings.analytics_cache_dashboard_ttl_seconds)
 async def get_dashboard_data(
-    db: Session = Depends(get_db),
+    analytics_service: AsyncAnalyticsService = Depends(get_analytics_service),
     current_user: dict = Depends(require_roles("manager", "admin"))
 ):
     """Get dashboard analytics data"""
-    
-    # Получаем актуальные данные из базы
-    from app.db.models import Client, Contract, Claim, ContractStatus, ClaimStatus
-    from sqlalchemy import func
-    
-    # Статистика клиентов
-    total_clients = db.query(Client).count()
-    active_clients = total_clients  # Все клиенты считаются активными
-    
-    # Статистика за текущий месяц
-    today = date.today()
-    month_start = today.replace(day=1)
-    new_clients_this_month = db.query(Client).filter(
-        Client.created_at >= month_start
-    ).count()
-    
-    # Статистика договоров
-    total_contracts = db.query(Contract).count()
-    active_contracts = db.query(Contract).filter(
-        Contract.status == ContractStatus.ACTIVE
-    ).count()
-    expired_contracts = db.query(Contract).filter(
-        Contract.status == ContractStatus.EXPIRED
-    ).count()
-    
-    # Статистика заявок
-    total_claims = db.query(Claim).count()
-    pending_claims = db.query(Claim).filter(
-        Claim.status.in_(['submitted', 'under_review'])
-    ).count()
-    approved_claims = db.query(Claim).filter(
-        Claim.status == 'approved'
-    ).count()
-    rejected_claims = db.query(Claim).filter(
-        Claim.status == 'rejected'
-    ).count()
-    
-    # Статистика выручки
-    total_revenue = db.query(func.sum(Contract.premium_amount)).scalar() or 0
-    monthly_revenue = db.query(func.sum(Contract.premium_amount)).filter(
-        Contract.created_at >= month_start
-    ).scalar() or 0
-    
-    return {
-        "clients": {
-            "total": total_clients,
-            "active": active_clients,
-            "new_this_month": new_clients_this_month
-        },
-        "contracts": {
-            "total": total_contracts,
-            "active": active_contracts,
-            "expired": expired_contracts
-        },
-        "claims": {
-            "total": total_claims,
-            "pending": pending_claims,
-            "approved": approved_claims,
-            "rejected": rejected_claims
-        },
-        "revenue": {
-            "total": float(total_revenue),
-            "monthly": float(monthly_revenue)
-        }
-    }
+    return await analytics_service.get_dashboard_data()
+
+@router.get("/dashboard/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    analytics_service: AsyncAnalyticsService = Depends(get_analytics_service),
+    current_user: dict = Depends(require_roles("manager", "admin"))
+):
+    """Get dashboard summary (live counters, not cached)"""
+    return await analytics_service.get_dashboard_summary()
 
 @router.get("/reports/finance", response_model=FinanceReportData)
+@cached_response("reports/finance", ttl_seconds=settings.analytics_cache_report_ttl_seconds)
 async def get_finance_report(
     start_date: date = None,
     end_date: date = None,
-    db: Session = Depends(get_db),
+    analytics_service: AsyncAnalyticsService = Depends(get_analytics_service),
     current_user: dict = Depends(require_roles("manager", "admin"))
 ):
     """Generate financial report"""
-    analytics_service = AnalyticsService(db)
-    
     # Устанавливаем дефолтные даты если не указаны
     if not end_date:
         end_date = date.today()
     if not start_date:
         start_date = date.today() - timedelta(days=90)  # последние 3 месяца
     
-    from app.db.models import Contract, Claim, InsuranceProduct
-    from sqlalchemy import func, and_, extract
-    
-    # Получаем договоры за период
-    contracts = db.query(Contract).filter(
-        and_(
-            Contract.created_at >= start_date,
-            Contract.created_at <= end_date
-        )
-    ).all()
-    
-    # Получаем выплаченные заявки за период
-    paid_claims = db.query(Claim).filter(
-        and_(
-            Claim.updated_at >= start_date,
-            Claim.updated_at <= end_date,
-            Claim.status == 'approved'
-        )
-    ).all()
-    
-    total_premiums = sum(c.premium_amount for c in contracts)
-    total_claims = sum(c.approved_amount or 0 for c in paid_claims)
-    profit = total_premiums - total_claims
-    
-    # Помесячная разбивка
-    monthly_data = {}
-    for contract in contracts:
-        month_key = contract.created_at.strftime('%Y-%m')
-        if month_key not in monthly_data:
-            monthly_data[month_key] = {'premiums': 0, 'claims': 0, 'profit': 0}
-        monthly_data[month_key]['premiums'] += contract.premium_amount
-    
-    for claim in paid_claims:
-        month_key = claim.updated_at.strftime('%Y-%m')
-        if month_key in monthly_data:
-            monthly_data[month_key]['claims'] += claim.approved_amount or 0
-    
-    # Вычисляем прибыль по месяцам
-    for month in monthly_data:
-        monthly_data[month]['profit'] = monthly_data[month]['premiums'] - monthly_data[month]['claims']
-    
-    by_month = [
-        {
-            'month': month,
-            'premiums': data['premiums'],
-            'claims': data['claims'],
-            'profit': data['profit']
-        }
-        for month, data in sorted(monthly_data.items())
-    ]
-    
-    # По продуктам
-    product_data = {}
-    for contract in contracts:
-        product_id = contract.product_id
-        if product_id not in product_data:
-            product = db.query(InsuranceProduct).filter(InsuranceProduct.id == product_id).first()
-            product_data[product_id] = {
-                'product_name': product.name if product else f'Product {product_id}',
-                'premiums': 0,
-                'claims': 0,
-                'count': 0
-            }
-        product_data[product_id]['premiums'] += contract.premium_amount
-        product_data[product_id]['count'] += 1
-    
-    # Добавляем данные по заявкам к продуктам
-    for claim in paid_claims:
-        if hasattr(claim, 'contract') and claim.contract:
-            product_id = claim.contract.product_id
-            if product_id in product_data:
-                product_data[product_id]['claims'] += claim.approved_amount or 0
-    
-    by_product = list(product_data.values())
-    
-    return FinanceReportData(
-        total_premiums=total_premiums,
-        total_claims=total_claims,
-        profit=profit,
-        period={"start": start_date.isoformat(), "end": end_date.isoformat()},
-        by_month=by_month,
-        by_product=by_product
-    )
+    return await analytics_service.get_finance_report(start_date, end_date)
 
 @router.get("/reports/activity", response_model=ActivityReportData)
+@cached_response("reports/activity", ttl_seconds=settings.analytics_cache_report_ttl_seconds)
 async def get_activity_report(
     start_date: date = None,
     end_date: date = None,
-    db: Session = Depends(get_db),
+    analytics_service: AsyncAnalyticsService = Depends(get_analytics_service),
     current_user: dict = Depends(require_roles("manager", "admin"))
 ):
     """Generate activity report"""
-    analytics_service = AnalyticsService(db)
-    
     # Устанавливаем дефолтные даты если не указаны
     if not end_date:
         end_date = date.today()
@@ -211,31 +77,7 @@ async def get_activity_report(
     ]
     
     # Топ агентов по договорам
-    from app.db.models import Contract
-    from sqlalchemy import func, and_
-    
-    agent_stats = db.query(
-        Contract.agent_id,
-        func.count(Contract.id).label('contracts_count'),
-        func.sum(Contract.premium_amount).label('total_premium')
-    ).filter(
-        and_(
-            Contract.created_at >= start_date,
-            Contract.created_at <= end_date,
-            Contract.agent_id.isnot(None)
-        )
-    ).group_by(Contract.agent_id).order_by(
-        func.sum(Contract.premium_amount).desc()
-    ).limit(10).all()
-    
-    top_agents = [
-        {
-            'agent_name': f'Агент {stat.agent_id}',  # В реальности нужно получать из auth-service
-            'contracts_count': stat.contracts_count,
-            'total_premium': float(stat.total_premium)
-        }
-        for stat in agent_stats
-    ]
+    top_agents = await analytics_service.get_top_agents(start_date, end_date)
     
     return ActivityReportData(
         total_users=total_users,
@@ -299,4 +141,29 @@ async def get_overview_statistics(
         "contracts": {"total": 0, "active": 0, "expired": 0},
         "claims": {"total": 0, "pending": 0, "approved": 0, "rejected": 0},
         "agents_performance": []
-    } 
\ No newline at end of file
+    }
+
+@router.post("/rollups/rebuild")
+async def rebuild_rollups(
+    start_date: date = None,
+    end_date: date = None,
+    rollup_service: AsyncRollupService = Depends(get_rollup_service),
+    current_user: dict = Depends(require_roles("admin"))
+):
+    """Rebuild daily analytics rollups for a period (whole history if no period given)"""
+    if start_date is None and end_date is None:
+        await rollup_service.rebuild()
+    else:
+        await rollup_service.refresh_days(start_date or end_date, end_date or start_date)
+    # Cached reports may have been computed from the old rollups
+    await analytics_cache.invalidate()
+    return {"message": "Rollups rebuilt", "period": {"start": start_date, "end": end_date}}
+
+@router.post("/counters/reconcile")
+async def reconcile_counters(
+    counter_service: AsyncCounterService = Depends(get_counter_service),
+    current_user: dict = Depends(require_roles("admin"))
+):
+    """Recount live dashboard counters from contracts and claims"""
+    counters = await counter_service.reconcile()
+    return {"message": "Dashboard counters reconciled", "counters": counters}
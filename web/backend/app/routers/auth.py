@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+import httpx
+import logging
+from app.utils.auth import get_current_user, token_cache
+from app.utils.http_client import get_auth_client
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+@router.post("/logout")
+async def logout(current_user: dict = Depends(get_current_user)):
+    """Drop the token from the verification cache and log out in auth service"""
+    # Only verified tokens are recorded, so arbitrary strings cannot fill the revocation list
+    token = current_user["token"]
+    token_cache.revoke(token)
+    
+    try:
+        await get_auth_client().post(
+            "/auth/logout",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+    except httpx.HTTPError as e:
+        logger.warning("Auth service logout failed: %s", e)
+    
+    return {"message": "Successfully logged out"}
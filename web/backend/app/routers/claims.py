@@ -1,15 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel
 from app.utils.auth import get_current_user, require_roles
-from app.db.database import get_db
 from app.schemas.claim import (
     ClaimCreate, ClaimUpdate, Claim as ClaimSchema, 
     ClaimList, ClaimDecisionRequest, PendingClaimsList,
-    ClaimWithDetails
+    ClaimWithDetails, ClaimSubmitRequest, ClaimSubmitResponse,
+    ClaimBulkSubmitRequest, ClaimBulkSubmitResponse, AdjusterQueue
 )
-from app.functions.claim_service import ClaimService
+from app.core.config import get_settings
+from app.db.models import ContractStatus
+from app.functions.claim_service import (
+    AsyncClaimService, get_claim_service, submission_checklist, estimated_processing_time
+)
+from app.functions.assignment_service import AsyncAssignmentService, get_assignment_service
+
+settings = get_settings()
 
 router = APIRouter()
 
@@ -20,24 +26,6 @@ class ClaimCreate(BaseModel):
     claim_amount: float
     documents: List[str] = []
 
-class ClaimSubmitRequest(BaseModel):
-    contract_id: int
-    incident_date: str
-    description: str
-    claim_amount: float
-    documents: List[str] = []
-    priority: str = "normal"  # "low", "normal", "high", "urgent"
-    customer_contact: str = None
-    witnesses: List[str] = []
-    
-class ClaimSubmitResponse(BaseModel):
-    claim_id: int
-    claim_number: str
-    status: str
-    estimated_processing_time: str
-    adjuster_assigned: bool
-    validation_checklist: dict
-
 class ClaimDecision(BaseModel):
     decision: str  # "approved", "rejected", "requires_investigation"
     approved_amount: float = None
@@ -50,63 +38,94 @@ async def get_claims(
     limit: int = 100,
     status_filter: str = None,
     contract_id: int = None,
-    db: Session = Depends(get_db),
+    search: str = None,
+    cursor: str = None,
+    include_total: bool = True,
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get list of insurance claims"""
-    claim_service = ClaimService(db)
-    claims, total = claim_service.get_claims(
-        skip=skip,
-        limit=limit,
-        status_filter=status_filter,
-        contract_id=contract_id
-    )
+    """Get list of insurance claims (pass next_cursor back as cursor for constant-time paging)"""
+    try:
+        claims, total, next_cursor = await claim_service.get_claims(
+            skip=skip,
+            limit=limit,
+            status_filter=status_filter,
+            contract_id=contract_id,
+            search=search,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return ClaimList(
         claims=claims,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 @router.get("/pending", response_model=PendingClaimsList)
 async def get_pending_claims(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: str = None,
+    include_total: bool = True,
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(require_roles("adjuster"))
 ):
     """Get pending claims for adjustment"""
-    claim_service = ClaimService(db)
-    pending_claims, total = claim_service.get_pending_claims(skip=skip, limit=limit)
+    try:
+        pending_claims, total, next_cursor = await claim_service.get_pending_claims(
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return PendingClaimsList(
         pending_claims=pending_claims,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
+@router.get("/assignment/queues", response_model=List[AdjusterQueue])
+async def get_adjuster_queues(
+    assignment_service: AsyncAssignmentService = Depends(get_assignment_service),
+    current_user: dict = Depends(require_roles("manager", "admin"))
+):
+    """Open claims and open amount per adjuster, least loaded first"""
+    return await assignment_service.queue_depths()
+
 @router.post("/", response_model=ClaimSchema)
 async def create_claim(
     claim_data: ClaimCreate,
-    db: Session = Depends(get_db),
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(require_roles("agent", "operator", "admin"))
 ):
     """Create new insurance claim"""
-    claim_service = ClaimService(db)
-    claim = claim_service.create_claim(claim_data, created_by=current_user.get("user_id"))
+    claim = await claim_service.create_claim(claim_data, created_by=current_user.get("user_id"))
     return claim
 
 @router.get("/{claim_id}", response_model=ClaimWithDetails)
 async def get_claim(
     claim_id: int,
-    db: Session = Depends(get_db),
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get claim by ID"""
-    claim_service = ClaimService(db)
-    claim = claim_service.get_claim_with_details(claim_id)
+    claim = await claim_service.get_claim_with_details(claim_id)
     
     if not claim:
         raise HTTPException(
@@ -120,21 +139,19 @@ async def get_claim(
 async def make_claim_decision(
     claim_id: int,
     decision_data: ClaimDecisionRequest,
-    db: Session = Depends(get_db),
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(require_roles("adjuster"))
 ):
     """Make decision on insurance claim (adjuster only)"""
-    claim_service = ClaimService(db)
-    
     # Check if claim exists
-    existing_claim = claim_service.get_claim(claim_id)
+    existing_claim = await claim_service.get_claim(claim_id)
     if not existing_claim:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Claim not found"
         )
     
-    claim = claim_service.make_decision(
+    claim = await claim_service.make_decision(
         claim_id, 
         decision_data, 
         adjuster_id=current_user.get("user_id")
@@ -146,21 +163,19 @@ async def make_claim_decision(
 async def update_claim(
     claim_id: int,
     claim_data: ClaimUpdate,
-    db: Session = Depends(get_db),
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(require_roles("adjuster", "manager", "admin"))
 ):
     """Update claim information"""
-    claim_service = ClaimService(db)
-    
     # Check if claim exists
-    existing_claim = claim_service.get_claim(claim_id)
+    existing_claim = await claim_service.get_claim(claim_id)
     if not existing_claim:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Claim not found"
         )
     
-    claim = claim_service.update_claim(claim_id, claim_data)
+    claim = await claim_service.update_claim(claim_id, claim_data)
     return claim
 
 @router.post("/{claim_id}/process")
@@ -216,15 +231,12 @@ async def reject_claim(
 @router.post("/submit", response_model=ClaimSubmitResponse)
 async def submit_claim_to_adjuster(
     claim_data: ClaimSubmitRequest,
-    db: Session = Depends(get_db),
+    claim_service: AsyncClaimService = Depends(get_claim_service),
     current_user: dict = Depends(require_roles("operator"))
 ):
     """Submit claim to adjuster with validation checklist (operator only)"""
-    claim_service = ClaimService(db)
-    
     # Проверяем существование договора
-    from app.db.models import Contract
-    contract = db.query(Contract).filter(Contract.id == claim_data.contract_id).first()
+    contract = await claim_service.get_contract(claim_data.contract_id)
     if not contract:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -232,22 +244,14 @@ async def submit_claim_to_adjuster(
         )
     
     # Проверяем активность договора
-    if contract.status != "active":
+    if contract.status != ContractStatus.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contract is not active"
         )
     
     # Валидационный чек-лист
-    validation_checklist = {
-        "contract_valid": True,
-        "contract_active": contract.status == "active",
-        "incident_date_valid": True,  # TODO: проверить что дата не в будущем
-        "description_complete": len(claim_data.description) >= 20,
-        "amount_reasonable": claim_data.claim_amount <= contract.coverage_amount,
-        "documents_attached": len(claim_data.documents) > 0,
-        "contact_provided": claim_data.customer_contact is not None
-    }
+    validation_checklist = submission_checklist(contract, claim_data)
     
     # Все проверки должны быть пройдены
     all_valid = all(validation_checklist.values())
@@ -269,25 +273,34 @@ async def submit_claim_to_adjuster(
         documents=claim_data.documents
     )
     
-    claim = claim_service.create_claim(create_data, created_by=current_user.get("user_id"))
-    
-    # Назначаем урегулировщика (простая логика)
-    # TODO: Реализовать умное назначение по загрузке
-    adjuster_assigned = True
-    
-    # Оценка времени обработки
-    if claim_data.priority == "urgent":
-        processing_time = "1-2 дня"
-    elif claim_data.priority == "high":
-        processing_time = "3-5 дней"
-    else:
-        processing_time = "5-10 дней"
+    # Заявка сразу назначается наименее загруженному урегулировщику
+    claim = await claim_service.create_claim(create_data, created_by=current_user.get("user_id"), auto_assign=True)
+    adjuster_assigned = claim.adjuster_id is not None
     
     return ClaimSubmitResponse(
         claim_id=claim.id,
         claim_number=claim.claim_number,
         status=claim.status,
-        estimated_processing_time=processing_time,
+        estimated_processing_time=estimated_processing_time(claim_data.priority),
         adjuster_assigned=adjuster_assigned,
         validation_checklist=validation_checklist
+    )
+
+@router.post("/submit/bulk", response_model=ClaimBulkSubmitResponse)
+async def submit_claims_bulk(
+    bulk_data: ClaimBulkSubmitRequest,
+    claim_service: AsyncClaimService = Depends(get_claim_service),
+    current_user: dict = Depends(require_roles("operator"))
+):
+    """Submit many claims with the same validation checklist and assign adjusters in one transaction (operator only)"""
+    if len(bulk_data.claims) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} claims per request"
+        )
+    
+    return await claim_service.submit_claims_bulk(
+        bulk_data.claims,
+        adjuster_ids=bulk_data.adjuster_ids,
+        created_by=current_user.get("user_id")
     ) 
\ No newline at end of file
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from typing import List, Optional
+import io
 from app.utils.auth import get_current_user, require_roles
-from app.db.database import get_db
-from app.db.models import Client
-from app.schemas.client import ClientCreate, ClientUpdate, Client as ClientSchema, ClientList
-from app.functions.client_service import ClientService
+from app.schemas.client import ClientCreate, ClientUpdate, Client as ClientSchema, ClientList, ClientImportReport
+from app.functions.client_service import AsyncClientService, get_client_service
+from app.functions.client_import_service import (
+    AsyncClientImportService, get_client_import_service, detect_format, IMPORT_FORMATS
+)
 
 router = APIRouter()
 
@@ -13,49 +14,110 @@ router = APIRouter()
 async def get_clients(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    search: str = None,
+    cursor: str = None,
+    include_total: bool = True,
+    client_service: AsyncClientService = Depends(get_client_service),
     current_user: dict = Depends(require_roles("agent", "operator", "admin"))
 ):
-    """Get list of clients"""
-    client_service = ClientService(db)
-    clients, total = client_service.get_clients(skip=skip, limit=limit)
+    """Get list of clients (pass next_cursor back as cursor for constant-time paging)"""
+    try:
+        clients, total, next_cursor = await client_service.get_clients(
+            skip=skip,
+            limit=limit,
+            search=search,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return ClientList(
         clients=clients,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
+@router.get("/search", response_model=List[ClientSchema])
+async def search_clients(
+    q: str,
+    limit: int = 10,
+    client_service: AsyncClientService = Depends(get_client_service),
+    current_user: dict = Depends(require_roles("agent", "operator", "admin"))
+):
+    """Find clients by name, email or phone, best matches first"""
+    return await client_service.search_clients(q, limit=limit)
+
+@router.post("/import", response_model=ClientImportReport)
+async def import_clients(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    import_service: AsyncClientImportService = Depends(get_client_import_service),
+    current_user: dict = Depends(require_roles("operator", "admin"))
+):
+    """Import clients from a CSV or NDJSON file, existing emails are skipped"""
+    try:
+        file_format = format or detect_format(file.filename)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format: {file_format}"
+        )
+    
+    # The upload is spooled to disk by Starlette, records are read from it line by line
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await import_service.import_stream(
+            stream,
+            file_format,
+            created_by=current_user.get("user_id"),
+            chunk_size=chunk_size
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot read import file: {e}"
+        )
+    finally:
+        stream.detach()
+
 @router.post("/", response_model=ClientSchema)
 async def create_client(
     client_data: ClientCreate,
-    db: Session = Depends(get_db),
+    client_service: AsyncClientService = Depends(get_client_service),
     current_user: dict = Depends(require_roles("agent", "operator", "admin"))
 ):
     """Create new client"""
-    client_service = ClientService(db)
-    
     # Check if client with this email already exists
-    existing_client = client_service.get_client_by_email(client_data.email)
+    existing_client = await client_service.get_client_by_email(client_data.email)
     if existing_client:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Client with this email already exists"
         )
     
-    client = client_service.create_client(client_data, created_by=current_user.get("user_id"))
+    client = await client_service.create_client(client_data, created_by=current_user.get("user_id"))
     return client
 
 @router.get("/{client_id}", response_model=ClientSchema)
 async def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
+    client_service: AsyncClientService = Depends(get_client_service),
     current_user: dict = Depends(require_roles("agent", "operator", "admin"))
 ):
     """Get client by ID"""
-    client_service = ClientService(db)
-    client = client_service.get_client(client_id)
+    client = await client_service.get_client(client_id)
     
     if not client:
         raise HTTPException(
@@ -69,14 +131,12 @@ async def get_client(
 async def update_client(
     client_id: int,
     client_data: ClientUpdate,
-    db: Session = Depends(get_db),
+    client_service: AsyncClientService = Depends(get_client_service),
     current_user: dict = Depends(require_roles("agent", "operator", "admin"))
 ):
     """Update client information"""
-    client_service = ClientService(db)
-    
     # Check if client exists
-    existing_client = client_service.get_client(client_id)
+    existing_client = await client_service.get_client(client_id)
     if not existing_client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,27 +145,25 @@ async def update_client(
     
     # Check email uniqueness if email is being updated
     if client_data.email and client_data.email != existing_client.email:
-        email_client = client_service.get_client_by_email(client_data.email)
+        email_client = await client_service.get_client_by_email(client_data.email)
         if email_client and email_client.id != client_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Client with this email already exists"
             )
     
-    client = client_service.update_client(client_id, client_data)
+    client = await client_service.update_client(client_id, client_data)
     return client
 
 @router.delete("/{client_id}")
 async def delete_client(
     client_id: int,
-    db: Session = Depends(get_db),
+    client_service: AsyncClientService = Depends(get_client_service),
     current_user: dict = Depends(require_roles("admin"))
 ):
     """Delete client (admin only)"""
-    client_service = ClientService(db)
-    
     # Check if client exists
-    existing_client = client_service.get_client(client_id)
+    existing_client = await client_service.get_client(client_id)
     if not existing_client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,11 +171,11 @@ async def delete_client(
         )
     
     # Check if client has active contracts
-    if client_service.has_active_contracts(client_id):
+    if await client_service.has_active_contracts(client_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete client with active contracts"
         )
     
-    client_service.delete_client(client_id)
+    await client_service.delete_client(client_id)
     return {"message": "Client deleted successfully"} 
\ No newline at end of file
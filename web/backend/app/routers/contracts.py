@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from typing import List
 from app.utils.auth import get_current_user, require_roles
-from app.db.database import get_db
-from app.db.models import Contract, Client, InsuranceProduct
 from app.schemas.contract import (
     ContractCreate, ContractUpdate, Contract as ContractSchema, 
     ContractList, PremiumCalculationParams, PremiumCalculationResult,
-    ContractWithDetails
+    ContractWithDetails, ContractBulkCreate, ContractBulkResult,
+    PremiumBatchRequest, PremiumBatchResult
 )
-from app.functions.contract_service import ContractService
+from app.core.config import get_settings
+from app.functions.contract_service import AsyncContractService, get_contract_service
+
+settings = get_settings()
 
 router = APIRouter()
 
@@ -18,58 +19,75 @@ async def get_contracts(
     skip: int = 0,
     limit: int = 100,
     client_id: int = None,
-    db: Session = Depends(get_db),
+    cursor: str = None,
+    include_total: bool = True,
+    contract_service: AsyncContractService = Depends(get_contract_service),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get list of contracts"""
-    contract_service = ContractService(db)
-    contracts, total = contract_service.get_contracts(
-        skip=skip, 
-        limit=limit, 
-        client_id=client_id
-    )
+    """Get list of contracts (pass next_cursor back as cursor for constant-time paging)"""
+    try:
+        contracts, total, next_cursor = await contract_service.get_contracts(
+            skip=skip, 
+            limit=limit, 
+            client_id=client_id,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return ContractList(
         contracts=contracts,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 @router.post("/calculate", response_model=PremiumCalculationResult)
 async def calculate_premium(
     calculation_params: PremiumCalculationParams,
-    db: Session = Depends(get_db),
+    contract_service: AsyncContractService = Depends(get_contract_service),
     current_user: dict = Depends(require_roles("agent", "operator"))
 ):
     """Calculate insurance premium"""
-    contract_service = ContractService(db)
+    result = await contract_service.quote_premium(calculation_params)
     
-    # Verify product exists
-    product = db.query(InsuranceProduct).filter(
-        InsuranceProduct.id == calculation_params.product_id
-    ).first()
-    
-    if not product:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Insurance product not found"
         )
     
-    result = contract_service.calculate_premium(calculation_params, product)
     return result
 
+@router.post("/calculate/batch", response_model=PremiumBatchResult)
+async def calculate_premiums(
+    batch: PremiumBatchRequest,
+    contract_service: AsyncContractService = Depends(get_contract_service),
+    current_user: dict = Depends(require_roles("agent", "operator"))
+):
+    """Calculate many insurance premiums in one request, results match /calculate"""
+    if len(batch.quotes) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} quotes per request"
+        )
+    
+    return await contract_service.calculate_premiums(batch.quotes)
+
 @router.post("/", response_model=ContractSchema)
 async def create_contract(
     contract_data: ContractCreate,
-    db: Session = Depends(get_db),
+    contract_service: AsyncContractService = Depends(get_contract_service),
     current_user: dict = Depends(require_roles("agent", "operator"))
 ):
     """Create new insurance contract"""
-    contract_service = ContractService(db)
-    
     # Verify client exists
-    client = db.query(Client).filter(Client.id == contract_data.client_id).first()
+    client = await contract_service.get_client(contract_data.client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,30 +95,45 @@ async def create_contract(
         )
     
     # Verify product exists
-    product = db.query(InsuranceProduct).filter(
-        InsuranceProduct.id == contract_data.product_id
-    ).first()
+    product = await contract_service.get_product(contract_data.product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Insurance product not found"
         )
     
-    contract = contract_service.create_contract(
+    contract = await contract_service.create_contract(
         contract_data, 
         agent_id=current_user.get("user_id")
     )
     return contract
 
+@router.post("/bulk", response_model=ContractBulkResult)
+async def create_contracts_bulk(
+    bulk_data: ContractBulkCreate,
+    contract_service: AsyncContractService = Depends(get_contract_service),
+    current_user: dict = Depends(require_roles("agent", "operator"))
+):
+    """Create many contracts in one request, with a result for every item"""
+    if len(bulk_data.contracts) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} contracts per request"
+        )
+    
+    return await contract_service.create_contracts_bulk(
+        bulk_data.contracts,
+        agent_id=current_user.get("user_id")
+    )
+
 @router.get("/{contract_id}", response_model=ContractWithDetails)
 async def get_contract(
     contract_id: int,
-    db: Session = Depends(get_db),
+    contract_service: AsyncContractService = Depends(get_contract_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get contract by ID"""
-    contract_service = ContractService(db)
-    contract = contract_service.get_contract_with_details(contract_id)
+    contract = await contract_service.get_contract_with_details(contract_id)
     
     if not contract:
         raise HTTPException(
@@ -114,41 +147,37 @@ async def get_contract(
 async def update_contract(
     contract_id: int,
     contract_data: ContractUpdate,
-    db: Session = Depends(get_db),
+    contract_service: AsyncContractService = Depends(get_contract_service),
     current_user: dict = Depends(require_roles("agent", "manager", "admin"))
 ):
     """Update contract information"""
-    contract_service = ContractService(db)
-    
     # Check if contract exists
-    existing_contract = contract_service.get_contract(contract_id)
+    existing_contract = await contract_service.get_contract(contract_id)
     if not existing_contract:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Contract not found"
         )
     
-    contract = contract_service.update_contract(contract_id, contract_data)
+    contract = await contract_service.update_contract(contract_id, contract_data)
     return contract
 
 @router.post("/{contract_id}/activate")
 async def activate_contract(
     contract_id: int,
-    db: Session = Depends(get_db),
+    contract_service: AsyncContractService = Depends(get_contract_service),
     current_user: dict = Depends(require_roles("manager", "admin"))
 ):
     """Activate insurance contract"""
-    contract_service = ContractService(db)
-    
     # Check if contract exists
-    existing_contract = contract_service.get_contract(contract_id)
+    existing_contract = await contract_service.get_contract(contract_id)
     if not existing_contract:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Contract not found"
         )
     
-    success = contract_service.activate_contract(contract_id)
+    success = await contract_service.activate_contract(contract_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
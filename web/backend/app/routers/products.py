@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.utils.auth import get_current_user, require_roles
 from app.db.database import get_db
 from app.db.models import InsuranceProduct
+from app.functions.product_catalog import product_catalog
+from app.functions.rating import validate_rating_table
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -13,6 +15,8 @@ class ProductCreate(BaseModel):
     description: str
     base_premium: float
     coverage_amount: float
+    # Rating bands and risk factor multipliers, omitted or null means the default table
+    rating_table: Optional[dict] = None
 
 class Product(BaseModel):
     id: int
@@ -20,18 +24,44 @@ class Product(BaseModel):
     description: str
     base_premium: float
     coverage_amount: float
+    rating_table: Optional[dict] = None
     is_active: bool
 
     class Config:
         from_attributes = True
 
+def _check_rating_table(rating_table: Optional[dict]):
+    try:
+        validate_rating_table(rating_table)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag in [candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates]
+
 @router.get("/", response_model=List[Product])
 async def get_products(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all insurance products"""
-    products = db.query(InsuranceProduct).filter(InsuranceProduct.is_active == True).all()
+    """Get all insurance products (from the product catalog cache, 304 when If-None-Match matches the ETag)"""
+    products, etag = product_catalog.active(db)
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    # Clients may keep the list but must revalidate before using it
+    response.headers["Cache-Control"] = "private, no-cache"
     return products
 
 @router.post("/", response_model=Product)
@@ -41,6 +71,7 @@ async def create_product(
     current_user: dict = Depends(require_roles("manager", "admin"))
 ):
     """Create new insurance product (manager/admin only)"""
+    _check_rating_table(product_data.rating_table)
     product = InsuranceProduct(
         **product_data.dict(),
         is_active=True
@@ -49,6 +80,7 @@ async def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    product_catalog.store(product)
     return product
 
 @router.put("/{product_id}", response_model=Product)
@@ -67,11 +99,14 @@ async def update_product(
             detail="Product not found"
         )
     
+    _check_rating_table(product_data.rating_table)
     for field, value in product_data.dict().items():
         setattr(product, field, value)
     
     db.commit()
     db.refresh(product)
+    # Listings and quotes must use the new values right away
+    product_catalog.store(product)
     return product
 
 @router.delete("/{product_id}")
@@ -92,4 +127,6 @@ async def delete_product(
     # Soft delete - mark as inactive instead of deleting
     product.is_active = False
     db.commit()
+    db.refresh(product)
+    product_catalog.store(product)
     return {"message": "Product deleted successfully"} 
\ No newline at end of file
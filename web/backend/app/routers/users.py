@@ -7,7 +7,6 @@ from app.db.database import get_db
 from app.schemas.user import UserCreate, UserUpdate, User, UserList
 from app.schemas.reports import AdminRoleData, AdminAuditData
 from app.functions.user_service import UserService
-import requests
 import json
 from datetime import datetime, date
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from enum import Enum
 
@@ -57,12 +57,59 @@ class ClaimWithDetails(Claim):
 
 class ClaimList(BaseModel):
     claims: list[ClaimWithDetails]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 class PendingClaimsList(BaseModel):
     pending_claims: list[ClaimWithDetails]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     skip: int
-    limit: int 
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None
+
+class ClaimSubmitRequest(BaseModel):
+    contract_id: int
+    incident_date: str
+    description: str
+    claim_amount: float
+    documents: List[str] = []
+    priority: str = "normal"  # "low", "normal", "high", "urgent"
+    customer_contact: str = None
+    witnesses: List[str] = []
+    
+class ClaimSubmitResponse(BaseModel):
+    claim_id: int
+    claim_number: str
+    status: str
+    estimated_processing_time: str
+    adjuster_assigned: bool
+    validation_checklist: dict
+
+class ClaimBulkSubmitRequest(BaseModel):
+    claims: List[ClaimSubmitRequest]
+    # Adjusters to distribute the new claims over, least loaded first; empty means every known adjuster
+    adjuster_ids: List[int] = []
+
+class ClaimBulkSubmitItemResult(BaseModel):
+    index: int  # Position of the claim in the request
+    success: bool
+    claim_id: Optional[int] = None
+    claim_number: Optional[str] = None
+    status: Optional[str] = None
+    adjuster_id: Optional[int] = None
+    estimated_processing_time: Optional[str] = None
+    validation_checklist: Optional[dict] = None
+    error: Optional[str] = None
+
+class ClaimBulkSubmitResponse(BaseModel):
+    created: int
+    failed: int
+    assigned: int
+    results: List[ClaimBulkSubmitItemResult]
+
+class AdjusterQueue(BaseModel):
+    adjuster_id: int
+    open_claims: int
+    open_amount: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 class ClientBase(BaseModel):
@@ -34,6 +34,19 @@ class Client(ClientBase):
 
 class ClientList(BaseModel):
     clients: list[Client]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     skip: int
-    limit: int 
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None 
+
+class ClientImportError(BaseModel):
+    row: int  # 1-based record number in the file
+    error: str
+
+class ClientImportReport(BaseModel):
+    processed: int = 0
+    created: int = 0
+    duplicates: int = 0  # Email already exists or repeats within a chunk
+    invalid: int = 0
+    chunks: int = 0
+    errors: List[ClientImportError] = []
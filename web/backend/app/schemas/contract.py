@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from enum import Enum
 
@@ -24,6 +24,17 @@ class PremiumCalculationResult(BaseModel):
     monthly_premium: float
     calculation_details: dict
 
+class PremiumBatchRequest(BaseModel):
+    quotes: List[PremiumCalculationParams]
+
+class PremiumBatchItem(BaseModel):
+    index: int  # Position of the quote in the request
+    result: Optional[PremiumCalculationResult] = None
+    error: Optional[str] = None
+
+class PremiumBatchResult(BaseModel):
+    results: List[PremiumBatchItem]
+
 class ContractBase(BaseModel):
     client_id: int
     product_id: int
@@ -62,6 +73,22 @@ class ContractWithDetails(Contract):
 
 class ContractList(BaseModel):
     contracts: list[ContractWithDetails]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     skip: int
-    limit: int 
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None 
+
+class ContractBulkCreate(BaseModel):
+    contracts: List[ContractCreate]
+
+class ContractBulkItemResult(BaseModel):
+    index: int  # Position of the item in the request
+    success: bool
+    contract_id: Optional[int] = None
+    contract_number: Optional[str] = None
+    error: Optional[str] = None
+
+class ContractBulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[ContractBulkItemResult]
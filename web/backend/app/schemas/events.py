@@ -0,0 +1,70 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class DomainEvent(BaseModel):
+    """Something that happened to the data, published after the change is committed"""
+    occurred_at: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        frozen = True
+
+class ContractEvent(DomainEvent):
+    contract_id: int
+    status: str
+    premium_amount: Optional[float] = None
+
+class ContractCreated(ContractEvent):
+    contract_number: str
+    client_id: int
+    product_id: int
+    agent_id: Optional[int] = None
+
+class ContractStatusChanged(ContractEvent):
+    previous_status: str
+
+class ContractActivated(ContractStatusChanged):
+    pass
+
+class ContractSuspended(ContractStatusChanged):
+    pass
+
+class ContractCancelled(ContractStatusChanged):
+    pass
+
+class ContractUpdated(ContractEvent):
+    """Fields changed through update_contract, status and premium may be among them"""
+    previous_status: str
+    previous_premium_amount: Optional[float] = None
+    created_at: Optional[datetime] = None
+    fields: List[str]
+
+class ClaimEvent(DomainEvent):
+    claim_id: int
+    contract_id: int
+    status: str
+    claim_amount: Optional[float] = None
+    adjuster_id: Optional[int] = None
+
+class ClaimSubmitted(ClaimEvent):
+    pass
+
+class ClaimDecided(ClaimEvent):
+    previous_status: str
+    decision: str
+    approved_amount: Optional[float] = None
+    previous_approved_amount: Optional[float] = None
+
+class ClaimPaid(ClaimEvent):
+    previous_status: str
+    approved_amount: Optional[float] = None
+
+class ClaimUpdated(ClaimEvent):
+    """Fields changed through update_claim or assign_adjuster, status may be among them"""
+    previous_status: str
+    approved_amount: Optional[float] = None
+    fields: List[str]
+
+class ClientUpdated(DomainEvent):
+    client_id: int
+    fields: List[str]
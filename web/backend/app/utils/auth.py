@@ -1,50 +1,232 @@
-import httpx
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, jwt
 from app.core.config import get_settings
-from typing import List, Union
+from app.utils.http_client import get_auth_client
+from typing import Dict, List, Union, Optional, Tuple
 
 security = HTTPBearer()
 settings = get_settings()
 
-async def verify_token(credentials: HTTPAuthorizationCredentials):
+class TokenCache:
     """
-    Verify JWT token with auth service
+    In-process LRU cache of verified tokens keyed by token hash.
+    Each entry lives until the token's exp claim or ttl_seconds, whichever comes first.
+    
+    Revoked tokens are kept apart from the LRU, so cache traffic never evicts them, and
+    are rejected until their exp claim. Only tokens with an exp are recorded; expired ones
+    are pruned from a heap ordered by exp. At max_revoked the token expiring first is
+    dropped. Revocation is per-process: a token logged out through one worker is still
+    accepted by the others until auth-service rejects it or it expires.
     """
-    token = credentials.credentials
     
+    def __init__(self, max_entries: int, ttl_seconds: int, max_revoked: int = 100000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_revoked = max_revoked
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._revoked_heap: List[Tuple[float, str]] = []
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    @staticmethod
+    def _token_expiry(token: str) -> Optional[float]:
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            return None
+        return float(exp) if exp is not None else None
+    
+    def _expires_at(self, token: str) -> float:
+        expires_at = time.time() + self.ttl_seconds
+        token_exp = self._token_expiry(token)
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        return expires_at
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Cached user data of a verified token, None on a miss"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, user_data = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user_data
+    
+    def set(self, token: str, user_data: dict):
+        key = self._key(token)
+        self._entries[key] = (self._expires_at(token), user_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, token: str):
+        self._entries.pop(self._key(token), None)
+    
+    def _pop_revoked(self):
+        expires_at, key = heapq.heappop(self._revoked_heap)
+        if self._revoked.get(key) == expires_at:
+            del self._revoked[key]
+    
+    def revoke(self, token: str) -> bool:
+        """
+        Drop cached verification and reject the token until it expires.
+        Returns False without recording anything for tokens with no future exp claim.
+        """
+        now = time.time()
+        expires_at = self._token_expiry(token)
+        if expires_at is None or expires_at <= now:
+            return False
+        
+        while self._revoked_heap and self._revoked_heap[0][0] <= now:
+            self._pop_revoked()
+        while self._revoked and len(self._revoked) >= self.max_revoked:
+            self._pop_revoked()
+        
+        key = self._key(token)
+        self._entries.pop(key, None)
+        self._revoked[key] = expires_at
+        heapq.heappush(self._revoked_heap, (expires_at, key))
+        return True
+    
+    def is_revoked(self, token: str) -> bool:
+        key = self._key(token)
+        expires_at = self._revoked.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._revoked[key]
+            return False
+        return True
+    
+    def clear(self):
+        self._entries.clear()
+        self._revoked.clear()
+        self._revoked_heap.clear()
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total > 0 else 0
+        }
+
+token_cache = TokenCache(
+    max_entries=settings.auth_cache_max_entries,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    max_revoked=settings.auth_revoked_max_entries
+)
+
+def verify_token_locally(token: str) -> dict:
+    """
+    Decode and validate JWT token in-process with the auth service key
+    """
+    try:
+        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    username = payload.get("sub")
+    user_id = payload.get("user_id")
+    if username is None or user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    # Same shape as auth-service /auth/verify-token response
+    return {
+        "username": username,
+        "user_id": user_id,
+        "role": payload.get("role"),
+        "valid": True
+    }
+
+async def verify_token_remotely(token: str) -> dict:
+    """
+    Verify JWT token with auth service
+    """
     try:
         # Send request to auth service to verify token
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.auth_service_url}/auth/verify-token",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            print(f"DEBUG: Auth service response. Status: {response.status_code}, Response: {response.text}")
-            
-            if response.status_code != 200:
-                print(f"DEBUG: Auth verification failed: {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Auth service returned {response.status_code}: {response.text}"
+        response = await get_auth_client().post(
+            "/auth/verify-token",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        if response.status_code != 200:
+            print(f"DEBUG: Auth verification failed: {response.text}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Auth service returned {response.status_code}: {response.text}"
             )
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                user_data['token'] = token  # Store token for forwarding
-                return user_data
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token"
-                )
+        
+        return response.json()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token verification failed"
         )
 
+async def verify_token(credentials: HTTPAuthorizationCredentials):
+    """
+    Verify JWT token locally or with auth service depending on settings.auth_verify_mode
+    """
+    token = credentials.credentials
+    
+    # Checked even with the cache disabled, a logged out token must not verify again
+    if token_cache.is_revoked(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    
+    if settings.auth_cache_enabled:
+        cached_user = token_cache.get(token)
+        if cached_user is not None:
+            return {**cached_user, 'token': token}
+    
+    if settings.auth_verify_mode == "remote":
+        user_data = await verify_token_remotely(token)
+    else:
+        try:
+            user_data = verify_token_locally(token)
+        except HTTPException:
+            # Auth service stays the source of truth when local keys may be out of sync
+            if not settings.auth_remote_fallback:
+                raise
+            user_data = await verify_token_remotely(token)
+    
+    if settings.auth_cache_enabled:
+        token_cache.set(token, user_data)
+    
+    user_data = {**user_data, 'token': token}  # Store token for forwarding
+    return user_data
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Get current user from token
@@ -0,0 +1,48 @@
+import httpx
+from typing import Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+_auth_client: Optional[httpx.AsyncClient] = None
+
+def _create_auth_client() -> httpx.AsyncClient:
+    """
+    Build pooled client for backend-to-auth-service traffic
+    """
+    return httpx.AsyncClient(
+        base_url=settings.auth_service_url,
+        http2=settings.auth_http2,
+        limits=httpx.Limits(
+            max_connections=settings.auth_http_max_connections,
+            max_keepalive_connections=settings.auth_http_max_keepalive,
+            keepalive_expiry=settings.auth_http_keepalive_expiry
+        ),
+        timeout=httpx.Timeout(
+            settings.auth_http_timeout,
+            connect=settings.auth_http_connect_timeout
+        )
+    )
+
+async def start_auth_client():
+    """Create application-lifetime client (FastAPI startup hook)"""
+    global _auth_client
+    if _auth_client is None:
+        _auth_client = _create_auth_client()
+
+async def close_auth_client():
+    """Close pooled connections (FastAPI shutdown hook)"""
+    global _auth_client
+    if _auth_client is not None:
+        await _auth_client.aclose()
+        _auth_client = None
+
+def get_auth_client() -> httpx.AsyncClient:
+    """
+    Shared client for all auth-service calls.
+    Created lazily when used outside the application lifecycle (scripts, tests).
+    """
+    global _auth_client
+    if _auth_client is None:
+        _auth_client = _create_auth_client()
+    return _auth_client
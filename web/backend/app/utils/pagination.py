@@ -0,0 +1,44 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Tuple
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque cursor pointing after the row with the given id"""
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """Id encoded in cursor, ValueError if the cursor was not issued by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+def paginate(
+    query,
+    id_column,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    get_id: Callable[[Any], int] = lambda row: row.id
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of query ordered by id_column.
+    
+    With a cursor the page starts right after the cursor row (keyset, index range scan)
+    and skip is ignored; without one the legacy skip/limit offset is used. One extra row
+    is fetched to decide whether a next_cursor is returned.
+    """
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.filter(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(get_id(rows[limit - 1])) if 0 < limit < len(rows) else None
+    return rows[:limit], next_cursor
@@ -0,0 +1,301 @@
+"""
+Response cache for read-heavy endpoints (analytics).
+
+@cached_response keys a route by endpoint name, the caller's role and the normalized
+date range, and stores the JSON-encoded response in a backend: MemoryCacheBackend
+(per-process LRU) or RedisCacheBackend (any client with the redis.asyncio API, shared
+by all workers).
+
+Stampede protection: entries outlive their TTL by stale_seconds. Only the request that
+takes the per-key lock recomputes an expired entry, the others get the stale value
+meanwhile. Without any value, requests in the same process await the recomputing one
+and requests in other processes poll the backend until the lock is released.
+
+Invalidation bumps a generation counter that is part of every key, so it costs one
+increment however many entries are cached; entries of older generations are no longer
+read and expire with their TTL.
+"""
+import asyncio
+import functools
+import json
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from app.core.config import get_settings
+from app.functions.event_bus import event_bus
+from app.schemas.events import ContractEvent, ClaimEvent
+
+settings = get_settings()
+
+class MemoryCacheBackend:
+    """In-process LRU of JSON strings with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Kept apart from the LRU entries, evicting a counter would revive old generations
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        self._entries[key] = (time.time() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def add(self, key: str, value: str, ttl_seconds: int) -> bool:
+        """Set key only if it does not exist (lock acquisition)"""
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl_seconds)
+        return True
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def delete_if(self, key: str, value: str) -> bool:
+        """Delete key only if it still holds value (lock release)"""
+        if await self.get(key) != value:
+            return False
+        del self._entries[key]
+        return True
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def clear(self, prefix: str):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+        for key in [key for key in self._counters if key.startswith(prefix)]:
+            del self._counters[key]
+
+class RedisCacheBackend:
+    """
+    Backend on a redis.asyncio compatible client (get, set with ex/nx, delete, incr, eval,
+    scan_iter).
+    Without a client one is created from url on first use, so redis is only required
+    when this backend is configured.
+    """
+
+    DELETE_IF_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        self.url = url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio
+            self._client = redis.asyncio.from_url(self.url, decode_responses=True)
+        return self._client
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        await self.client.set(key, value, ex=ttl_seconds)
+
+    async def add(self, key: str, value: str, ttl_seconds: int) -> bool:
+        return bool(await self.client.set(key, value, ex=ttl_seconds, nx=True))
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def delete_if(self, key: str, value: str) -> bool:
+        """Delete key only if it still holds value, atomically (lock release)"""
+        return bool(await self.client.eval(self.DELETE_IF_SCRIPT, 1, key, value))
+
+    async def counter(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def clear(self, prefix: str):
+        keys = [key async for key in self.client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+def create_cache_backend():
+    if settings.analytics_cache_backend == "redis":
+        return RedisCacheBackend(url=settings.analytics_cache_redis_url)
+    return MemoryCacheBackend(max_entries=settings.analytics_cache_max_entries)
+
+class ResponseCache:
+    """TTL cache of endpoint responses with stale-while-recompute and per-key locking"""
+
+    def __init__(self, backend, prefix: str, stale_seconds: int, lock_seconds: int, enabled: bool = True):
+        self.backend = backend
+        self.prefix = prefix
+        self.stale_seconds = stale_seconds
+        self.lock_seconds = lock_seconds
+        self.enabled = enabled
+        self.generation_key = f"{prefix}:generation"
+        self.poll_seconds = 0.05
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.waits = 0
+
+    def key(self, endpoint: str, role: Optional[str], *parts) -> str:
+        return ":".join([self.prefix, endpoint, role or "-"] + [str(part) for part in parts])
+
+    async def _read(self, key: str) -> Optional[dict]:
+        raw = await self.backend.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def get_or_compute(self, key: str, ttl_seconds: int, compute: Callable[[], Awaitable]):
+        """Cached response for key, compute() is awaited by at most one request per key at a time"""
+        if not self.enabled:
+            return await compute()
+        
+        key = f"{key}:g{await self.backend.counter(self.generation_key)}"
+        entry = await self._read(key)
+        if entry is not None and entry["expires_at"] > time.time():
+            self.hits += 1
+            return entry["value"]
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if entry is not None:
+                self.stale += 1
+                return entry["value"]
+            self.waits += 1
+            return await asyncio.shield(inflight)
+        
+        lock_key = f"{key}:lock"
+        # Unique per holder: a lock that expired and was taken over is not released by us
+        lock_token = uuid.uuid4().hex
+        locked = await self.backend.add(lock_key, lock_token, self.lock_seconds)
+        if not locked:
+            # Another process is recomputing
+            if entry is not None:
+                self.stale += 1
+                return entry["value"]
+            self.waits += 1
+            entry = await self._wait_for(key, lock_key)
+            if entry is not None:
+                return entry["value"]
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = jsonable_encoder(await compute())
+            await self.backend.set(
+                key,
+                json.dumps({"expires_at": time.time() + ttl_seconds, "value": value}),
+                ttl_seconds + self.stale_seconds
+            )
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved, there may be no waiting request
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+            if locked:
+                await self.backend.delete_if(lock_key, lock_token)
+
+    async def _wait_for(self, key: str, lock_key: str) -> Optional[dict]:
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_seconds)
+            entry = await self._read(key)
+            if entry is not None:
+                return entry
+            if await self.backend.get(lock_key) is None:
+                # Lock released without a value (the computation failed)
+                return None
+        return None
+
+    async def invalidate(self):
+        """Make every cached response outdated, in constant time"""
+        await self.backend.incr(self.generation_key)
+
+    async def clear(self):
+        """Delete every cached response (scans the backend, prefer invalidate())"""
+        await self.backend.clear(self.prefix)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "waits": self.waits
+        }
+
+analytics_cache = ResponseCache(
+    create_cache_backend(),
+    prefix="analytics",
+    stale_seconds=settings.analytics_cache_stale_seconds,
+    lock_seconds=settings.analytics_cache_lock_seconds,
+    enabled=settings.analytics_cache_enabled
+)
+
+@event_bus.subscriber(ContractEvent, ClaimEvent)
+async def invalidate_analytics_cache(domain_event):
+    """Contract and claim changes make every cached analytics response outdated"""
+    await analytics_cache.invalidate()
+
+def normalize_period(start_date: Optional[date], end_date: Optional[date], default_days: int) -> Tuple[date, date]:
+    """Defaults of date-range reports: end today, start default_days earlier"""
+    end_date = end_date or date.today()
+    start_date = start_date or date.today() - timedelta(days=default_days)
+    return start_date, end_date
+
+def cached_response(endpoint: str, ttl_seconds: int, cache: ResponseCache = analytics_cache, default_days: int = 90):
+    """
+    Cache a route's response per endpoint, role and date range.
+    The route must take current_user; start_date/end_date, when present, are normalized
+    (see normalize_period) before they are used for the key and passed to the route.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            parts = []
+            if "start_date" in kwargs or "end_date" in kwargs:
+                kwargs["start_date"], kwargs["end_date"] = normalize_period(
+                    kwargs.get("start_date"), kwargs.get("end_date"), default_days
+                )
+                parts = [kwargs["start_date"].isoformat(), kwargs["end_date"].isoformat()]
+            role = (kwargs.get("current_user") or {}).get("role")
+            return await cache.get_or_compute(
+                cache.key(endpoint, role, *parts),
+                ttl_seconds,
+                lambda: func(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-quote pricing as /contracts/calculate does it vs vectorized quote_batch.
+
+    python benchmarks/bench_premium.py --quotes 50000
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.models import InsuranceProduct
+from app.functions.rating import RatingTable, quote_batch
+from app.schemas.contract import PremiumCalculationParams, PremiumCalculationResult
+
+def make_quotes(count: int, product_ids, seed: int = 1):
+    rng = random.Random(seed)
+    quotes = []
+    for _ in range(count):
+        risk_factors = {}
+        if rng.random() < 0.3:
+            risk_factors["high_risk_area"] = True
+        if rng.random() < 0.5:
+            risk_factors["previous_claims"] = rng.randint(0, 4)
+        if rng.random() < 0.4:
+            risk_factors["security_systems"] = True
+        quotes.append(PremiumCalculationParams(
+            product_id=rng.choice(product_ids),
+            coverage_amount=float(rng.randint(1, 200) * 10000),
+            client_age=rng.randint(18, 90),
+            risk_factors=risk_factors,
+            duration_months=rng.choice([6, 12, 24])
+        ))
+    return quotes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quotes", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    products = {
+        i: InsuranceProduct(id=i, name=f"Product {i}", base_premium=1000.0 * i, coverage_amount=100000.0 * i)
+        for i in range(1, 6)
+    }
+    tables = {product_id: RatingTable(product) for product_id, product in products.items()}
+    quotes = make_quotes(args.quotes, list(products))
+    
+    scalar_times, batch_times = [], []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        scalar = [PremiumCalculationResult(**tables[params.product_id].quote(params)) for params in quotes]
+        scalar_times.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        batch = quote_batch(quotes, tables)
+        batch_times.append(time.perf_counter() - started)
+    
+    assert [r.model_dump() for r in scalar] == batch, "batch results differ from scalar path"
+    
+    scalar_best, batch_best = min(scalar_times), min(batch_times)
+    print(f"quotes:     {args.quotes}")
+    print(f"scalar:     {scalar_best:.3f}s ({args.quotes / scalar_best:,.0f} quotes/s)")
+    print(f"vectorized: {batch_best:.3f}s ({args.quotes / batch_best:,.0f} quotes/s)")
+    print(f"speedup:    {scalar_best / batch_best:.2f}x")
+
+if __name__ == "__main__":
+    main()
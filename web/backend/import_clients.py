@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Скрипт для загрузки клиентов из CSV или NDJSON файла (миграция клиентских баз)
+
+Пример:
+    python import_clients.py clients.csv --chunk-size 5000
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.database import SessionLocal
+from app.functions.client_import_service import ClientImportService, detect_format, IMPORT_FORMATS
+
+def print_progress(report):
+    print(
+        f"   обработано {report.processed}: создано {report.created}, "
+        f"дубликатов {report.duplicates}, с ошибками {report.invalid}",
+        flush=True
+    )
+
+def import_clients(path: str, file_format: str = None, chunk_size: int = None, created_by: int = None):
+    """Загружает клиентов из файла, существующие email пропускаются"""
+    file_format = file_format or detect_format(path)
+    db = SessionLocal()
+    
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = ClientImportService(db).import_stream(
+                stream,
+                file_format,
+                created_by=created_by,
+                chunk_size=chunk_size,
+                progress=print_progress
+            )
+        
+        print(f"✅ Импорт завершен: создано {report.created} из {report.processed} записей")
+        for error in report.errors:
+            print(f"   строка {error.row}: {error.error}")
+        return report
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Импорт клиентов из CSV или NDJSON")
+    parser.add_argument("path", help="Путь к файлу")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Формат файла (по умолчанию по расширению)")
+    parser.add_argument("--chunk-size", type=int, help="Записей в одной вставке (по умолчанию BULK_CHUNK_SIZE)")
+    parser.add_argument("--created-by", type=int, help="ID пользователя, от имени которого создаются клиенты")
+    args = parser.parse_args()
+    import_clients(args.path, args.format, args.chunk_size, args.created_by)
@@ -7,23 +7,15 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import get_settings
 from app.db.models import InsuranceProduct, Client, Contract, Claim, ContractStatus, ClaimStatus
-from app.db.database import create_tables
+from app.db.database import SessionLocal
+from app.db.migrations import upgrade_database
 from datetime import date, datetime, timedelta
 
 def init_sample_data():
     """Создает полный набор тестовых данных"""
-    settings = get_settings()
-    
-    # Create database engine
-    engine = create_engine(settings.database_url)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Ensure tables exist
-    create_tables()
+    # Ensure schema is up to date
+    upgrade_database()
     
     # Create session
     db = SessionLocal()
@@ -0,0 +1,147 @@
+import random
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.database import Base
+from app.db.models import InsuranceProduct, Client, Contract, Claim, ContractStatus, ClaimStatus
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine shared across threads (TestClient runs sync code in a threadpool)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def reset_adjuster_workload():
+    """Process-level adjuster counts must not leak between test databases"""
+    from app.functions.assignment_service import adjuster_workload
+    adjuster_workload.reset()
+    yield
+    adjuster_workload.reset()
+
+@pytest.fixture(autouse=True)
+def reset_product_caches():
+    """Products and compiled rating tables are cached per process, product ids repeat across test databases"""
+    from app.functions.product_catalog import product_catalog
+    from app.functions.rating import rating_tables
+    product_catalog.invalidate()
+    rating_tables.invalidate()
+    yield
+    product_catalog.invalidate()
+    rating_tables.invalidate()
+
+@pytest.fixture(autouse=True)
+def reset_analytics_cache():
+    """Cached analytics responses must not leak between test databases"""
+    import asyncio
+    from app.utils.response_cache import analytics_cache
+    from app.functions.event_bus import event_bus
+    asyncio.run(analytics_cache.clear())
+    yield
+    # Subscribers of events published by the test must not run during the next one
+    event_bus.wait_idle(5)
+    asyncio.run(analytics_cache.clear())
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+def seed_sample_data(db, seed: int = 42, contracts_count: int = 200, claims_count: int = 120):
+    """Deterministic book of products, clients, contracts and claims spread over 2024"""
+    rng = random.Random(seed)
+    
+    products = [
+        InsuranceProduct(name=f"Product {i}", description="", base_premium=1000.0 * i, coverage_amount=100000.0 * i)
+        for i in range(1, 5)
+    ]
+    db.add_all(products)
+    db.flush()
+    
+    clients = [
+        Client(first_name=f"First{i}", last_name=f"Last{i}", email=f"client{i}@example.com", created_at=datetime(2024, 1, 1) + timedelta(days=i))
+        for i in range(30)
+    ]
+    db.add_all(clients)
+    db.flush()
+    
+    # Product id 999 does not exist, analytics must report it as unknown
+    product_ids = [p.id for p in products] + [999]
+    contracts = []
+    for i in range(contracts_count):
+        contracts.append(Contract(
+            contract_number=f"CON-2024-{i:06d}",
+            client_id=rng.choice(clients).id,
+            product_id=rng.choice(product_ids),
+            agent_id=rng.randint(1, 6),
+            premium_amount=float(rng.randint(1, 400) * 50),
+            coverage_amount=float(rng.randint(1, 20) * 50000),
+            start_date=date(2024, 1, 1),
+            end_date=date(2025, 1, 1),
+            status=rng.choice(list(ContractStatus)),
+            created_at=datetime(2024, 1, 1) + timedelta(hours=rng.randint(0, 365 * 24))
+        ))
+    db.add_all(contracts)
+    db.flush()
+    
+    for i in range(claims_count):
+        status = rng.choice(list(ClaimStatus))
+        claim_amount = float(rng.randint(1, 200) * 100)
+        created_at = datetime(2024, 1, 1) + timedelta(hours=rng.randint(0, 365 * 24))
+        db.add(Claim(
+            claim_number=f"CLM-2024-{i:07d}",
+            contract_id=rng.choice(contracts).id,
+            incident_date=date(2024, 1, 1),
+            description="Seeded claim",
+            claim_amount=claim_amount if rng.random() > 0.1 else None,
+            approved_amount=claim_amount / 2 if status in (ClaimStatus.APPROVED, ClaimStatus.PAID) else None,
+            status=status,
+            adjuster_id=rng.choice([None, 11, 12, 13]),
+            created_at=created_at,
+            updated_at=created_at + timedelta(days=rng.randint(0, 30))
+        ))
+    db.commit()
+
+@pytest.fixture
+def seeded_db(db):
+    seed_sample_data(db)
+    return db
+
+@pytest.fixture
+def current_user():
+    """User returned by the overridden auth dependency, tests may change the role"""
+    return {"user_id": 1, "username": "test_manager", "role": "manager", "valid": True}
+
+@pytest.fixture
+def client(engine, current_user):
+    """TestClient bound to the SQLite engine with authentication bypassed"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db.database import get_db
+    from app.utils.auth import get_current_user
+    
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: current_user
+    # Startup hooks are not run, so no connection to the configured database is made
+    yield TestClient(app)
+    app.dependency_overrides.clear()
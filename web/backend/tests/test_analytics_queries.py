@@ -0,0 +1,78 @@
+import pytest
+from datetime import date
+from app.db.models import Contract, Claim, InsuranceProduct
+from app.functions.analytics_service import AnalyticsService
+from app.modules.analytics import AnalyticsRequest, ReportType
+from tests.utils import assert_max_queries
+
+# Upper bound of SQL statements per analytics endpoint
+ENDPOINT_QUERY_LIMITS = {
+    "/api/v1/analytics/dashboard": 1,
+    "/api/v1/analytics/reports/finance?start_date=2024-01-01&end_date=2025-01-01": 1,
+    "/api/v1/analytics/reports/activity?start_date=2024-01-01&end_date=2025-01-01": 1,
+    "/api/v1/analytics/reports/contracts": 0,
+    "/api/v1/analytics/reports/claims": 0,
+    "/api/v1/analytics/reports/revenue": 0,
+    "/api/v1/analytics/statistics/overview": 0,
+}
+
+@pytest.mark.parametrize("url,max_queries", ENDPOINT_QUERY_LIMITS.items())
+def test_analytics_endpoint_query_count(client, engine, seeded_db, url, max_queries):
+    with assert_max_queries(engine, max_queries):
+        response = client.get(url)
+    assert response.status_code == 200
+
+def test_performance_analytics_query_count(seeded_db, engine):
+    request = AnalyticsRequest(report_type=ReportType.PERFORMANCE, start_date=date(2024, 1, 1), end_date=date(2025, 1, 1))
+    with assert_max_queries(engine, 3):
+        metrics = AnalyticsService(seeded_db).get_performance_analytics(request)
+    assert {p['product_name'] for p in metrics.product_performance} >= {'Unknown'}
+
+def legacy_finance_report(db, start_date: date, end_date: date) -> dict:
+    """Original per-row implementation of the finance report"""
+    contracts = db.query(Contract).filter(Contract.created_at >= start_date, Contract.created_at <= end_date).order_by(Contract.id).all()
+    paid_claims = db.query(Claim).filter(
+        Claim.updated_at >= start_date, Claim.updated_at <= end_date, Claim.status == 'approved'
+    ).order_by(Claim.id).all()
+    
+    monthly_data = {}
+    for contract in contracts:
+        month = monthly_data.setdefault(contract.created_at.strftime('%Y-%m'), {'premiums': 0, 'claims': 0})
+        month['premiums'] += contract.premium_amount
+    for claim in paid_claims:
+        month_key = claim.updated_at.strftime('%Y-%m')
+        if month_key in monthly_data:
+            monthly_data[month_key]['claims'] += claim.approved_amount or 0
+    
+    product_data = {}
+    for contract in contracts:
+        if contract.product_id not in product_data:
+            product = db.query(InsuranceProduct).filter(InsuranceProduct.id == contract.product_id).first()
+            product_data[contract.product_id] = {
+                'product_name': product.name if product else f'Product {contract.product_id}',
+                'premiums': 0, 'claims': 0, 'count': 0
+            }
+        product_data[contract.product_id]['premiums'] += contract.premium_amount
+        product_data[contract.product_id]['count'] += 1
+    for claim in paid_claims:
+        if claim.contract and claim.contract.product_id in product_data:
+            product_data[claim.contract.product_id]['claims'] += claim.approved_amount or 0
+    
+    total_premiums = sum(c.premium_amount for c in contracts)
+    total_claims = sum(c.approved_amount or 0 for c in paid_claims)
+    return {
+        'total_premiums': total_premiums,
+        'total_claims': total_claims,
+        'profit': total_premiums - total_claims,
+        'period': {'start': start_date.isoformat(), 'end': end_date.isoformat()},
+        'by_month': [
+            {'month': m, 'premiums': d['premiums'], 'claims': d['claims'], 'profit': d['premiums'] - d['claims']}
+            for m, d in sorted(monthly_data.items())
+        ],
+        'by_product': list(product_data.values())
+    }
+
+def test_finance_report_matches_legacy_implementation(seeded_db):
+    for start_date, end_date in [(date(2024, 1, 1), date(2025, 1, 1)), (date(2024, 5, 1), date(2024, 8, 1))]:
+        report = AnalyticsService(seeded_db).get_finance_report(start_date, end_date)
+        assert report.model_dump() == legacy_finance_report(seeded_db, start_date, end_date)
@@ -0,0 +1,152 @@
+from datetime import date, datetime
+from app.db.models import Client, Contract, Claim, ContractStatus, ClaimStatus
+from app.functions.analytics_service import AnalyticsService
+from app.modules.analytics import AnalyticsRequest, ReportType, SalesMetrics, ClaimsMetrics
+
+def legacy_sales_analytics(db, request: AnalyticsRequest) -> SalesMetrics:
+    """Original in-memory implementation of get_sales_analytics, kept as the reference"""
+    contracts = db.query(Contract).filter(
+        Contract.created_at >= request.start_date,
+        Contract.created_at <= request.end_date
+    ).order_by(Contract.id).all()
+    
+    total_contracts = len(contracts)
+    total_premium = sum(c.premium_amount for c in contracts)
+    average_premium = total_premium / total_contracts if total_contracts > 0 else 0
+    active_contracts = len([c for c in contracts if c.status == ContractStatus.ACTIVE])
+    conversion_rate = active_contracts / total_contracts if total_contracts > 0 else 0
+    
+    product_sales = {}
+    for contract in contracts:
+        product_id = contract.product_id
+        if product_id in product_sales:
+            product_sales[product_id]['count'] += 1
+            product_sales[product_id]['premium'] += contract.premium_amount
+        else:
+            product_sales[product_id] = {
+                'product_id': product_id,
+                'count': 1,
+                'premium': contract.premium_amount,
+                'product_name': contract.product.name if contract.product else 'Unknown'
+            }
+    top_products = sorted(product_sales.values(), key=lambda x: x['premium'], reverse=True)[:5]
+    
+    agent_sales = {}
+    for contract in contracts:
+        agent_id = contract.agent_id
+        if agent_id in agent_sales:
+            agent_sales[agent_id]['count'] += 1
+            agent_sales[agent_id]['premium'] += contract.premium_amount
+        else:
+            agent_sales[agent_id] = {'agent_id': agent_id, 'count': 1, 'premium': contract.premium_amount}
+    sales_by_agent = sorted(agent_sales.values(), key=lambda x: x['premium'], reverse=True)
+    
+    return SalesMetrics(
+        total_contracts=total_contracts,
+        total_premium=total_premium,
+        average_premium=average_premium,
+        conversion_rate=conversion_rate,
+        top_products=top_products,
+        sales_by_agent=sales_by_agent
+    )
+
+def legacy_claims_analytics(db, request: AnalyticsRequest) -> ClaimsMetrics:
+    """Original in-memory implementation of get_claims_analytics"""
+    claims = db.query(Claim).filter(
+        Claim.created_at >= request.start_date,
+        Claim.created_at <= request.end_date
+    ).order_by(Claim.id).all()
+    
+    total_claims = len(claims)
+    total_claimed_amount = sum(c.claim_amount or 0 for c in claims)
+    total_approved_amount = sum(c.approved_amount or 0 for c in claims if c.approved_amount)
+    average_claim_amount = total_claimed_amount / total_claims if total_claims > 0 else 0
+    approved_claims = len([c for c in claims if c.status == ClaimStatus.APPROVED])
+    approval_rate = approved_claims / total_claims if total_claims > 0 else 0
+    claims_by_status = {status.value: len([c for c in claims if c.status == status]) for status in ClaimStatus}
+    
+    adjuster_claims = {}
+    for claim in claims:
+        if claim.adjuster_id:
+            entry = adjuster_claims.setdefault(claim.adjuster_id, {'adjuster_id': claim.adjuster_id, 'count': 0, 'total_amount': 0})
+            entry['count'] += 1
+            entry['total_amount'] += claim.claim_amount or 0
+    
+    return ClaimsMetrics(
+        total_claims=total_claims,
+        total_claimed_amount=total_claimed_amount,
+        total_approved_amount=total_approved_amount,
+        average_claim_amount=average_claim_amount,
+        approval_rate=approval_rate,
+        claims_by_status=claims_by_status,
+        claims_by_adjuster=list(adjuster_claims.values())
+    )
+
+def sales_request(start_date: date, end_date: date) -> AnalyticsRequest:
+    return AnalyticsRequest(report_type=ReportType.SALES, start_date=start_date, end_date=end_date)
+
+RANGES = [
+    (date(2024, 1, 1), date(2025, 1, 1)),
+    (date(2024, 3, 1), date(2024, 6, 30)),
+    (date(2024, 12, 30), date(2024, 12, 31)),
+]
+
+def test_sales_analytics_matches_legacy_implementation(seeded_db):
+    service = AnalyticsService(seeded_db)
+    for start_date, end_date in RANGES:
+        request = sales_request(start_date, end_date)
+        assert service.get_sales_analytics(request) == legacy_sales_analytics(seeded_db, request)
+
+def test_sales_analytics_empty_range(seeded_db):
+    metrics = AnalyticsService(seeded_db).get_sales_analytics(sales_request(date(2030, 1, 1), date(2030, 2, 1)))
+    assert metrics.total_contracts == 0
+    assert metrics.total_premium == 0
+    assert metrics.top_products == []
+    assert metrics.sales_by_agent == []
+
+def test_claims_analytics_matches_legacy_implementation(seeded_db):
+    service = AnalyticsService(seeded_db)
+    for start_date, end_date in RANGES:
+        request = AnalyticsRequest(report_type=ReportType.CLAIMS, start_date=start_date, end_date=end_date)
+        assert service.get_claims_analytics(request) == legacy_claims_analytics(seeded_db, request)
+
+def test_financial_analytics_monthly_breakdown(seeded_db):
+    request = AnalyticsRequest(report_type=ReportType.FINANCIAL, start_date=date(2024, 1, 1), end_date=date(2025, 1, 1))
+    metrics = AnalyticsService(seeded_db).get_financial_analytics(request)
+    
+    contracts = seeded_db.query(Contract).filter(
+        Contract.created_at >= request.start_date,
+        Contract.created_at <= request.end_date
+    ).all()
+    expected_months = {}
+    for contract in contracts:
+        month_key = contract.created_at.strftime('%Y-%m')
+        expected_months[month_key] = expected_months.get(month_key, 0) + contract.premium_amount
+    
+    assert metrics.monthly_revenue == [
+        {'month': month, 'revenue': revenue} for month, revenue in sorted(expected_months.items())
+    ]
+    assert metrics.total_revenue == sum(c.premium_amount for c in contracts)
+    assert sum(p['revenue'] for p in metrics.revenue_by_product) == metrics.total_revenue
+
+def test_dashboard_snapshot_counts(seeded_db):
+    month_start = datetime.combine(date.today().replace(day=1), datetime.min.time())
+    seeded_db.add(Client(first_name="New", last_name="Client", email="new@example.com", created_at=month_start))
+    seeded_db.add(Contract(
+        contract_number="CON-NEW-000001", client_id=1, product_id=1, agent_id=1,
+        premium_amount=500.0, coverage_amount=10000.0, start_date=date.today(), end_date=date.today(),
+        status=ContractStatus.ACTIVE, created_at=month_start
+    ))
+    seeded_db.commit()
+    
+    service = AnalyticsService(seeded_db)
+    data = service.get_dashboard_data()
+    
+    assert data["clients"] == {"total": 31, "active": 31, "new_this_month": 1}
+    assert data["contracts"]["total"] == seeded_db.query(Contract).count()
+    assert data["contracts"]["active"] == seeded_db.query(Contract).filter(Contract.status == ContractStatus.ACTIVE).count()
+    assert data["claims"]["pending"] == seeded_db.query(Claim).filter(
+        Claim.status.in_([ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW])
+    ).count()
+    assert data["revenue"]["monthly"] == 500.0
+    assert service.get_dashboard_summary().total_revenue_mtd == 500.0
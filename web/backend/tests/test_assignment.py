@@ -0,0 +1,90 @@
+import time
+from app.db.models import Claim, ClaimStatus
+from app.functions.assignment_service import AdjusterWorkload, AssignmentService, adjuster_workload
+from app.functions.claim_service import ClaimService
+from app.schemas.claim import ClaimDecisionRequest
+from tests.utils import assert_max_queries
+
+def test_picks_least_loaded_then_smallest_amount():
+    workload = AdjusterWorkload(resync_seconds=60, roster=[3])
+    workload.load({1: (2, 500.0), 2: (1, 900.0), 4: (1, 100.0)})
+    
+    # 3 has no open claims, then ties on count are broken by open amount
+    assert [workload.pick(50.0) for _ in range(4)] == [3, 3, 4, 2]
+    assert [q["adjuster_id"] for q in workload.queue_depths()] == [3, 4, 1, 2]
+    assert {q["open_claims"] for q in workload.queue_depths()} == {2}
+
+def test_respects_limit_and_pool():
+    workload = AdjusterWorkload(resync_seconds=60, max_open_claims=2)
+    workload.load({1: (0, 0.0), 2: (1, 0.0)})
+    
+    assert workload.pick(eligible={2}) == 2
+    assert workload.pick(eligible={2}) is None
+    assert [workload.pick() for _ in range(3)] == [1, 1, None]
+    
+    workload.release(2, 0.0)
+    assert workload.pick() == 2
+
+def test_pick_scales_to_many_adjusters():
+    workload = AdjusterWorkload(resync_seconds=60)
+    workload.load({adjuster_id: (adjuster_id % 50, 0.0) for adjuster_id in range(500)})
+    
+    started = time.perf_counter()
+    picked = [workload.pick(100.0) for _ in range(20000)]
+    assert time.perf_counter() - started < 2
+    
+    depths = [q["open_claims"] for q in workload.queue_depths()]
+    assert max(depths) - min(depths) <= 1
+    assert len(set(picked)) == 500
+
+def test_resync_counts_open_claims(seeded_db, engine):
+    service = AssignmentService(seeded_db)
+    with assert_max_queries(engine, 1):
+        depths = service.queue_depths()
+        service.queue_depths()
+    
+    open_claims = seeded_db.query(Claim).filter(
+        Claim.status.in_([ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW]),
+        Claim.adjuster_id.isnot(None)
+    ).count()
+    assert {q["adjuster_id"] for q in depths} == {11, 12, 13}
+    assert sum(q["open_claims"] for q in depths) == open_claims
+
+def test_drained_adjuster_stays_known_across_resyncs(seeded_db):
+    service = AssignmentService(seeded_db)
+    service.resync()
+    # Adjuster 13 closes every open claim
+    for claim in seeded_db.query(Claim).filter(
+        Claim.adjuster_id == 13, Claim.status.in_([ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW])
+    ):
+        claim.status = ClaimStatus.APPROVED
+    seeded_db.commit()
+    
+    service.resync()
+    depths = {q["adjuster_id"]: q["open_claims"] for q in service.queue_depths()}
+    assert depths[13] == 0
+    assert service.pick_adjuster(100.0) == 13
+    
+    # A new process learns about 13 from its closed claims
+    workload = AdjusterWorkload(resync_seconds=60)
+    assert AssignmentService(seeded_db, workload).pick_adjuster(100.0) == 13
+
+def test_decision_releases_adjuster_queue(seeded_db):
+    service = ClaimService(seeded_db)
+    claim = seeded_db.query(Claim).filter(
+        Claim.status == ClaimStatus.UNDER_REVIEW, Claim.adjuster_id == 11
+    ).first()
+    before = {q["adjuster_id"]: q["open_claims"] for q in AssignmentService(seeded_db).queue_depths()}
+    
+    service.make_decision(claim.id, ClaimDecisionRequest(decision="approved"), adjuster_id=11)
+    
+    after = {q["adjuster_id"]: q["open_claims"] for q in adjuster_workload.queue_depths()}
+    assert after[11] == before[11] - 1
+
+def test_queues_endpoint(client, seeded_db, current_user):
+    response = client.get("/api/v1/claims/assignment/queues")
+    assert response.status_code == 200
+    assert [q["adjuster_id"] for q in response.json()] != []
+    
+    current_user["role"] = "operator"
+    assert client.get("/api/v1/claims/assignment/queues").status_code == 403
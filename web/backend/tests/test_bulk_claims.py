@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from collections import Counter
+from app.db.models import Claim, ClaimStatus, Contract, ContractStatus
+from app.functions.claim_service import ClaimService
+from app.schemas.claim import ClaimSubmitRequest
+from tests.utils import assert_max_queries
+
+def submission(contract_id, **overrides):
+    data = {
+        "contract_id": contract_id,
+        "incident_date": "2024-06-01",
+        "description": "Water damage after the storm in the kitchen",
+        "claim_amount": 100.0,
+        "documents": ["photo.jpg"],
+        "customer_contact": "+7 900 000 00 00"
+    }
+    data.update(overrides)
+    return ClaimSubmitRequest(**data)
+
+def active_contract_ids(db, limit=None):
+    query = db.query(Contract.id).filter(Contract.status == ContractStatus.ACTIVE).order_by(Contract.id)
+    return [row.id for row in query.limit(limit)]
+
+def test_bulk_submit_checks_each_claim(seeded_db):
+    active_id = active_contract_ids(seeded_db, 1)[0]
+    inactive_id = seeded_db.query(Contract.id).filter(Contract.status != ContractStatus.ACTIVE).first().id
+    items = [
+        submission(active_id),
+        submission(99999),
+        submission(inactive_id),
+        submission(active_id, description="short"),
+        submission(active_id, incident_date="not a date"),
+        submission(active_id, incident_date=(date.today() + timedelta(days=1)).isoformat()),
+    ]
+    result = ClaimService(seeded_db).submit_claims_bulk(items, created_by=1)
+    
+    assert (result.created, result.failed, result.assigned) == (1, 5, 1)
+    assert [r.error for r in result.results] == [
+        None, "Contract not found", "Contract is not active", "Validation failed", "Validation failed", "Validation failed"
+    ]
+    assert result.results[3].validation_checklist["description_complete"] is False
+    assert result.results[4].validation_checklist["incident_date_valid"] is False
+    assert result.results[5].validation_checklist["incident_date_valid"] is False
+    
+    # Without a pool the claim goes to one of the adjusters already holding claims
+    claim = seeded_db.get(Claim, result.results[0].claim_id)
+    assert claim.status == ClaimStatus.UNDER_REVIEW
+    assert claim.adjuster_id in (11, 12, 13)
+    assert claim.incident_date == date(2024, 6, 1)
+
+def test_bulk_submit_balances_adjusters(seeded_db, engine):
+    contract_ids = active_contract_ids(seeded_db)
+    items = [submission(contract_ids[i % len(contract_ids)]) for i in range(300)]
+    service = ClaimService(seeded_db)
+    
+    def open_counts():
+        rows = seeded_db.query(Claim.adjuster_id).filter(
+            Claim.status.in_([ClaimStatus.SUBMITTED, ClaimStatus.UNDER_REVIEW]),
+            Claim.adjuster_id.in_([11, 12, 13, 14])
+        )
+        return Counter(row.adjuster_id for row in rows)
+    
+    # contracts, adjuster loads, 2 to start the number counter, numbers, one INSERT
+    with assert_max_queries(engine, 7):
+        result = service.submit_claims_bulk(items, adjuster_ids=[11, 12, 13, 14])
+    
+    assert result.created == result.assigned == 300
+    assert all(r.status == "under_review" for r in result.results)
+    loads = open_counts()
+    assert max(loads.values()) - min(loads.values()) <= 1
+    assert loads[14] > 0
+
+def test_bulk_submit_endpoint(client, seeded_db, current_user):
+    current_user["role"] = "operator"
+    contract_id = active_contract_ids(seeded_db, 1)[0]
+    payload = {"claims": [submission(contract_id).dict()], "adjuster_ids": [21]}
+    response = client.post("/api/v1/claims/submit/bulk", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 1
+    assert body["results"][0]["adjuster_id"] == 21
@@ -0,0 +1,53 @@
+from datetime import date
+from app.db.models import Contract, ContractStatus
+from app.functions.contract_service import ContractService
+from app.schemas.contract import ContractCreate
+from tests.utils import assert_max_queries
+
+def contract_item(client_id=1, product_id=1, premium=1200.0):
+    return ContractCreate(
+        client_id=client_id,
+        product_id=product_id,
+        premium_amount=premium,
+        coverage_amount=100000.0,
+        start_date=date(2024, 1, 1),
+        end_date=date(2025, 1, 1)
+    )
+
+def test_bulk_creates_valid_items_and_reports_invalid(seeded_db):
+    items = [contract_item(), contract_item(client_id=9999), contract_item(product_id=999), contract_item(client_id=2)]
+    result = ContractService(seeded_db).create_contracts_bulk(items, agent_id=7)
+    
+    assert (result.created, result.failed) == (2, 2)
+    assert [r.success for r in result.results] == [True, False, False, True]
+    assert result.results[1].error == "Client not found"
+    assert result.results[2].error == "Insurance product not found"
+    
+    created = seeded_db.get(Contract, result.results[3].contract_id)
+    assert created.client_id == 2
+    assert created.agent_id == 7
+    assert created.status == ContractStatus.DRAFT
+    assert created.contract_number == result.results[3].contract_number
+
+def test_bulk_statement_count_does_not_grow_with_items(seeded_db, engine):
+    items = [contract_item(client_id=(i % 30) + 1) for i in range(500)]
+    # 2 validation queries, 2 to start the number counter, then per chunk: number allocation, INSERT, dashboard counters
+    with assert_max_queries(engine, 2 + 2 + 3 * 5):
+        result = ContractService(seeded_db).create_contracts_bulk(items, agent_id=1, chunk_size=100)
+    
+    assert result.created == 500
+    numbers = [r.contract_number for r in result.results]
+    assert len(set(numbers)) == 500
+    assert len({r.contract_id for r in result.results}) == 500
+
+def test_bulk_endpoint(client, seeded_db, current_user):
+    current_user["role"] = "agent"
+    payload = {"contracts": [
+        {"client_id": 1, "product_id": 1, "premium_amount": 100, "coverage_amount": 1000, "start_date": "2024-01-01", "end_date": "2025-01-01"},
+        {"client_id": 1, "product_id": 12345, "premium_amount": 100, "coverage_amount": 1000, "start_date": "2024-01-01", "end_date": "2025-01-01"},
+    ]}
+    response = client.post("/api/v1/contracts/bulk", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 1
+    assert body["results"][1]["error"] == "Insurance product not found"
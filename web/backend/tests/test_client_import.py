@@ -0,0 +1,60 @@
+import io
+import json
+from app.db.models import Client
+from app.functions.client_import_service import ClientImportService
+from tests.utils import count_queries
+
+CSV_FILE = """first_name,last_name,email,phone,date_of_birth
+Anna,Ivanova,anna@example.com,+7900,1990-05-01
+Boris,Petrov,boris@example.com,,
+Anna,Copy,anna@example.com,,
+Bad,Row,not-an-email,,
+Seeded,Client,client3@example.com,,
+"""
+
+def test_csv_import_validates_and_deduplicates(seeded_db):
+    report = ClientImportService(seeded_db).import_stream(io.StringIO(CSV_FILE), "csv", created_by=5, chunk_size=2)
+    
+    assert (report.processed, report.created, report.duplicates, report.invalid) == (5, 2, 2, 1)
+    assert report.chunks == 3
+    assert report.errors[0].row == 4
+    assert report.errors[0].error.startswith("email")
+    
+    anna = seeded_db.query(Client).filter(Client.email == "anna@example.com").one()
+    assert anna.last_name == "Ivanova"
+    assert anna.phone == "+7900"
+    assert anna.created_by == 5
+    assert len(anna.identification_number) == 8
+
+def test_ndjson_import_reports_progress_per_chunk(db):
+    lines = [json.dumps({"first_name": f"F{i}", "last_name": "L", "email": f"user{i}@example.com"}) for i in range(250)]
+    lines.insert(10, "{broken json")
+    progress = []
+    
+    with count_queries(db.get_bind()) as counter:
+        report = ClientImportService(db).import_stream(
+            io.StringIO("\n".join(lines)), "ndjson", chunk_size=100,
+            progress=lambda r: progress.append(r.processed)
+        )
+    
+    assert progress == [100, 200, 251]
+    assert report.created == 250
+    assert report.invalid == 1
+    assert db.query(Client).count() == 250
+    # Per chunk: email lookup, id allocation and one INSERT, not one statement per row
+    assert counter.count < 20
+
+def test_import_endpoint(client, seeded_db, current_user):
+    current_user["role"] = "admin"
+    response = client.post(
+        "/api/v1/clients/import",
+        files={"file": ("clients.csv", CSV_FILE.encode(), "text/csv")}
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+    
+    response = client.post(
+        "/api/v1/clients/import",
+        files={"file": ("clients.txt", b"", "text/plain")}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,124 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from app.db.models import Claim, ClaimStatus, Contract, ContractStatus, DashboardCounter
+from app.functions.analytics_service import AnalyticsService
+from app.functions.claim_service import ClaimService
+from app.functions.contract_service import ContractService
+from app.functions.counter_service import (
+    CounterService, counter_deltas, revenue_counter,
+    CONTRACTS_ACTIVE, CLAIMS_PENDING, CLAIMS_APPROVED_AMOUNT, REVENUE_TOTAL
+)
+from app.schemas.claim import ClaimDecisionRequest, ClaimUpdate
+from app.schemas.contract import ContractUpdate
+from app.schemas.events import ClaimDecided
+from tests.test_bulk_contracts import contract_item
+from tests.utils import assert_max_queries
+
+def stored_counters(db):
+    return dict(db.execute(select(DashboardCounter.name, DashboardCounter.value)).all())
+
+def test_reconcile_counts_source_tables(seeded_db):
+    values = CounterService(seeded_db).reconcile()
+    snapshot = AnalyticsService(seeded_db).get_dashboard_snapshot()
+    
+    assert values == {
+        CONTRACTS_ACTIVE: snapshot.contracts_active,
+        CLAIMS_PENDING: snapshot.claims_pending,
+        CLAIMS_APPROVED_AMOUNT: snapshot.claims_approved_amount,
+        REVENUE_TOTAL: snapshot.revenue_total,
+        revenue_counter(date.today()): 0.0
+    }
+    assert stored_counters(seeded_db) == values
+
+def test_month_to_date_revenue_matches_snapshot(seeded_db):
+    contracts = ContractService(seeded_db)
+    today_contract = contracts.create_contract(contract_item(premium=1000.0), agent_id=1)
+    future_contract = contracts.create_contract(contract_item(premium=500.0), agent_id=1)
+    # Dated after today, e.g. by an import with a wrong clock
+    future_contract.created_at = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    seeded_db.commit()
+    
+    values = CounterService(seeded_db).count()
+    snapshot = AnalyticsService(seeded_db).get_dashboard_snapshot()
+    assert values[revenue_counter(date.today())] == snapshot.revenue_mtd == today_contract.premium_amount
+
+def test_transitions_keep_counters_exact(seeded_db):
+    counters = CounterService(seeded_db)
+    before = counters.reconcile()
+    contracts = ContractService(seeded_db)
+    claims = ClaimService(seeded_db)
+    
+    contract = contracts.create_contract(contract_item(premium=1000.0), agent_id=1)
+    contracts.activate_contract(contract.id)
+    other = contracts.create_contract(contract_item(premium=500.0), agent_id=1)
+    contracts.activate_contract(other.id)
+    contracts.suspend_contract(other.id)
+    contracts.cancel_contract(other.id)
+    claim = seeded_db.query(Claim).filter(Claim.status == ClaimStatus.SUBMITTED).first()
+    claims.make_decision(claim.id, ClaimDecisionRequest(decision="approved", approved_amount=300.0), adjuster_id=11)
+    paid = seeded_db.query(Claim).filter(Claim.status == ClaimStatus.APPROVED, Claim.id != claim.id).first()
+    claims.mark_as_paid(paid.id)
+    
+    after = stored_counters(seeded_db)
+    assert after[CONTRACTS_ACTIVE] == before[CONTRACTS_ACTIVE] + 1
+    assert after[REVENUE_TOTAL] == before[REVENUE_TOTAL] + 1500.0
+    assert after[revenue_counter(date.today())] == 1500.0
+    assert after[CLAIMS_PENDING] == before[CLAIMS_PENDING] - 1
+    assert after[CLAIMS_APPROVED_AMOUNT] == before[CLAIMS_APPROVED_AMOUNT] + 300.0 - paid.approved_amount
+    assert after == counters.count()
+
+def test_updates_keep_counters_exact(seeded_db):
+    counters = CounterService(seeded_db)
+    before = counters.reconcile()
+    contracts = ContractService(seeded_db)
+    claims = ClaimService(seeded_db)
+    
+    contract = contracts.create_contract(contract_item(premium=1000.0), agent_id=1)
+    contracts.update_contract(contract.id, ContractUpdate(status="active", premium_amount=1200.0))
+    expired = seeded_db.query(Contract).filter(Contract.status == ContractStatus.ACTIVE, Contract.id != contract.id).first()
+    contracts.update_contract(expired.id, ContractUpdate(status="expired"))
+    approved = seeded_db.query(Claim).filter(Claim.status == ClaimStatus.APPROVED).first()
+    claims.update_claim(approved.id, ClaimUpdate(status="under_review"))
+    submitted = seeded_db.query(Claim).filter(Claim.status == ClaimStatus.SUBMITTED).first()
+    claims.assign_adjuster(submitted.id, adjuster_id=12)
+    
+    after = stored_counters(seeded_db)
+    assert after[CONTRACTS_ACTIVE] == before[CONTRACTS_ACTIVE]
+    assert after[REVENUE_TOTAL] == before[REVENUE_TOTAL] + 1200.0
+    assert after[revenue_counter(date.today())] == 1200.0
+    assert after[CLAIMS_PENDING] == before[CLAIMS_PENDING] + 1
+    assert after == counters.count()
+
+def test_redecision_replaces_approved_amount():
+    event = ClaimDecided(
+        claim_id=1, contract_id=1, status="approved", previous_status="approved",
+        decision="approved", approved_amount=80.0, previous_approved_amount=100.0
+    )
+    assert counter_deltas([event]) == {CLAIMS_APPROVED_AMOUNT: -20.0}
+
+def test_summary_reads_counters_with_one_query(seeded_db, engine):
+    service = AnalyticsService(seeded_db)
+    # The first read creates the counters
+    summary = service.get_dashboard_summary()
+    snapshot = service.get_dashboard_snapshot()
+    assert (summary.active_contracts, summary.pending_claims) == (snapshot.contracts_active, snapshot.claims_pending)
+    assert summary.claims_ratio == snapshot.claims_approved_amount / snapshot.revenue_total
+    
+    with assert_max_queries(engine, 1):
+        assert service.get_dashboard_summary() == summary
+
+def test_reconcile_corrects_untracked_changes(seeded_db, client, current_user):
+    counters = CounterService(seeded_db)
+    counters.reconcile()
+    # A direct status change publishes no event
+    contract = seeded_db.query(Contract).filter(Contract.status == ContractStatus.ACTIVE).first()
+    contract.status = ContractStatus.EXPIRED
+    seeded_db.commit()
+    assert stored_counters(seeded_db) != counters.count()
+    
+    current_user["role"] = "admin"
+    response = client.post("/api/v1/analytics/counters/reconcile")
+    assert response.status_code == 200
+    seeded_db.expire_all()
+    assert stored_counters(seeded_db) == counters.count()
+    assert client.get("/api/v1/analytics/dashboard/summary").json()["active_contracts"] == counters.count()[CONTRACTS_ACTIVE]
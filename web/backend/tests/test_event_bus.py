@@ -0,0 +1,125 @@
+import threading
+import pytest
+from app.db.models import Claim, ClaimStatus, Contract, ContractStatus
+from app.functions.claim_service import ClaimService
+from app.functions.client_service import ClientService
+from app.functions.contract_service import ContractService
+from app.functions.event_bus import EventBus, event_bus, record_events
+from app.schemas.claim import ClaimDecisionRequest, ClaimUpdate
+from app.schemas.contract import ContractUpdate
+from app.schemas.client import ClientUpdate
+from app.schemas.events import (
+    DomainEvent, ContractEvent, ContractCreated, ContractActivated, ContractCancelled,
+    ContractUpdated, ClaimEvent, ClaimDecided, ClaimPaid, ClaimUpdated, ClientUpdated
+)
+from tests.test_bulk_contracts import contract_item
+from tests.utils import count_queries
+
+@pytest.fixture
+def received():
+    """Events delivered by the process event bus during the test"""
+    events = []
+    handler = events.append
+    event_bus.subscribe(DomainEvent, handler)
+    yield events
+    event_bus.wait_idle(5)
+    event_bus.unsubscribe(DomainEvent, handler)
+
+def delivered(events):
+    assert event_bus.wait_idle(5)
+    return events
+
+def test_contract_lifecycle_events(seeded_db, received):
+    service = ContractService(seeded_db)
+    contract = service.create_contract(contract_item(), agent_id=7)
+    service.activate_contract(contract.id)
+    service.cancel_contract(contract.id)
+    
+    events = delivered(received)
+    assert [type(e) for e in events] == [ContractCreated, ContractActivated, ContractCancelled]
+    assert all(e.contract_id == contract.id for e in events)
+    assert (events[0].status, events[0].agent_id, events[0].contract_number) == ("draft", 7, contract.contract_number)
+    assert (events[2].previous_status, events[2].status, events[2].premium_amount) == ("active", "cancelled", 1200.0)
+
+def test_bulk_creation_publishes_one_event_per_contract(seeded_db, received):
+    result = ContractService(seeded_db).create_contracts_bulk([contract_item(), contract_item(client_id=9999), contract_item()], agent_id=3, chunk_size=1)
+    events = delivered(received)
+    assert sorted(e.contract_id for e in events) == sorted(r.contract_id for r in result.results if r.success)
+
+def test_claim_decision_and_payment_events(seeded_db, received):
+    claim = seeded_db.query(Claim).filter(Claim.status == ClaimStatus.SUBMITTED).first()
+    service = ClaimService(seeded_db)
+    service.make_decision(claim.id, ClaimDecisionRequest(decision="approved", approved_amount=50.0), adjuster_id=11)
+    service.mark_as_paid(claim.id)
+    
+    decided, paid = delivered(received)
+    assert isinstance(decided, ClaimDecided) and isinstance(paid, ClaimPaid)
+    assert (decided.previous_status, decided.status, decided.decision, decided.approved_amount) == ("submitted", "approved", "approved", 50.0)
+    assert (paid.previous_status, paid.status, paid.approved_amount) == ("approved", "paid", 50.0)
+
+def test_contract_and_claim_updates_publish_events(seeded_db, received):
+    contract = seeded_db.query(Contract).filter(Contract.status == ContractStatus.ACTIVE).first()
+    premium = contract.premium_amount
+    ContractService(seeded_db).update_contract(contract.id, ContractUpdate(status="expired", premium_amount=premium + 10))
+    claim = seeded_db.query(Claim).filter(Claim.status == ClaimStatus.SUBMITTED).first()
+    ClaimService(seeded_db).update_claim(claim.id, ClaimUpdate(status="rejected"))
+    
+    contract_updated, claim_updated = delivered(received)
+    assert isinstance(contract_updated, ContractUpdated) and isinstance(claim_updated, ClaimUpdated)
+    assert (contract_updated.previous_status, contract_updated.status) == ("active", "expired")
+    assert (contract_updated.previous_premium_amount, contract_updated.premium_amount) == (premium, premium + 10)
+    assert contract_updated.fields == ["premium_amount", "status"]
+    assert (claim_updated.previous_status, claim_updated.status, claim_updated.fields) == ("submitted", "rejected", ["status"])
+
+def test_client_update_lists_changed_fields(seeded_db, received):
+    ClientService(seeded_db).update_client(1, ClientUpdate(phone="+100", address="Main st"))
+    (updated,) = delivered(received)
+    assert isinstance(updated, ClientUpdated)
+    assert (updated.client_id, updated.fields) == (1, ["address", "phone"])
+
+def test_events_are_dropped_on_rollback(seeded_db, received):
+    contract = seeded_db.query(Contract).filter(Contract.status == ContractStatus.ACTIVE).first()
+    contract.status = ContractStatus.CANCELLED
+    record_events(seeded_db, ContractCancelled(contract_id=contract.id, status="cancelled", previous_status="active"))
+    seeded_db.rollback()
+    seeded_db.commit()
+    assert delivered(received) == []
+
+def test_subscribers_run_off_the_writing_thread(caplog):
+    bus = EventBus()
+    release = threading.Event()
+    calls = []
+
+    def slow_subscriber(domain_event):
+        release.wait(5)
+        calls.append((domain_event.contract_id, threading.current_thread().name))
+
+    async def async_subscriber(domain_event):
+        calls.append(("async", domain_event.claim_id))
+
+    def failing_subscriber(domain_event):
+        raise RuntimeError("boom")
+    
+    bus.subscribe(ContractEvent, slow_subscriber)
+    bus.subscribe(ContractEvent, failing_subscriber)
+    bus.subscribe(ClaimEvent, async_subscriber)
+    bus.publish([ContractCancelled(contract_id=1, status="cancelled", previous_status="active")])
+    bus.publish([ClaimPaid(claim_id=5, contract_id=1, status="paid", previous_status="approved")])
+    # publish() returned while the subscriber is still blocked
+    assert calls == []
+    release.set()
+    assert bus.wait_idle(5)
+    assert calls == [(1, "event-bus"), ("async", 5)]
+    assert bus.stats() == {"published": 2, "dispatched": 2, "failed": 1, "queued": 0}
+    assert "Event subscriber failing_subscriber failed for ContractCancelled" in caplog.text
+    assert "RuntimeError: boom" in caplog.text
+
+def test_contract_changes_invalidate_analytics_cache(client, seeded_db, engine):
+    client.get("/api/v1/analytics/dashboard")
+    contract = seeded_db.query(Contract).filter(Contract.status == ContractStatus.DRAFT).first()
+    ContractService(seeded_db).activate_contract(contract.id)
+    assert event_bus.wait_idle(5)
+    
+    with count_queries(engine) as queries:
+        client.get("/api/v1/analytics/dashboard")
+    assert queries.count > 0
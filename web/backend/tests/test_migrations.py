@@ -0,0 +1,67 @@
+import os
+import pytest
+from argparse import Namespace
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from app.db.database import Base
+from app.db import migrations
+from app.db.migrations import SchemaVersionError, check_schema_version, head_revision, upgrade_database
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def alembic_config(url: str) -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.cmd_opts = Namespace(x=[f"url={url}"])
+    return config
+
+def test_migrations_match_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    command.upgrade(alembic_config(url), "head")
+    
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+    assert diff == []
+
+def test_initial_revision_matches_pre_migration_schema(tmp_path):
+    # Databases created by create_all() before migrations are stamped 0001, everything
+    # added since must come from later revisions
+    engine = create_engine(f"sqlite:///{tmp_path / 'initial.db'}")
+    upgrade_database(engine, "0001")
+    tables = set(inspect(engine).get_table_names()) - {"alembic_version"}
+    engine.dispose()
+    assert tables == {"clients", "insurance_products", "contracts", "claims"}
+
+def test_migrations_downgrade_to_base(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    config = alembic_config(url)
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+
+def test_schema_version_check(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrations.settings, "db_schema_check", "strict")
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    
+    with pytest.raises(SchemaVersionError, match="missing"):
+        check_schema_version(engine)
+    
+    upgrade_database(engine, "0002")
+    with pytest.raises(SchemaVersionError, match="0002"):
+        check_schema_version(engine)
+    
+    monkeypatch.setattr(migrations.settings, "db_schema_check", "warn")
+    warnings = []
+    monkeypatch.setattr(migrations.logger, "warning", warnings.append)
+    check_schema_version(engine)
+    assert len(warnings) == 1 and "revision is 0002" in warnings[0]
+    
+    monkeypatch.setattr(migrations.settings, "db_schema_check", "strict")
+    upgrade_database(engine)
+    assert migrations.current_revision(engine) == head_revision()
+    check_schema_version(engine)
+    engine.dispose()
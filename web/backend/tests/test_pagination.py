@@ -0,0 +1,79 @@
+import pytest
+from app.db.models import Claim
+from app.functions.client_service import ClientService
+from app.functions.contract_service import ContractService
+from app.utils.pagination import encode_cursor, decode_cursor
+from tests.utils import assert_max_queries
+
+def walk(fetch_page):
+    """Follow next_cursor until the last page, returning ids in order"""
+    ids, cursor = [], None
+    while True:
+        items, cursor = fetch_page(cursor)
+        ids.extend(items)
+        if cursor is None:
+            return ids
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_claims_cursor_pages_cover_all_claims(client, seeded_db):
+    def fetch_page(cursor):
+        params = {"limit": 25, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/claims/", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] is None
+        return [claim["id"] for claim in body["claims"]], body["next_cursor"]
+
+    expected = [row.id for row in seeded_db.query(Claim.id).order_by(Claim.id)]
+    assert walk(fetch_page) == expected
+
+def test_claims_offset_pages_keep_total(client, seeded_db):
+    response = client.get("/api/v1/claims/", params={"skip": 100, "limit": 50})
+    body = response.json()
+    assert body["total"] == 120
+    assert len(body["claims"]) == 20
+    assert body["next_cursor"] is None
+
+def test_invalid_cursor_is_rejected(client, seeded_db):
+    response = client.get("/api/v1/claims/", params={"cursor": "bogus"})
+    assert response.status_code == 400
+
+def test_cursor_page_without_total_is_single_query(seeded_db, engine):
+    service = ClientService(seeded_db)
+    _, _, cursor = service.get_clients(limit=10, include_total=False)
+    with assert_max_queries(engine, 1):
+        clients, total, _ = service.get_clients(limit=10, cursor=cursor, include_total=False)
+    assert total is None
+    assert [c.id for c in clients] == list(range(11, 21))
+
+def test_contract_cursor_pages_match_offset_pages(seeded_db):
+    service = ContractService(seeded_db)
+    by_offset = []
+    for skip in range(0, 200, 15):
+        contracts, _, _ = service.get_contracts(skip=skip, limit=15, product_id=1, include_total=False)
+        by_offset.extend(c.id for c in contracts)
+
+    def fetch_page(cursor):
+        contracts, _, next_cursor = service.get_contracts(limit=15, product_id=1, cursor=cursor, include_total=False)
+        return [c.id for c in contracts], next_cursor
+
+    assert walk(fetch_page) == by_offset
+
+def test_pending_claims_cursor_pages(client, seeded_db, current_user):
+    current_user["role"] = "adjuster"
+    response = client.get("/api/v1/claims/pending", params={"limit": 10})
+    body = response.json()
+    assert response.status_code == 200
+    assert len(body["pending_claims"]) == 10
+    
+    response = client.get("/api/v1/claims/pending", params={"limit": 10, "cursor": body["next_cursor"], "include_total": "false"})
+    next_body = response.json()
+    assert next_body["total"] is None
+    assert next_body["pending_claims"][0]["id"] > body["pending_claims"][-1]["id"]
+    assert all(c["status"] in ("submitted", "under_review") for c in next_body["pending_claims"])
@@ -0,0 +1,57 @@
+import random
+from app.db.models import InsuranceProduct
+from app.functions.contract_service import ContractService
+from app.functions.rating import RatingTable, quote_batch
+from app.schemas.contract import PremiumCalculationParams
+
+def random_quotes(count: int, product_ids, seed: int = 7):
+    rng = random.Random(seed)
+    factor_choices = [
+        ("high_risk_area", [True, False, 1, "yes", ""]),
+        ("previous_claims", [0, 1, 2, 3, 2.5, True, "3"]),
+        ("security_systems", [True, False, None]),
+        ("unknown_factor", [True]),
+    ]
+    quotes = []
+    for _ in range(count):
+        factors = rng.sample(factor_choices, rng.randint(0, len(factor_choices)))
+        quotes.append(PremiumCalculationParams(
+            product_id=rng.choice(product_ids),
+            coverage_amount=rng.choice([1000.0, 99999.99, 250000.0, 500000.0, 500000.01, 1234567.89]) * rng.random(),
+            client_age=rng.choice([None, 0, 18, 24, 25, 40, 65, 66, 90]),
+            risk_factors={name: rng.choice(values) for name, values in factors},
+            duration_months=rng.choice([1, 6, 12, 24, 36])
+        ))
+    return quotes
+
+def test_batch_matches_scalar_path(seeded_db):
+    service = ContractService(seeded_db)
+    products = {p.id: p for p in seeded_db.query(InsuranceProduct)}
+    quotes = random_quotes(3000, list(products))
+    
+    batch = quote_batch(quotes, {product_id: RatingTable(product) for product_id, product in products.items()})
+    for params, result in zip(quotes, batch):
+        expected = service.calculate_premium(params, products[params.product_id])
+        assert result == expected.model_dump()
+
+def test_batch_reports_unknown_products(seeded_db):
+    quotes = [
+        PremiumCalculationParams(product_id=1, coverage_amount=100000),
+        PremiumCalculationParams(product_id=999, coverage_amount=100000),
+        PremiumCalculationParams(product_id=1, coverage_amount=100000, duration_months=0),
+    ]
+    results = ContractService(seeded_db).calculate_premiums(quotes)["results"]
+    assert results[0]["result"]["final_premium"] == 1000.0
+    assert results[1]["error"] == "Insurance product not found"
+    assert "result" not in results[2]
+
+def test_batch_endpoint(client, seeded_db, current_user):
+    current_user["role"] = "agent"
+    payload = {"quotes": [
+        {"product_id": 2, "coverage_amount": 600000, "client_age": 22, "risk_factors": {"previous_claims": 2}},
+        {"product_id": 2, "coverage_amount": 600000, "client_age": 22, "risk_factors": {"previous_claims": 2}, "duration_months": 6},
+    ]}
+    response = client.post("/api/v1/contracts/calculate/batch", json=payload)
+    assert response.status_code == 200
+    single = client.post("/api/v1/contracts/calculate", json=payload["quotes"][0]).json()
+    assert response.json()["results"][0]["result"] == single
@@ -0,0 +1,60 @@
+from app.db.models import InsuranceProduct
+from app.functions.product_catalog import product_catalog
+from tests.utils import count_queries
+
+NEW_PRODUCT = {"name": "Travel", "description": "Trip cover", "base_premium": 300.0, "coverage_amount": 50000.0}
+
+def test_list_is_served_from_catalog_with_etag(client, seeded_db, current_user, engine):
+    response = client.get("/api/v1/products/")
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [1, 2, 3, 4]
+    etag = response.headers["etag"]
+    
+    with count_queries(engine) as queries:
+        again = client.get("/api/v1/products/")
+        not_modified = client.get("/api/v1/products/", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert queries.count == 0
+    assert again.headers["etag"] == etag
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+def test_writes_update_catalog(client, seeded_db, current_user):
+    etag = client.get("/api/v1/products/").headers["etag"]
+    version = product_catalog.version
+    
+    created = client.post("/api/v1/products/", json=NEW_PRODUCT).json()
+    response = client.get("/api/v1/products/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert created["id"] in [product["id"] for product in response.json()]
+    assert product_catalog.version == version + 1
+    
+    etag = response.headers["etag"]
+    client.put(f"/api/v1/products/{created['id']}", json={**NEW_PRODUCT, "base_premium": 350.0})
+    response = client.get("/api/v1/products/", headers={"If-None-Match": etag})
+    assert [p["base_premium"] for p in response.json() if p["id"] == created["id"]] == [350.0]
+    
+    current_user["role"] = "admin"
+    client.delete(f"/api/v1/products/{created['id']}")
+    products = client.get("/api/v1/products/").json()
+    assert created["id"] not in [product["id"] for product in products]
+    # Inactive products stay known for existing contracts and quotes
+    assert product_catalog.get(seeded_db, created["id"]).is_active is False
+
+def test_etag_is_content_based(seeded_db):
+    product_catalog.load(seeded_db)
+    etag, version = product_catalog.etag, product_catalog.version
+    product_catalog.load(seeded_db)
+    assert product_catalog.etag == etag
+    assert product_catalog.version == version + 1
+
+def test_products_from_other_processes_are_found(seeded_db):
+    product_catalog.load(seeded_db)
+    # Written without the catalog, as another worker would
+    product = InsuranceProduct(**NEW_PRODUCT, is_active=True)
+    seeded_db.add(product)
+    seeded_db.commit()
+    
+    assert product_catalog.get(seeded_db, product.id).name == "Travel"
+    assert product.id in [p.id for p in product_catalog.active(seeded_db)[0]]
+    assert product_catalog.get(seeded_db, 999) is None
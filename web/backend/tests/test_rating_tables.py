@@ -0,0 +1,95 @@
+from app.db.models import InsuranceProduct
+from app.functions.contract_service import ContractService
+from app.functions.rating import RatingTable, quote_batch, rating_tables
+from tests.test_premium_batch import random_quotes
+from tests.utils import count_queries
+
+def legacy_premium(params, product):
+    """Hard-coded rules calculate_premium used before rating tables"""
+    base_premium = product.base_premium * (params.coverage_amount / 100000)
+    risk_multiplier = 1.0
+    applied = {}
+    if params.client_age:
+        if params.client_age < 25:
+            risk_multiplier *= 1.2
+            applied["young_age"] = 0.2
+        elif params.client_age > 65:
+            risk_multiplier *= 1.1
+            applied["senior_age"] = 0.1
+    if params.coverage_amount > 500000:
+        risk_multiplier *= 1.1
+        applied["high_coverage"] = 0.1
+    for factor, value in params.risk_factors.items():
+        if factor == "high_risk_area" and value:
+            risk_multiplier *= 1.15
+            applied["high_risk_area"] = 0.15
+        elif factor == "previous_claims" and isinstance(value, (int, float)):
+            risk_multiplier *= (1 + value * 0.1)
+            applied["previous_claims"] = value * 0.1
+        elif factor == "security_systems" and value:
+            risk_multiplier *= 0.9
+            applied["security_systems"] = -0.1
+    final_premium = base_premium * risk_multiplier
+    return {
+        "base_premium": round(base_premium, 2),
+        "risk_multiplier": round(risk_multiplier, 2),
+        "final_premium": round(final_premium, 2),
+        "monthly_premium": round(final_premium / params.duration_months, 2),
+        "calculation_details": {
+            "product_name": product.name,
+            "base_coverage": product.coverage_amount,
+            "requested_coverage": params.coverage_amount,
+            "risk_factors_applied": applied
+        }
+    }
+
+CUSTOM_TABLE = {
+    "age": {"upper_bounds": [29, 49, 69], "multipliers": [1.3, 1.0, 1.05, 1.25], "factors": ["young_age", None, "middle_age", "senior_age"]},
+    "risk_factors": {"high_risk_area": 1.5, "previous_claims_step": 0.2}
+}
+
+def test_default_table_matches_legacy_rules(seeded_db):
+    service = ContractService(seeded_db)
+    products = {p.id: p for p in seeded_db.query(InsuranceProduct)}
+    for params in random_quotes(3000, list(products), seed=11):
+        product = products[params.product_id]
+        assert service.calculate_premium(params, product).model_dump() == legacy_premium(params, product)
+
+def test_custom_table_scalar_and_batch_agree(seeded_db):
+    product = seeded_db.query(InsuranceProduct).first()
+    product.rating_table = CUSTOM_TABLE
+    seeded_db.commit()
+    table = RatingTable(product)
+    quotes = random_quotes(500, [product.id], seed=3)
+    assert quote_batch(quotes, {product.id: table}) == [table.quote(params) for params in quotes]
+    
+    result = table.quote(quotes[0].model_copy(update={"client_age": 55, "coverage_amount": 600000, "risk_factors": {"previous_claims": 2}}))
+    assert result["calculation_details"]["risk_factors_applied"] == {"middle_age": 0.05, "high_coverage": 0.1, "previous_claims": 0.4}
+    assert result["risk_multiplier"] == round(1.05 * 1.1 * 1.4, 2)
+
+def test_calculate_uses_cached_tables(client, seeded_db, current_user, engine):
+    current_user["role"] = "agent"
+    payload = {"product_id": 2, "coverage_amount": 200000, "client_age": 30}
+    assert client.post("/api/v1/contracts/calculate", json=payload).json()["final_premium"] == 4000.0
+    with count_queries(engine) as queries:
+        assert client.post("/api/v1/contracts/calculate", json=payload).status_code == 200
+    assert queries.count == 0
+    assert client.post("/api/v1/contracts/calculate", json={**payload, "product_id": 999}).status_code == 404
+
+def test_product_update_invalidates_table(client, seeded_db, current_user):
+    current_user["role"] = "agent"
+    payload = {"product_id": 1, "coverage_amount": 100000, "client_age": 20}
+    assert client.post("/api/v1/contracts/calculate", json=payload).json()["final_premium"] == 1200.0
+    
+    update = {"name": "Product 1", "description": "", "base_premium": 2000.0, "coverage_amount": 100000.0, "rating_table": CUSTOM_TABLE}
+    current_user["role"] = "manager"
+    response = client.put("/api/v1/products/1", json=update)
+    assert response.status_code == 200
+    assert response.json()["rating_table"] == CUSTOM_TABLE
+    current_user["role"] = "agent"
+    assert client.post("/api/v1/contracts/calculate", json=payload).json()["final_premium"] == 2600.0
+    
+    broken = {**update, "rating_table": {"age": {"upper_bounds": [30], "multipliers": [1.1]}}}
+    current_user["role"] = "manager"
+    assert client.put("/api/v1/products/1", json=broken).status_code == 400
+    assert rating_tables.stats()["tables"] == 1
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+import pytest
+from app.utils.response_cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+from tests.utils import FakeRedis, count_queries
+
+def make_cache(backend=None, stale_seconds=60):
+    cache = ResponseCache(backend or MemoryCacheBackend(max_entries=10), prefix="test", stale_seconds=stale_seconds, lock_seconds=5)
+    cache.poll_seconds = 0.01
+    return cache
+
+class SlowComputation:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"call": self.calls}
+
+def test_dashboard_is_cached_per_role(client, seeded_db, current_user, engine):
+    first = client.get("/api/v1/analytics/dashboard")
+    assert first.status_code == 200
+    with count_queries(engine) as queries:
+        assert client.get("/api/v1/analytics/dashboard").json() == first.json()
+    assert queries.count == 0
+    
+    current_user["role"] = "admin"
+    with count_queries(engine) as queries:
+        assert client.get("/api/v1/analytics/dashboard").json() == first.json()
+    assert queries.count > 0
+
+def test_report_dates_are_normalized(client, seeded_db, current_user, engine):
+    default_period = {"start_date": (date.today() - timedelta(days=90)).isoformat(), "end_date": date.today().isoformat()}
+    first = client.get("/api/v1/analytics/reports/finance")
+    assert first.status_code == 200
+    with count_queries(engine) as queries:
+        assert client.get("/api/v1/analytics/reports/finance", params=default_period).json() == first.json()
+        assert client.get("/api/v1/analytics/reports/finance", params={"end_date": date.today().isoformat()}).status_code == 200
+    assert queries.count == 0
+
+def test_concurrent_misses_compute_once():
+    cache = make_cache()
+    compute = SlowComputation()
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_compute("k", 60, compute) for _ in range(20)])
+    
+    assert asyncio.run(run()) == [{"call": 1}] * 20
+    assert compute.calls == 1
+    assert cache.waits == 19
+
+def test_expired_entry_is_served_stale_while_one_request_recomputes():
+    cache = make_cache()
+    compute = SlowComputation()
+
+    async def run():
+        await cache.get_or_compute("k", 60, compute)
+        # Expire the entry but keep it within the stale window
+        entry = json.loads(await cache.backend.get("k:g0"))
+        await cache.backend.set("k:g0", json.dumps({**entry, "expires_at": time.time() - 1}), 60)
+        return await asyncio.gather(*[cache.get_or_compute("k", 60, compute) for _ in range(5)])
+    
+    results = asyncio.run(run())
+    assert results[0] == {"call": 2}
+    assert results[1:] == [{"call": 1}] * 4
+    assert compute.calls == 2
+    assert cache.stale == 4
+
+def test_shared_backend_locks_across_processes():
+    redis = FakeRedis()
+    worker_a, worker_b = make_cache(RedisCacheBackend(client=redis)), make_cache(RedisCacheBackend(client=redis))
+    compute = SlowComputation(delay=0.1)
+
+    async def run():
+        return await asyncio.gather(worker_a.get_or_compute("k", 60, compute), worker_b.get_or_compute("k", 60, compute))
+    
+    assert asyncio.run(run()) == [{"call": 1}, {"call": 1}]
+    assert compute.calls == 1
+    assert "k:g0:lock" not in redis.data
+    assert asyncio.run(worker_b.get_or_compute("k", 60, compute)) == {"call": 1}
+    assert worker_b.hits == 1
+
+def test_failed_computation_releases_lock():
+    redis = FakeRedis()
+    cache = make_cache(RedisCacheBackend(client=redis))
+
+    async def fail():
+        raise RuntimeError("database down")
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute("k", 60, fail))
+    assert redis.data == {}
+    assert asyncio.run(cache.get_or_compute("k", 60, SlowComputation(delay=0))) == {"call": 1}
+
+def test_invalidate_does_not_scan_the_backend(monkeypatch):
+    redis = FakeRedis()
+    cache = make_cache(RedisCacheBackend(client=redis))
+    compute = SlowComputation(delay=0)
+
+    async def no_scan(match="*"):
+        raise AssertionError("invalidate must not scan")
+        yield
+    
+    monkeypatch.setattr(redis, "scan_iter", no_scan)
+
+    async def run():
+        await cache.get_or_compute("k", 60, compute)
+        for _ in range(100):
+            await cache.invalidate()
+        return await cache.get_or_compute("k", 60, compute)
+    
+    assert asyncio.run(run()) == {"call": 2}
+    assert redis.data["test:generation"][0] == "100"
+
+def test_lock_taken_over_after_expiry_is_not_released():
+    redis = FakeRedis()
+    cache = make_cache(RedisCacheBackend(client=redis))
+
+    async def slow_past_lock():
+        # The lock expired meanwhile and another worker took it
+        redis.data["k:g0:lock"] = ("other-worker", time.time() + 5)
+        return {"call": 1}
+    
+    asyncio.run(cache.get_or_compute("k", 60, slow_past_lock))
+    assert redis.data["k:g0:lock"][0] == "other-worker"
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+
+    async def run():
+        await backend.set("a", "1", 60)
+        await backend.set("b", "2", 60)
+        await backend.get("a")
+        await backend.set("c", "3", 60)
+        return [await backend.get(key) for key in "abc"]
+    
+    assert asyncio.run(run()) == ["1", None, "3"]
@@ -0,0 +1,164 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Claim, ClaimStatus, Contract, DailyContractRollup, DailyClaimRollup, ContractStatus
+from app.functions.analytics_service import AnalyticsService
+from app.functions.claim_service import ClaimService
+from app.functions.contract_service import ContractService
+from app.functions.rollup_service import RollupService, settings as rollup_settings
+from app.modules.analytics import AnalyticsRequest, ReportType
+from app.schemas.claim import ClaimCreate, ClaimDecisionRequest, ClaimUpdate
+from app.schemas.contract import ContractCreate, ContractUpdate
+from tests.utils import count_queries
+
+RANGES = [
+    (date(2024, 1, 1), date(2025, 1, 31)),
+    (date(2024, 3, 1), date(2024, 6, 30)),
+    (date(2024, 7, 15), date(2024, 7, 15)),
+]
+
+@pytest.fixture
+def rollup_db(seeded_db):
+    """Seeded book with freshly built rollups"""
+    RollupService(seeded_db).rebuild()
+    return seeded_db
+
+@pytest.mark.parametrize("start_date,end_date", RANGES)
+def test_rollup_analytics_match_raw_tables(rollup_db, start_date, end_date):
+    raw = AnalyticsService(rollup_db, use_rollups=False)
+    rolled = AnalyticsService(rollup_db, use_rollups=True)
+    # Rollups cover the whole end day, raw timestamp filters stop at its midnight
+    # (on SQLite the next day's midnight is excluded as well)
+    raw_end_date = end_date + timedelta(days=1)
+    
+    for report_type, method in [
+        (ReportType.SALES, "get_sales_analytics"),
+        (ReportType.CLAIMS, "get_claims_analytics"),
+        (ReportType.FINANCIAL, "get_financial_analytics"),
+    ]:
+        request = AnalyticsRequest(report_type=report_type, start_date=start_date, end_date=end_date)
+        raw_request = AnalyticsRequest(report_type=report_type, start_date=start_date, end_date=raw_end_date)
+        assert getattr(rolled, method)(request) == getattr(raw, method)(raw_request), method
+    
+    key = lambda row: str(row.get('agent_id', row.get('adjuster_id', row.get('product_id'))))
+    raw_performance = raw.get_performance_analytics(
+        AnalyticsRequest(report_type=ReportType.PERFORMANCE, start_date=start_date, end_date=raw_end_date)
+    )
+    rolled_performance = rolled.get_performance_analytics(
+        AnalyticsRequest(report_type=ReportType.PERFORMANCE, start_date=start_date, end_date=end_date)
+    )
+    for field in ('agent_performance', 'adjuster_performance', 'product_performance'):
+        assert sorted(getattr(rolled_performance, field), key=key) == sorted(getattr(raw_performance, field), key=key)
+    
+    rolled_report = rolled.get_finance_report(start_date, end_date)
+    raw_report = raw.get_finance_report(start_date, raw_end_date)
+    assert rolled_report.model_dump(exclude={'period'}) == raw_report.model_dump(exclude={'period'})
+
+def test_rollup_queries_do_not_touch_raw_tables(rollup_db, engine):
+    request = AnalyticsRequest(report_type=ReportType.SALES, start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    with count_queries(engine) as counter:
+        AnalyticsService(rollup_db, use_rollups=True).get_sales_analytics(request)
+    
+    for statement in counter.statements:
+        assert "FROM contracts" not in statement
+
+def test_rebuild_is_idempotent(rollup_db):
+    before = rollup_db.query(DailyContractRollup).count(), rollup_db.query(DailyClaimRollup).count()
+    RollupService(rollup_db).rebuild()
+    RollupService(rollup_db).refresh_days(date(2024, 1, 1), date(2024, 12, 31))
+    assert (rollup_db.query(DailyContractRollup).count(), rollup_db.query(DailyClaimRollup).count()) == before
+
+def test_contract_write_path_refreshes_rollup(rollup_db, monkeypatch):
+    monkeypatch.setattr(rollup_settings, "analytics_rollups_enabled", True)
+    service = ContractService(rollup_db)
+    contract = service.create_contract(ContractCreate(
+        client_id=1, product_id=1, premium_amount=750.0, coverage_amount=10000.0,
+        start_date=date.today(), end_date=date.today()
+    ), agent_id=99)
+    
+    rollup = rollup_db.query(DailyContractRollup).filter(DailyContractRollup.agent_id == 99).one()
+    assert (rollup.contracts_count, rollup.premium_sum, rollup.status) == (1, 750.0, ContractStatus.DRAFT)
+    
+    service.activate_contract(contract.id)
+    rollup = rollup_db.query(DailyContractRollup).filter(DailyContractRollup.agent_id == 99).one()
+    assert rollup.status == ContractStatus.ACTIVE
+
+def test_writes_in_separate_sessions_share_the_day_rollup(rollup_db, engine, monkeypatch):
+    monkeypatch.setattr(rollup_settings, "analytics_rollups_enabled", True)
+    contract = rollup_db.query(Contract).filter(Contract.status == ContractStatus.ACTIVE).first()
+    item = ClaimCreate(contract_id=contract.id, incident_date=date.today(), description="Broken window", claim_amount=100.0)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    for _ in range(2):
+        session = Session()
+        try:
+            ClaimService(session).create_claim(item)
+        finally:
+            session.close()
+    
+    # adjuster_id NULL is not covered by the unique index, the group must still not be doubled
+    rows = rollup_db.query(DailyClaimRollup).filter(
+        DailyClaimRollup.day == date.today(), DailyClaimRollup.adjuster_id.is_(None)
+    ).all()
+    assert [(row.claims_count, row.claimed_amount_sum) for row in rows] == [(2, 200.0)]
+
+def rollup_rows(db):
+    """Rollup groups without ids and timestamps, first_*_id is only exact after a rebuild"""
+    contracts = sorted(
+        (str(r.day), r.product_id, r.agent_id, r.status.value, r.contracts_count, round(r.premium_sum, 6))
+        for r in db.query(DailyContractRollup)
+    )
+    claims = sorted(
+        (str(r.day), str(r.updated_day), r.product_id, r.adjuster_id or 0, r.status.value, r.claims_count,
+         round(r.claimed_amount_sum, 6), r.approved_amount_sum and round(r.approved_amount_sum, 6), r.approved_count)
+        for r in db.query(DailyClaimRollup)
+    )
+    return contracts, claims
+
+def test_write_path_deltas_match_rebuild(rollup_db, monkeypatch):
+    monkeypatch.setattr(rollup_settings, "analytics_rollups_enabled", True)
+    
+    def rebuild_day(self, start_day, end_day=None):
+        raise AssertionError("write paths must not rebuild whole days")
+    
+    monkeypatch.setattr(RollupService, "refresh_contract_days", rebuild_day)
+    monkeypatch.setattr(RollupService, "refresh_claim_days", rebuild_day)
+    contracts = ContractService(rollup_db)
+    claims = ClaimService(rollup_db)
+    
+    for premium in (750.0, 250.0):
+        contract = contracts.create_contract(ContractCreate(
+            client_id=1, product_id=1, premium_amount=premium, coverage_amount=10000.0,
+            start_date=date.today(), end_date=date.today()
+        ), agent_id=99)
+        contracts.activate_contract(contract.id)
+    contracts.update_contract(contract.id, ContractUpdate(premium_amount=300.0))
+    contracts.suspend_contract(contract.id)
+    
+    claim = claims.create_claim(ClaimCreate(
+        contract_id=contract.id, incident_date=date.today(), description="Broken window", claim_amount=400.0
+    ))
+    claims.assign_adjuster(claim.id, adjuster_id=12)
+    claims.make_decision(claim.id, ClaimDecisionRequest(decision="approved", approved_amount=350.0), adjuster_id=12)
+    claims.mark_as_paid(claim.id)
+    seeded_claim = rollup_db.query(Claim).filter(Claim.status == ClaimStatus.SUBMITTED).first()
+    claims.update_claim(seeded_claim.id, ClaimUpdate(status="under_review"))
+    
+    incremental = rollup_rows(rollup_db)
+    monkeypatch.undo()
+    RollupService(rollup_db).rebuild()
+    assert incremental == rollup_rows(rollup_db)
+
+def test_failed_rollup_update_does_not_fail_the_write(rollup_db, monkeypatch):
+    monkeypatch.setattr(rollup_settings, "analytics_rollups_enabled", True)
+    
+    def fail(self, contract_ids):
+        raise RuntimeError("rollup table locked")
+    
+    monkeypatch.setattr(RollupService, "add_contracts", fail)
+    contract = ContractService(rollup_db).create_contract(ContractCreate(
+        client_id=1, product_id=1, premium_amount=100.0, coverage_amount=10000.0,
+        start_date=date.today(), end_date=date.today()
+    ), agent_id=98)
+    
+    rollup_db.expire_all()
+    assert rollup_db.get(Contract, contract.id) is not None
@@ -0,0 +1,59 @@
+from datetime import date
+from app.db.models import Client, Claim, Contract
+from app.functions.search_service import SearchService
+from app.utils.pagination import encode_cursor
+
+def add_clients(db):
+    db.add_all([
+        Client(first_name="Anna", last_name="Ivanova", email="anna@example.com", phone="+7 900 111"),
+        Client(first_name="Ivan", last_name="Petrov", email="petrov@example.com", phone="+7 900 222"),
+        Client(first_name="Maria", last_name="Sokolova", email="maria_ivanova@example.com", phone="+7 900 333"),
+        Client(first_name="Oleg", last_name="100%", email="oleg@example.com", phone="+7 900 444"),
+    ])
+    db.commit()
+
+def test_client_search_ranks_prefix_matches_first(db):
+    add_clients(db)
+    results = SearchService(db).search_clients("ivan")
+    assert [c.last_name for c in results] == ["Ivanova", "Petrov", "Sokolova"]
+
+def test_client_search_escapes_like_wildcards(db):
+    add_clients(db)
+    assert [c.first_name for c in SearchService(db).search_clients("0%")] == ["Oleg"]
+    assert SearchService(db).search_clients("r_a") == []
+    assert [c.first_name for c in SearchService(db).search_clients("a_ivanova")] == ["Maria"]
+
+def test_clients_endpoint_search(client, db, current_user):
+    add_clients(db)
+    current_user["role"] = "operator"
+    response = client.get("/api/v1/clients/search", params={"q": "petrov"})
+    assert response.status_code == 200
+    assert [c["first_name"] for c in response.json()] == ["Ivan"]
+    
+    response = client.get("/api/v1/clients/", params={"search": "example.com", "limit": 2})
+    body = response.json()
+    assert body["total"] == 4
+    assert len(body["clients"]) == 2
+
+def test_claims_list_search(client, seeded_db):
+    response = client.get("/api/v1/claims/", params={"search": "clm-2024-000001"})
+    expected = seeded_db.query(Claim.claim_number).filter(
+        Claim.claim_number.like("CLM-2024-000001%")
+    ).order_by(Claim.id).all()
+    assert [c["claim_number"] for c in response.json()["claims"]] == [row.claim_number for row in expected]
+
+def test_claims_list_search_ranks_claim_number_prefix_first(client, seeded_db):
+    contract_id = seeded_db.query(Contract.id).first().id
+    seeded_db.add_all([
+        Claim(claim_number="CLM-2025-0000001", contract_id=contract_id, incident_date=date(2025, 1, 1), description="Basement flood"),
+        Claim(claim_number="FLOOD-2025-0000002", contract_id=contract_id, incident_date=date(2025, 1, 1), description="Water damage"),
+    ])
+    seeded_db.commit()
+    
+    response = client.get("/api/v1/claims/", params={"search": "flood"})
+    body = response.json()
+    assert [c["claim_number"] for c in body["claims"]] == ["FLOOD-2025-0000002", "CLM-2025-0000001"]
+    assert body["next_cursor"] is None
+    
+    response = client.get("/api/v1/claims/", params={"search": "flood", "cursor": encode_cursor(body["claims"][0]["id"])})
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+import re
+from datetime import datetime
+from app.db.sequences import NumberAllocator
+from app.functions.client_service import ClientService
+from app.schemas.client import ClientCreate
+from tests.utils import assert_max_queries
+
+def test_numbers_continue_after_existing_ones(seeded_db):
+    allocator = NumberAllocator(seeded_db)
+    assert allocator.contract_number(2024) == "CON-2024-000200"
+    assert allocator.contract_number(2024) == "CON-2024-000201"
+    assert allocator.claim_number(2024) == "CLM-2024-0000120"
+    assert allocator.contract_number(2025) == "CON-2025-000001"
+
+def test_default_year_and_format(db):
+    year = datetime.now().year
+    allocator = NumberAllocator(db)
+    assert re.fullmatch(rf"CON-{year}-\d{{6}}", allocator.contract_number())
+    assert re.fullmatch(rf"CLM-{year}-\d{{7}}", allocator.claim_number())
+
+def test_bulk_allocation_is_one_statement(seeded_db, engine):
+    allocator = NumberAllocator(seeded_db)
+    allocator.claim_number(2024)
+    with assert_max_queries(engine, 1):
+        numbers = allocator.claim_numbers(50, 2024)
+    assert numbers[0] == "CLM-2024-0000121"
+    assert numbers[-1] == "CLM-2024-0000170"
+    assert len(set(numbers)) == 50
+
+def test_client_ids_are_unique_and_not_sequential(db):
+    ids = NumberAllocator(db).client_ids(1000)
+    assert len(set(ids)) == 1000
+    assert all(re.fullmatch(r"[0-9A-Z]{8}", client_id) for client_id in ids)
+    assert sorted(ids) != ids
+
+def test_create_client_gets_generated_id(db):
+    service = ClientService(db)
+    first = service.create_client(ClientCreate(first_name="A", last_name="B", email="a@example.com"), created_by=1)
+    second = service.create_client(ClientCreate(first_name="C", last_name="D", email="c@example.com"), created_by=1)
+    assert first.identification_number and second.identification_number
+    assert first.identification_number != second.identification_number
@@ -0,0 +1,125 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from app.utils.auth import TokenCache, settings as auth_settings, token_cache, verify_token
+
+USER = {"username": "agent", "user_id": 7, "role": "agent", "valid": True}
+
+def make_token(expires_in=3600, user_id=7):
+    claims = {"sub": "agent", "user_id": user_id, "role": "agent"}
+    if expires_in is not None:
+        claims["exp"] = int(time.time()) + expires_in
+    return jwt.encode(claims, auth_settings.jwt_secret_key, algorithm=auth_settings.jwt_algorithm)
+
+def verify(token):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    return asyncio.run(verify_token(credentials))
+
+@pytest.fixture(autouse=True)
+def clean_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+def test_hit_after_set():
+    cache = TokenCache(max_entries=10, ttl_seconds=60)
+    token = make_token()
+    assert cache.get(token) is None
+    cache.set(token, USER)
+    assert cache.get(token) == USER
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_entry_expires_at_ttl_or_exp_whichever_is_first(monkeypatch):
+    cache = TokenCache(max_entries=10, ttl_seconds=60)
+    short_lived = make_token(expires_in=30)
+    long_lived = make_token(expires_in=3600, user_id=8)
+    cache.set(short_lived, USER)
+    cache.set(long_lived, USER)
+    
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 45)
+    assert cache.get(short_lived) is None
+    assert cache.get(long_lived) == USER
+    
+    monkeypatch.setattr(time, "time", lambda: now + 90)
+    assert cache.get(long_lived) is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(max_entries=2, ttl_seconds=60)
+    first, second, third = (make_token(user_id=user_id) for user_id in (1, 2, 3))
+    cache.set(first, USER)
+    cache.set(second, USER)
+    cache.get(first)
+    cache.set(third, USER)
+    
+    assert cache.get(second) is None
+    assert cache.get(first) == USER
+    assert cache.get(third) == USER
+
+def test_revocation_survives_eviction_until_exp(monkeypatch):
+    cache = TokenCache(max_entries=1, ttl_seconds=60)
+    token = make_token(expires_in=600)
+    cache.set(token, USER)
+    cache.revoke(token)
+    for user_id in range(20, 30):
+        cache.set(make_token(user_id=user_id), USER)
+    
+    assert cache.get(token) is None
+    now = time.time()
+    # Still revoked after the cache ttl, until the token itself expires
+    monkeypatch.setattr(time, "time", lambda: now + 300)
+    assert cache.is_revoked(token)
+    monkeypatch.setattr(time, "time", lambda: now + 601)
+    assert not cache.is_revoked(token)
+    assert cache.stats()["revoked"] == 0
+
+def test_revoked_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(auth_settings, "auth_verify_mode", "local")
+    token = make_token()
+    assert verify(token)["user_id"] == 7
+    
+    token_cache.revoke(token)
+    with pytest.raises(HTTPException) as error:
+        verify(token)
+    assert error.value.detail == "Token has been revoked"
+
+def test_revoked_token_is_rejected_with_cache_disabled(monkeypatch):
+    monkeypatch.setattr(auth_settings, "auth_verify_mode", "local")
+    monkeypatch.setattr(auth_settings, "auth_cache_enabled", False)
+    token = make_token()
+    assert verify(token)["user_id"] == 7
+    
+    token_cache.revoke(token)
+    with pytest.raises(HTTPException) as error:
+        verify(token)
+    assert error.value.status_code == 401
+
+def test_only_tokens_with_exp_are_revoked():
+    cache = TokenCache(max_entries=10, ttl_seconds=60)
+    assert not cache.revoke("not a jwt")
+    assert not cache.revoke(make_token(expires_in=None))
+    assert not cache.revoke(make_token(expires_in=-10))
+    assert cache.stats()["revoked"] == 0
+
+def test_revocations_are_capped_dropping_the_first_to_expire():
+    cache = TokenCache(max_entries=10, ttl_seconds=60, max_revoked=2)
+    soonest, later, latest = (make_token(expires_in=seconds) for seconds in (100, 200, 300))
+    for token in (later, soonest, latest):
+        assert cache.revoke(token)
+    
+    assert cache.stats()["revoked"] == 2
+    assert not cache.is_revoked(soonest)
+    assert cache.is_revoked(later) and cache.is_revoked(latest)
+
+def test_logout_requires_a_valid_token(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    monkeypatch.setattr(auth_settings, "auth_verify_mode", "local")
+    monkeypatch.setattr(auth_settings, "auth_remote_fallback", False)
+    
+    response = TestClient(app).post("/api/v1/auth/logout", headers={"Authorization": "Bearer garbage"})
+    assert response.status_code == 401
+    assert token_cache.stats()["revoked"] == 0
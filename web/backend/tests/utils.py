@@ -0,0 +1,80 @@
+import fnmatch
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+
+class QueryCounter:
+    """Collects SQL statements executed on an engine"""
+    
+    def __init__(self):
+        self.statements = []
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries(engine):
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+@contextmanager
+def assert_max_queries(engine, max_queries: int):
+    """Fail if the block executes more than max_queries SQL statements"""
+    with count_queries(engine) as counter:
+        yield counter
+    assert counter.count <= max_queries, (
+        f"Expected at most {max_queries} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+    )
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client methods used by RedisCacheBackend"""
+    
+    def __init__(self):
+        self.data = {}
+    
+    def _alive(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            entry = None
+        return entry
+    
+    async def get(self, key):
+        entry = self._alive(key)
+        return entry[0].encode() if entry else None
+    
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = (value, time.time() + ex if ex else None)
+        return True
+    
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+    
+    async def incr(self, key):
+        entry = self._alive(key)
+        value = int(entry[0]) + 1 if entry else 1
+        self.data[key] = (str(value), entry[1] if entry else None)
+        return value
+    
+    async def eval(self, script, numkeys, *args):
+        # Only the compare-and-delete script of RedisCacheBackend
+        key, value = args
+        entry = self._alive(key)
+        if entry is None or entry[0] != value:
+            return 0
+        return await self.delete(key)
+    
+    async def scan_iter(self, match="*"):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key